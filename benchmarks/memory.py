@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Measure the memory used per item on a canvas.
+
+Elements and lines are added to a canvas, and the memory allocated for them
+is measured with ``tracemalloc``. Lines are connected to elements at both
+ends, so connection constraints are part of the measurement.
+
+Results can be written to a JSON file with ``--record``, and compared to an
+earlier recording with ``--compare``, to spot memory regressions.
+
+Run with::
+
+    python benchmarks/memory.py
+    python benchmarks/memory.py --record memory.json
+    python benchmarks/memory.py --compare memory.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tracemalloc
+from collections.abc import Callable
+
+from gaphas.canvas import Canvas
+from gaphas.item import Element, Line
+
+
+def measure(create: Callable[[], object], count: int) -> float:
+    """Return the bytes allocated per call of ``create``."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        keep = [create() for _ in range(count)]
+        gc.collect()
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del keep
+    return (end - start) / count
+
+
+def run(count: int) -> dict[str, float]:
+    canvas = Canvas()
+    connections = canvas.connections
+
+    def element() -> Element:
+        e = Element(connections, 100, 50)
+        canvas.add(e)
+        return e
+
+    def line() -> Line:
+        line = Line(connections)
+        line.tail.pos = (100, 100)
+        canvas.add(line)
+        return line
+
+    targets = [element() for _ in range(2)]
+
+    def connected_line() -> Line:
+        line = Line(connections)
+        canvas.add(line)
+        for handle, target in zip(line.handles(), targets):
+            port = target.ports()[0]
+            connections.connect_item(
+                line, handle, target, port, port.constraint(line, handle, target)
+            )
+        return line
+
+    return {
+        "element": measure(element, count),
+        "line": measure(line, count),
+        "connected line": measure(connected_line, count),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--record", help="write the results to a file")
+    parser.add_argument("--compare", help="compare with results from a file")
+    args = parser.parse_args()
+
+    results = run(args.items)
+
+    baseline: dict[str, float] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{args.items} items, bytes per item")
+    for name, size in results.items():
+        line = f"{name:>16}{size:>10.0f}"
+        if name in baseline:
+            line += f"{size - baseline[name]:>+10.0f}"
+        print(line)
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
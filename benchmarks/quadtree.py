@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""Benchmark quadtree queries on a diagram-like mix of items.
+
+The diagram consists of small boxes in a grid, and long connectors
+between random boxes. Connectors easily straddle the center lines of
+buckets, so in a regular quadtree they pile up near the root, where
+every query has to check them.
+
+Viewport queries and nearest item searches are timed for a regular and
+for loose quadtrees. Large buckets are checked with NumPy, if it's
+installed. Use ``--no-numpy`` to compare with the plain Python checks.
+
+Run with::
+
+    python benchmarks/quadtree.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from gaphas import quadtree
+from gaphas.quadtree import Quadtree
+
+Bounds = tuple[float, float, float, float]
+
+
+def diagram(boxes: int, lines: int, seed: int = 0) -> list[tuple[str, Bounds]]:
+    rng = random.Random(seed)
+    columns = int(boxes**0.5) or 1
+    items: list[tuple[str, Bounds]] = []
+    for i in range(boxes):
+        x, y = (i % columns) * 150.0, (i // columns) * 100.0
+        items.append((f"box{i}", (x, y, rng.uniform(60, 120), rng.uniform(40, 70))))
+    for i in range(lines):
+        _, (x0, y0, _, _) = items[rng.randrange(boxes)]
+        # Connectors mostly link nearby boxes, some span the diagram
+        reach = 1500.0 if rng.random() < 0.9 else columns * 150.0
+        x1 = x0 + rng.uniform(-reach, reach)
+        y1 = y0 + rng.uniform(-reach, reach)
+        items.append(
+            (f"line{i}", (min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)))
+        )
+    return items
+
+
+def viewports(
+    bounds: Bounds, count: int, size: float = 1000.0, seed: int = 1
+) -> list[Bounds]:
+    rng = random.Random(seed)
+    x, y, w, h = bounds
+    return [
+        (rng.uniform(x, x + w - size), rng.uniform(y, y + h - size), size, size)
+        for _ in range(count)
+    ]
+
+
+def root_items(qtree: Quadtree) -> int:
+    return len(qtree._bucket.items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boxes", type=int, default=10_000)
+    parser.add_argument("--lines", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=10)
+    parser.add_argument(
+        "--no-numpy", action="store_true", help="check large buckets without NumPy"
+    )
+    args = parser.parse_args()
+    if args.no_numpy:
+        quadtree.numpy = None
+
+    items = diagram(args.boxes, args.lines)
+    print(f"{args.boxes} boxes, {args.lines} connectors, {args.queries} queries")
+    print(
+        f"{'looseness':>10} {'load (s)':>10} {'query (ms)':>11} {'nearest (ms)':>13} {'root items':>11}"
+    )
+    for looseness in (1.0, 1.5, 2.0):
+        qtree: Quadtree[str, None] = Quadtree(
+            capacity=args.capacity, looseness=looseness
+        )
+        load_time = timeit.timeit(lambda: qtree.load(items), number=1)  # noqa: B023
+        rects = viewports(qtree.soft_bounds, args.queries)
+        query_time = timeit.timeit(
+            lambda: [qtree.find_intersect(r) for r in rects],  # noqa: B023
+            number=1,
+        )
+        points = [(x + w / 2, y + h / 2) for x, y, w, h in rects]
+        nearest_time = timeit.timeit(
+            lambda: [qtree.find_nearest(p) for p in points],  # noqa: B023
+            number=1,
+        )
+        print(
+            f"{looseness:>10} {load_time:>10.3f} {query_time * 1000 / len(rects):>11.3f} {nearest_time * 1000 / len(points):>13.3f} {root_items(qtree):>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""Compare spatial indexes on recorded workloads.
+
+A workload is a set of items, followed by viewport queries, item moves,
+nearest item lookups and removals, like a view would do them. Workloads
+can be written to a JSON file with ``--record``, and replayed with
+``--workload``, so different versions of the code can be compared on the
+same data.
+
+Run with::
+
+    python benchmarks/spatial_index.py
+    python benchmarks/spatial_index.py --record sparse.json --kind sparse
+    python benchmarks/spatial_index.py --workload sparse.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Callable
+
+from quadtree import diagram, viewports
+
+from gaphas.hashgrid import HashGrid
+from gaphas.quadtree import Quadtree
+from gaphas.rtree import RTree
+from gaphas.spatialindex import SpatialIndex
+
+Bounds = tuple[float, float, float, float]
+
+INDEXES: dict[str, Callable[[], SpatialIndex[str]]] = {
+    "quadtree": Quadtree,
+    "quadtree (loose)": lambda: Quadtree(looseness=1.5),
+    "rtree": RTree,
+    "hashgrid": lambda: HashGrid(cell_size=200),
+}
+
+
+def dense(items: int, seed: int = 0) -> list[tuple[str, Bounds]]:
+    """Many boxes of about the same size, close together."""
+    rng = random.Random(seed)
+    columns = int(items**0.5) or 1
+    return [
+        (
+            f"box{i}",
+            (
+                (i % columns) * 50.0 + rng.uniform(0, 10),
+                (i // columns) * 50.0 + rng.uniform(0, 10),
+                rng.uniform(20, 40),
+                rng.uniform(20, 40),
+            ),
+        )
+        for i in range(items)
+    ]
+
+
+def sparse(items: int, seed: int = 0) -> list[tuple[str, Bounds]]:
+    """Small items spread out over a large area, and a few large containers."""
+    rng = random.Random(seed)
+    size = 100.0 * items
+    result: list[tuple[str, Bounds]] = [
+        (
+            f"container{i}",
+            (rng.uniform(0, size), rng.uniform(0, size), size / 4, size / 4),
+        )
+        for i in range(max(1, items // 1000))
+    ]
+    result.extend(
+        (f"box{i}", (rng.uniform(0, size), rng.uniform(0, size), 80.0, 50.0))
+        for i in range(items)
+    )
+    return result
+
+
+def workload(kind: str, items: int, operations: int, seed: int = 0) -> dict:
+    if kind == "diagram":
+        loaded = diagram(items // 2, items // 2, seed)
+    elif kind == "dense":
+        loaded = dense(items, seed)
+    else:
+        loaded = sparse(items, seed)
+
+    rng = random.Random(seed + 1)
+    xs = [x for _, (x, _, _, _) in loaded]
+    ys = [y for _, (_, y, _, _) in loaded]
+    bounds = (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+    size = min(1000.0, bounds[2], bounds[3])
+    moved = rng.sample(loaded, min(operations, len(loaded)))
+    return {
+        "kind": kind,
+        "items": loaded,
+        "queries": viewports(bounds, operations, size, seed + 2),
+        "moves": [
+            (item, (x + rng.uniform(-50, 50), y + rng.uniform(-50, 50), w, h))
+            for item, (x, y, w, h) in moved
+        ],
+        "points": [
+            (
+                rng.uniform(bounds[0], bounds[0] + bounds[2]),
+                rng.uniform(bounds[1], bounds[1] + bounds[3]),
+            )
+            for _ in range(operations)
+        ],
+        "removes": [
+            item for item, _ in rng.sample(loaded, min(operations, len(loaded)))
+        ],
+    }
+
+
+def run(index: SpatialIndex[str], work: dict) -> dict[str, float]:
+    """Run a workload, and return the time (in ms) of each step."""
+    timings = {}
+
+    def timed(name: str, step: Callable[[], object]) -> None:
+        start = time.perf_counter()
+        step()
+        timings[name] = (time.perf_counter() - start) * 1000
+
+    items = [(item, tuple(bounds)) for item, bounds in work["items"]]
+    timed("load", lambda: index.load(items))
+    queries = [tuple(rect) for rect in work["queries"]]
+    timed("query", lambda: [index.find_intersect(rect) for rect in queries])
+    timed(
+        "move",
+        lambda: [index.add(item, tuple(bounds)) for item, bounds in work["moves"]],
+    )
+    timed(
+        "nearest",
+        lambda: [
+            index.find_nearest(tuple(point), max_distance=100.0)
+            for point in work["points"]
+        ],
+    )
+    timed("remove", lambda: [index.remove(item) for item in work["removes"]])
+    index.clear()
+    timed("add", lambda: [index.add(item, bounds) for item, bounds in items])
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kind", choices=("diagram", "dense", "sparse"))
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--operations", type=int, default=500)
+    parser.add_argument("--workload", help="replay a recorded workload")
+    parser.add_argument("--record", help="write the workload to a file")
+    args = parser.parse_args()
+
+    if args.workload:
+        with open(args.workload, encoding="utf-8") as f:
+            workloads = [json.load(f)]
+    else:
+        workloads = [
+            workload(kind, args.items, args.operations)
+            for kind in ([args.kind] if args.kind else ["diagram", "dense", "sparse"])
+        ]
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            json.dump(workloads[0], f)
+
+    steps = ("load", "query", "move", "nearest", "remove", "add")
+    for work in workloads:
+        print(f"{work['kind']}: {len(work['items'])} items, times in ms")
+        print(f"{'index':>18}" + "".join(f"{step:>10}" for step in steps))
+        for name, factory in INDEXES.items():
+            timings = run(factory(), work)
+            print(f"{name:>18}" + "".join(f"{timings[step]:>10.1f}" for step in steps))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,6 @@ import asyncio
 import math
 import sys
 
-import cairo
 import gi
 from gi.events import GLibEventLoopPolicy
 
@@ -27,7 +26,6 @@ from gi.repository import Gtk
 
 from examples.exampleitems import Box, Circle, Text
 from gaphas import Canvas
-from gaphas.geometry import Rectangle
 from gaphas.guide import GuidePainter
 from gaphas.item import Line
 from gaphas.painter import (
@@ -36,6 +34,7 @@ from gaphas.painter import (
     ItemPainter,
     PainterChain,
 )
+from gaphas.render import Renderer
 from gaphas.segment import LineSegmentPainter
 from gaphas.tool import (
     hover_tool,
@@ -189,13 +188,6 @@ def apply_painters(view):
     view.bounding_box_painter = painter
 
 
-def calculate_bounding_box(painter, items):
-    surface = cairo.RecordingSurface(cairo.Content.COLOR_ALPHA, None)
-    cr = cairo.Context(surface)
-    painter.paint(items, cr)
-    return Rectangle(*surface.ink_extents())
-
-
 def create_window(canvas, title, zoom=1.0):  # noqa too complex
     view = GtkView()
 
@@ -285,19 +277,8 @@ def create_window(canvas, title, zoom=1.0):  # noqa too complex
     b = Gtk.Button.new_with_label("Write demo.png")
 
     def on_write_demo_png_clicked(_button):
-        assert view.model
-        painter = ItemPainter()
-
-        bounding_box = calculate_bounding_box(painter, canvas.get_all_items())
-
-        surface = cairo.ImageSurface(
-            cairo.FORMAT_ARGB32, int(bounding_box.width), int(bounding_box.height)
-        )
-        cr = cairo.Context(surface)
-        cr.translate(-bounding_box.x, -bounding_box.y)
-        painter.paint(items=list(view.model.get_all_items()), cairo=cr)
-        cr.show_page()
-        surface.write_to_png("demo.png")
+        with Renderer(canvas) as renderer:
+            renderer.render_png("demo.png")
 
     b.connect("clicked", on_write_demo_png_clicked)
     v_append(b)
@@ -305,20 +286,8 @@ def create_window(canvas, title, zoom=1.0):  # noqa too complex
     b = Gtk.Button.new_with_label("Write demo.svg")
 
     def on_write_demo_svg_clicked(button):
-        assert view.model
-        painter = ItemPainter()
-
-        bounding_box = calculate_bounding_box(painter, canvas.get_all_items())
-
-        surface = cairo.SVGSurface(
-            "demo.svg", int(bounding_box.width), int(bounding_box.height)
-        )
-        cr = cairo.Context(surface)
-        cr.translate(-bounding_box.x, -bounding_box.y)
-        painter.paint(items=list(view.model.get_all_items()), cairo=cr)
-        cr.show_page()
-        surface.flush()
-        surface.finish()
+        with Renderer(canvas) as renderer:
+            renderer.render_svg("demo.svg")
 
     b.connect("clicked", on_write_demo_svg_clicked)
     v_append(b)
@@ -28,7 +28,7 @@ To get connecting items (i.e. all lines connected to a class)::
 from __future__ import annotations
 
 import logging
-from typing import Iterable, Protocol
+from typing import Collection, Iterable, Protocol
 
 import cairo
 
@@ -52,7 +52,7 @@ class Canvas:
         self._connections = Connections()
 
         self._registered_views = set()
-        self._connections.add_handler(self._on_constraint_solved)
+        self._connections.add_batch_handler(self._on_constraints_solved)
 
     @property
     def solver(self):
@@ -106,6 +106,7 @@ class Canvas:
     def reparent(self, item, parent, index=None):
         """Set new parent for an item."""
         self._tree.move(item, parent, index)
+        self.request_update(item)
 
     def get_all_items(self) -> Iterable[Item]:
         """Get a list of all items.
@@ -260,15 +261,14 @@ class Canvas:
         """
         self._registered_views.discard(view)
 
-    def _on_constraint_solved(self, cinfo: Connection) -> None:
-        dirty_items = set()
-        known_items = set(self._tree.nodes)
-        item = cinfo.item
-        if item and item in known_items:
-            dirty_items.add(item)
-        connected = cinfo.connected
-        if connected and connected in known_items:
-            dirty_items.add(connected)
+    def _on_constraints_solved(self, cinfos: Collection[Connection]) -> None:
+        tree = self._tree
+        dirty_items = {
+            item
+            for cinfo in cinfos
+            for item in (cinfo.item, cinfo.connected)
+            if item and item in tree
+        }
         if dirty_items:
             self._update_views(dirty_items)
 
@@ -292,7 +292,30 @@ def ancestors(canvas: Traversable, item: Item) -> Iterable[Item | None]:
 
 
 def all_children(canvas: Traversable, item: Item | None) -> Iterable[Item]:
-    children = canvas.get_children(item)
-    for child in children:
-        yield child
-        yield from all_children(canvas, child)
+    stack = [iter(canvas.get_children(item))]
+    while stack:
+        for child in stack[-1]:
+            yield child
+            stack.append(iter(canvas.get_children(child)))
+            break
+        else:
+            stack.pop()
+
+
+def with_descendants(canvas: Traversable, items: Iterable[Item]) -> set[Item]:
+    """Return a set with ``items`` and all their descendants.
+
+    Every item is visited once, also if an item and (some of) its
+    descendants are in ``items``.
+    """
+    result = set(items)
+    stack = list(result)
+    pop = stack.pop
+    push = stack.append
+    add = result.add
+    while stack:
+        for child in canvas.get_children(pop()):
+            if child not in result:
+                add(child)
+                push(child)
+    return result
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Callable, Iterator, NamedTuple
+from typing import Callable, Collection, Iterable, Iterator, NamedTuple, Sequence
 
 from gaphas import table
 from gaphas.constraint import Constraint
@@ -42,9 +42,16 @@ class Connections:
     def __init__(self, solver: Solver | None = None) -> None:
         self._solver = solver or Solver()
         self._connections: table.Table[Connection] = table.Table(
-            Connection, tuple(range(5))
+            Connection, (0, 2, 3), unique=(1,)
         )
+        # Constraint -> connections, to route solved constraints
+        self._constraints: dict[Constraint, set[Connection]] = {}
         self._handlers: set[Callable[[Connection], None]] = set()
+        self._batch_handlers: set[Callable[[Collection[Connection]], None]] = set()
+        # Connections solved during solve(), if there are batch handlers
+        self._solved: dict[Connection, None] | None = None
+        # Connected items: item -> neighbour -> number of connections
+        self._adjacency: dict[Item, dict[Item, int]] = {}
 
         self._solver.add_handler(self._on_constraint_solved)
 
@@ -59,10 +66,28 @@ class Connections:
         """Remove a previously assigned handler."""
         self._handlers.discard(handler)
 
+    def add_batch_handler(
+        self, handler: Callable[[Collection[Connection]], None]
+    ) -> None:
+        """Add a callback handler for batches of connections.
+
+        Batch handlers are triggered once per :meth:`solve`, with all
+        connections of which a constraint has been solved.
+        """
+        self._batch_handlers.add(handler)
+
+    def remove_batch_handler(
+        self, handler: Callable[[Collection[Connection]], None]
+    ) -> None:
+        """Remove a previously assigned batch handler."""
+        self._batch_handlers.discard(handler)
+
     def _on_constraint_solved(self, constraint):
-        for cinfo in self._connections.query(constraint=constraint):
+        for cinfo in self._constraints.get(constraint, ()):
             for handler in self._handlers:
                 handler(cinfo)
+            if self._solved is not None:
+                self._solved[cinfo] = None
 
     @property
     def solver(self) -> Solver:
@@ -71,18 +96,34 @@ class Connections:
 
     def solve(self) -> None:
         """Solve all constraints."""
-        self._solver.solve()
+        if not self._batch_handlers:
+            self._solver.solve()
+            return
+
+        solved: dict[Connection, None] = {}
+        self._solved = solved
+        try:
+            self._solver.solve()
+        finally:
+            self._solved = None
+        if solved:
+            for handler in self._batch_handlers:
+                handler(solved.keys())
 
     def add_constraint(self, item: Item, constraint: Constraint) -> Constraint:
         """Add a "simple" constraint for an item."""
+        self._insert(
+            [Connection(item, None, None, None, constraint, None)]  # type: ignore[arg-type]
+        )
         self._solver.add_constraint(constraint)
-        self._connections.insert(item, None, None, None, constraint, None)
         return constraint
 
     def remove_constraint(self, item: Item, constraint: Constraint) -> None:
         """Remove an item specific constraint."""
         self._solver.remove_constraint(constraint)
-        self._connections.delete(item, None, None, None, constraint, None)
+        for cinfo in list(self._constraints.get(constraint, ())):
+            if cinfo.item is item and cinfo.handle is None:
+                self._remove(cinfo)
 
     def connect_item(
         self,
@@ -116,11 +157,37 @@ class Connections:
                 f"Handle {handle} of item {item} is already connected"
             )
 
-        self._connections.insert(item, handle, connected, port, constraint, callback)
+        self._insert([Connection(item, handle, connected, port, constraint, callback)])  # type: ignore[arg-type]
+        self._link(item, connected)
 
         if constraint:
             self._solver.add_constraint(constraint)
 
+    def connect_many(self, connections: Iterable[Connection]) -> None:
+        """Create many connections at once.
+
+        All connections are checked before the first one is made, so either
+        all handles get connected, or none. Constraints are added to the
+        solver in one go and solved once.
+
+        ``ConnectionError`` is raised in case a handle is already connected,
+        or occurs more than once.
+        """
+        cinfos = list(connections)
+        handles: set[Handle] = set()
+        for cinfo in cinfos:
+            if cinfo.handle in handles or self.get_connection(cinfo.handle):
+                raise ConnectionError(
+                    f"Handle {cinfo.handle} of item {cinfo.item} is already connected"
+                )
+            handles.add(cinfo.handle)
+
+        self._insert(cinfos)
+        for cinfo in cinfos:
+            self._link(cinfo.item, cinfo.connected)
+        self._solver.add_constraints(c.constraint for c in cinfos if c.constraint)
+        self.solve()
+
     def disconnect_item(self, item: Item, handle: Handle | None = None) -> None:
         """Disconnect the connections of an item.
 
@@ -147,7 +214,63 @@ class Connections:
         if callback is not None:
             callback(item, handle, connected, port)
 
-        self._connections.delete(item, handle, connected, port, constraint, callback)
+        self._delete(Connection(item, handle, connected, port, constraint, callback))
+
+    def disconnect_many(self, connections: Iterable[Connection]) -> None:
+        """Break many connections at once.
+
+        Constraints are removed from the solver in one go. Disconnection
+        callbacks are invoked for each connection.
+        """
+        cinfos = list(dict.fromkeys(connections))
+        self._solver.remove_constraints(c.constraint for c in cinfos if c.constraint)
+        for cinfo in cinfos:
+            if cinfo.callback is not None:
+                cinfo.callback(cinfo.item, cinfo.handle, cinfo.connected, cinfo.port)
+            self._delete(cinfo)
+
+    def _delete(self, cinfo: Connection) -> None:
+        if cinfo.connected is not None:
+            # A callback may have broken the connection already
+            if self._connections.get(handle=cinfo.handle) != cinfo:
+                return
+            self._unlink(cinfo.item, cinfo.connected)
+        self._remove(cinfo)
+
+    def _insert(self, cinfos: Sequence[Connection]) -> None:
+        self._connections.insert_many(cinfos)
+        constraints = self._constraints
+        for cinfo in cinfos:
+            if cinfo.constraint is not None:
+                constraints.setdefault(cinfo.constraint, set()).add(cinfo)
+
+    def _remove(self, cinfo: Connection) -> None:
+        self._connections.delete(*cinfo)
+        if (cinfos := self._constraints.get(cinfo.constraint)) is not None:
+            cinfos.discard(cinfo)
+            if not cinfos:
+                del self._constraints[cinfo.constraint]
+
+    def _link(self, item: Item, connected: Item) -> None:
+        adjacency = self._adjacency
+        for a, b in ((item, connected), (connected, item)):
+            neighbours = adjacency.setdefault(a, {})
+            neighbours[b] = neighbours.get(b, 0) + 1
+            if a is b:
+                break
+
+    def _unlink(self, item: Item, connected: Item) -> None:
+        adjacency = self._adjacency
+        for a, b in ((item, connected), (connected, item)):
+            neighbours = adjacency[a]
+            if neighbours[b] > 1:
+                neighbours[b] -= 1
+            else:
+                del neighbours[b]
+                if not neighbours:
+                    del adjacency[a]
+            if a is b:
+                break
 
     def remove_connections_to_item(self, item: Item) -> None:
         """Remove all connections (handles connected to and constraints) for a
@@ -156,13 +279,13 @@ class Connections:
         This is some brute force cleanup (e.g. if constraints are
         referenced by items, those references are not cleaned up).
         """
-        disconnect_item = self._disconnect_item
-        # remove connections from this item
-        for cinfo in list(self._connections.query(item=item)):
-            disconnect_item(*cinfo)
-        # remove constraints to this item
-        for cinfo in list(self._connections.query(connected=item)):
-            disconnect_item(*cinfo)
+        # remove connections from this item, and constraints to this item
+        self.disconnect_many(
+            [
+                *self._connections.query(item=item),
+                *self._connections.query(connected=item),
+            ]
+        )
 
     def reconnect_item(
         self,
@@ -185,19 +308,68 @@ class Connections:
 
         if cinfo.constraint:
             self._solver.remove_constraint(cinfo.constraint)
-        self._connections.delete(item=cinfo.item, handle=cinfo.handle)
-
-        self._connections.insert(
-            item,
-            handle,
-            cinfo.connected,
-            port or cinfo.port,
-            constraint,
-            cinfo.callback,
+        self._remove(cinfo)
+
+        self._insert(
+            [
+                Connection(
+                    item,
+                    handle,
+                    cinfo.connected,
+                    port or cinfo.port,
+                    constraint,  # type: ignore[arg-type]
+                    cinfo.callback,
+                )
+            ]
         )
         if constraint:
             self._solver.add_constraint(constraint)
 
+    def neighbours(self, item: Item) -> Collection[Item]:
+        """Items connected to ``item``, in either direction.
+
+        An item connected to itself is its own neighbour.
+        """
+        return self._adjacency.get(item, {}).keys()
+
+    def degree(self, item: Item) -> int:
+        """The number of connections from and to ``item``."""
+        return sum(self._adjacency.get(item, {}).values())
+
+    def reachable(self, item: Item) -> set[Item]:
+        """All items that are connected to ``item``, directly or via other
+        items, including ``item`` itself.
+
+        >>> c = Connections()
+        >>> from gaphas import item
+        >>> i, ii, iii = item.Line(c), item.Line(c), item.Line(c)
+        >>> c.connect_item(i, i.handles()[0], ii, ii.ports()[0])
+        >>> c.connect_item(iii, iii.handles()[0], ii, ii.ports()[0])
+        >>> c.reachable(i) == {i, ii, iii}
+        True
+        """
+        adjacency = self._adjacency
+        found = {item}
+        stack = [item]
+        while stack:
+            for neighbour in adjacency.get(stack.pop(), ()):
+                if neighbour not in found:
+                    found.add(neighbour)
+                    stack.append(neighbour)
+        return found
+
+    def connected_components(self) -> Iterator[set[Item]]:
+        """Iterate the groups of items that are connected to each other.
+
+        Items without connections are not part of any group.
+        """
+        seen: set[Item] = set()
+        for item in list(self._adjacency):
+            if item not in seen:
+                component = self.reachable(item)
+                seen.update(component)
+                yield component
+
     def get_connection(self, handle: Handle) -> Connection | None:
         """Get connection information for specified handle.
 
@@ -213,10 +385,7 @@ class Connections:
         >>> c.get_connection(i.handles()[1])     # doctest: +ELLIPSIS
         >>> c.get_connection(ii.handles()[0])    # doctest: +ELLIPSIS
         """
-        try:
-            return next(self._connections.query(handle=handle))
-        except StopIteration:
-            return None
+        return self._connections.get(handle=handle)
 
     def get_connections(
         self,
@@ -4,9 +4,14 @@ from functools import singledispatch
 from typing import Callable, Protocol
 
 from gaphas.connections import Connections
-from gaphas.geometry import intersect_line_line
+from gaphas.geometry import (
+    BATCH_SIZE,
+    distance_line_point_many,
+    intersect_line_line,
+    numpy,
+)
 from gaphas.handle import Handle
-from gaphas.item import Element, Item, Line, matrix_i2i
+from gaphas.item import SEGMENT_INDEX_SIZE, Element, Item, Line, matrix_i2i
 from gaphas.port import LinePort, PointPort, Port  # noqa F401
 from gaphas.position import Position  # noqa F401
 from gaphas.solver import Constraint
@@ -135,12 +140,19 @@ class ItemConnectionSink:
     def glue(
         self, pos: SupportsFloatPos, secondary_pos: SupportsFloatPos | None = None
     ) -> Pos | None:
+        ports = [p for p in self.item.ports() if p.connectable]
+        if numpy and len(ports) > BATCH_SIZE:
+            line_ports = [
+                p
+                for p in ports
+                if isinstance(p, LinePort) and type(p).glue is LinePort.glue
+            ]
+            if len(line_ports) == len(ports):
+                return self._glue_line_ports(line_ports, pos)
+
         max_dist = self.distance
         glue_pos = None
-        for p in self.item.ports():
-            if not p.connectable:
-                continue
-
+        for p in ports:
             g, d = p.glue(pos)
 
             if d < max_dist:
@@ -149,6 +161,22 @@ class ItemConnectionSink:
                 glue_pos = g
         return glue_pos
 
+    def _glue_line_ports(
+        self, ports: list[LinePort], pos: SupportsFloatPos
+    ) -> Pos | None:
+        """Glue to the nearest of many line ports in one go."""
+        starts = numpy.array([p.start.tuple() for p in ports], dtype=float)
+        ends = numpy.array([p.end.tuple() for p in ports], dtype=float)
+        distances, points = distance_line_point_many(
+            starts, ends, (float(pos[0]), float(pos[1]))
+        )
+        i = int(distances.argmin())
+        if distances[i] >= self.distance:
+            return None
+        self.port = ports[i]
+        x, y = points[i].tolist()
+        return x, y
+
     def constraint(self, item: Item, handle: Handle) -> Constraint:
         assert self.port, "constraint() can only be called after glue()"
         return self.port.constraint(item, handle, self.item)
@@ -177,3 +205,27 @@ class ElementConnectionSink(ItemConnectionSink):
                     return point_on_line
 
         return None
+
+
+@ConnectionSink.register(Line)
+class LineConnectionSink(ItemConnectionSink):
+    def glue(
+        self, pos: SupportsFloatPos, secondary_pos: SupportsFloatPos | None = None
+    ) -> Pos | None:
+        line = self.item
+        assert isinstance(line, Line)
+        if len(line.handles()) <= SEGMENT_INDEX_SIZE or not (
+            ports := line.segment_ports
+        ):
+            return super().glue(pos, secondary_pos)
+
+        max_dist = self.distance
+        for d, segment, glue_pos in line.segment_index().iter_nearest(
+            (float(pos[0]), float(pos[1])), max_dist
+        ):
+            if d >= max_dist:
+                break
+            if (port := ports[segment]).connectable:
+                self.port = port
+                return glue_pos
+        return None
@@ -19,6 +19,8 @@ BalanceConstraint
 LineConstraint
     Solves the equation where a line is connected to a line or side at
     a specific point.
+RectangleConstraint
+    Keeps four positions on the corners of a rectangle with a minimal size.
 
 New constraint class should derive from Constraint class abstract
 class and implement `Constraint.solve_for(Variable)` method to update
@@ -121,6 +123,8 @@ class EqualsConstraint(BaseConstraint):
     Variable(10.8, 20)
     """
 
+    __slots__ = ("a", "b", "delta")
+
     def __init__(self, a=None, b=None, delta=0.0):
         super().__init__(a, b, delta)
         self.a = a
@@ -162,6 +166,8 @@ class CenterConstraint(BaseConstraint):
     Variable(6.5, 20)
     """
 
+    __slots__ = ("a", "b", "center")
+
     def __init__(self, a=None, b=None, center=None):
         super().__init__(a, b, center)
         self.a = a
@@ -200,6 +206,8 @@ class LessThanConstraint(BaseConstraint):
     (Variable(10, 20), Variable(15, 20))
     """
 
+    __slots__ = ("bigger", "delta", "smaller")
+
     def __init__(self, smaller=None, bigger=None, delta=0.0):
         super().__init__(smaller, bigger, delta)
         self.smaller = smaller
@@ -244,6 +252,8 @@ class BalanceConstraint(BaseConstraint):
     (Variable(3, 20), Variable(2, 20), Variable(2.45, 10))
     """
 
+    __slots__ = ("balance", "band", "v")
+
     def __init__(self, band=None, v=None, balance=None):
         super().__init__(band[0], band[1], v)
         self.band = band
@@ -273,6 +283,8 @@ class LineConstraint(BaseConstraint):
      - _point: point defined by tuple (x, y)
     """
 
+    __slots__ = ("_line", "_point", "ratio")
+
     def __init__(self, line, point):
         super().__init__(
             line[0][0], line[0][1], line[1][0], line[1][1], point[0], point[1]
@@ -342,6 +354,67 @@ class LineConstraint(BaseConstraint):
         _update(py, y)
 
 
+class RectangleConstraint(BaseConstraint):
+    """Keep four positions on the corners of a rectangle, with a minimal width
+    and height.
+
+    This does the work of two horizontal, two vertical, and two minimal size
+    constraints. Of two corners on the same side, the corner that has not
+    been moved lately is moved to the other corner. If the rectangle becomes
+    too small, the side that has been moved lately is pushed back.
+
+    >>> nw, ne = Position(0, 0), Position(10, 0)
+    >>> se, sw = Position(10, 10), Position(0, 10)
+    >>> rect = RectangleConstraint(nw, ne, se, sw, min_width=5, min_height=5)
+    >>> se.pos = (20, 2)
+    >>> rect.solve()
+    >>> ne.pos, se.pos, sw.pos
+    ((Variable(20, 20), Variable(0, 20)), (Variable(20, 20), Variable(5, 20)), (Variable(0, 20), Variable(5, 20)))
+    """
+
+    __slots__ = ("_corners", "min_height", "min_width")
+
+    def __init__(self, nw, ne, se, sw, min_width=0.0, min_height=0.0):
+        # South-west goes before south-east, so corners give in in the same
+        # order as for separate horizontal and vertical constraints
+        super().__init__(*nw, *ne, *sw, *se, min_width, min_height)
+        self._corners = (nw, ne, se, sw)
+        self.min_width = min_width
+        self.min_height = min_height
+
+    def solve_for(self, var=None):
+        """Solve the constraint as a whole, the variable is not used."""
+        (nw_x, nw_y), (ne_x, ne_y), (se_x, se_y), (sw_x, sw_y) = self._corners
+        # Variables that have been moved lately come last, stronger variables
+        # have not been moved at all
+        weakest = self._weakest
+        order = {key: n for n, (key, _) in enumerate(weakest)}
+        strong = len(weakest)
+
+        def moved(v):
+            return order.get(id(v), strong)
+
+        for (a0, a1), (b0, b1), min_size in (
+            ((nw_x, sw_x), (ne_x, se_x), self.min_width),
+            ((nw_y, ne_y), (sw_y, se_y), self.min_height),
+        ):
+            a_moved = max(moved(a0), moved(a1))
+            b_moved = max(moved(b0), moved(b1))
+            for v0, v1 in ((a0, a1), (b0, b1)):
+                if moved(v0) < moved(v1):
+                    _update(v0, v1.value)
+                else:
+                    _update(v1, v0.value)
+
+            if a0.value > b0.value - min_size:
+                if a_moved > b_moved:
+                    _update(a0, b0.value - min_size)
+                    _update(a1, b0.value - min_size)
+                else:
+                    _update(b0, a0.value + min_size)
+                    _update(b1, a0.value + min_size)
+
+
 class PositionConstraint(BaseConstraint):
     """Ensure that point is always in origin position.
 
@@ -350,6 +423,8 @@ class PositionConstraint(BaseConstraint):
      - _point: point to be in origin position
     """
 
+    __slots__ = ("_origin", "_point")
+
     def __init__(self, origin, point):
         super().__init__(origin[0], origin[1], point[0], point[1])
 
@@ -390,6 +465,8 @@ class LineAlignConstraint(BaseConstraint):
         Padding of the align.
     """
 
+    __slots__ = ("_align", "_delta", "_line", "_point")
+
     def __init__(self, line, point, align=0.5, delta=0.0):
         super().__init__(
             line[0][0], line[0][1], line[1][0], line[1][1], point[0], point[1]
@@ -10,10 +10,22 @@ from __future__ import annotations
 
 from math import sqrt
 from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike, NDArray
 
 Point = tuple[float, float]  # x, y
 Rect = tuple[float, float, float, float]  # x, y, width, height
 
+# Use the batch functions, if NumPy is available, from this many primitives on.
+BATCH_SIZE = 64
+
 
 class Rectangle:
     """Python Rectangle implementation. Rectangles can be added (union),
@@ -572,3 +584,93 @@ def rectangle_clip(recta: Rect, rectb: Rect) -> Rect | None:
     w = min(ax + aw, bx + bw) - x
     h = min(ay + ah, by + bh) - y
     return None if w < 0 or h < 0 else (x, y, w, h)
+
+
+# Batch variants of the functions above. These work on NumPy arrays of
+# points (shape ``(n, 2)``) and rectangles (shape ``(n, 4)``), and require
+# NumPy to be installed. A single point or rectangle is broadcast.
+
+
+def distance_line_point_many(
+    line_starts: ArrayLike, line_ends: ArrayLike, points: ArrayLike
+) -> tuple[NDArray[numpy.float64], NDArray[numpy.float64]]:
+    """Calculate the distances of ``points`` from lines, like
+    :func:`distance_line_point`.
+
+    Arrays are returned containing the distances and the points on the lines.
+
+    >>> d, p = distance_line_point_many([(0, 0), (0, 0)], [(2, 0), (0, 2)], (1, 1))
+    >>> d.tolist(), p.tolist()
+    ([1.0, 1.0], [[1.0, 0.0], [0.0, 1.0]])
+    """
+    starts = numpy.asarray(line_starts, dtype=float)
+    line = numpy.asarray(line_ends, dtype=float) - starts
+    point = numpy.asarray(points, dtype=float) - starts
+
+    line_len_sqr = (line * line).sum(axis=-1)
+    # Both points are very near each other: closest point is the start
+    short = line_len_sqr < 0.0001
+    projlen = (line * point).sum(axis=-1) / numpy.where(short, 1.0, line_len_sqr)
+    projlen = numpy.where(short, 0.0, numpy.clip(projlen, 0.0, 1.0))
+
+    proj = line * projlen[..., None]
+    distances = numpy.hypot(*numpy.moveaxis(proj - point, -1, 0))
+    return distances, starts + proj
+
+
+def distance_rectangle_point_many(
+    rects: ArrayLike, points: ArrayLike
+) -> NDArray[numpy.float64]:
+    """Return the distances (fast) from rectangles ``(x, y, width, height)``
+    to ``points``, like :func:`distance_rectangle_point`.
+
+    >>> distance_rectangle_point_many([(0, 0, 10, 10), (20, 0, 5, 5)], (12, 2)).tolist()
+    [2.0, 8.0]
+    """
+    rx, ry, rw, rh = numpy.moveaxis(numpy.asarray(rects, dtype=float), -1, 0)
+    px, py = numpy.moveaxis(numpy.asarray(points, dtype=float), -1, 0)
+    dx = numpy.maximum(numpy.maximum(rx - px, px - rx - rw), 0.0)
+    dy = numpy.maximum(numpy.maximum(ry - py, py - ry - rh), 0.0)
+    return dx + dy  # type: ignore[no-any-return]
+
+
+def point_on_rectangle_many(
+    rects: ArrayLike, points: ArrayLike, border: bool = False
+) -> NDArray[numpy.float64]:
+    """Return the points on which ``points`` can be projected on the
+    rectangles, like :func:`point_on_rectangle`.
+
+    >>> point_on_rectangle_many([(0, 0, 10, 10)], [(12, 2), (4, 5)], border=True).tolist()
+    [[10.0, 2.0], [0.0, 5.0]]
+    """
+    rx, ry, rw, rh = numpy.moveaxis(numpy.asarray(rects, dtype=float), -1, 0)
+    px, py = numpy.moveaxis(numpy.asarray(points, dtype=float), -1, 0)
+    rx1 = rx + rw
+    ry1 = ry + rh
+    x = numpy.clip(px, rx, rx1)
+    y = numpy.clip(py, ry, ry1)
+
+    if border:
+        inside = (x == px) & (y == py)
+        snap_y = inside & (
+            numpy.minimum(px - rx, rx1 - px) > numpy.minimum(py - ry, ry1 - py)
+        )
+        snap_x = inside & ~snap_y
+        x = numpy.where(snap_x, numpy.where(px < rx + rw / 2.0, rx, rx1), x)
+        y = numpy.where(snap_y, numpy.where(py < ry + rh / 2.0, ry, ry1), y)
+
+    return numpy.stack(numpy.broadcast_arrays(x, y), axis=-1)
+
+
+def rectangle_intersects_many(
+    rects: ArrayLike, rect: ArrayLike
+) -> NDArray[numpy.bool_]:
+    """Return for each of ``rects`` if it intersects with ``rect``, like
+    :func:`rectangle_intersects`.
+
+    >>> rectangle_intersects_many([(5, 5, 20, 20), (40, 30, 10, 1)], (10, 10, 1, 1)).tolist()
+    [True, False]
+    """
+    ax, ay, aw, ah = numpy.moveaxis(numpy.asarray(rects, dtype=float), -1, 0)
+    bx, by, bw, bh = numpy.moveaxis(numpy.asarray(rect, dtype=float), -1, 0)
+    return (ax <= bx + bw) & (ax + aw >= bx) & (ay <= by + bh) & (ay + ah >= by)  # type: ignore[no-any-return]
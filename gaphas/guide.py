@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, Iterable, SupportsFloat
 
 from gaphas.canvas import all_children
 from gaphas.connector import Handle
+from gaphas.geometry import BATCH_SIZE, numpy
 from gaphas.handlemove import HandleMove, ItemHandleMove
 from gaphas.item import Element, Item, Line
 from gaphas.move import ItemMove, Move
@@ -135,6 +136,9 @@ def get_excluded_items(view, item):
 
 
 def find_closest(item_edges, edges, margin=MARGIN):
+    if numpy and len(item_edges) * len(edges) > BATCH_SIZE:
+        return find_closest_many(item_edges, edges, margin)
+
     delta = 0
     min_d = 1000
     closest = []
@@ -151,6 +155,18 @@ def find_closest(item_edges, edges, margin=MARGIN):
     return (delta, closest) if min_d <= margin else (0, ())
 
 
+def find_closest_many(item_edges, edges, margin=MARGIN):
+    """Like ``find_closest()``, with NumPy, for many edges."""
+    edges = numpy.fromiter(edges, dtype=float, count=len(edges))
+    deltas = numpy.subtract.outer(edges, numpy.asarray(item_edges, dtype=float))
+    distances = numpy.abs(deltas)
+    min_d = distances.min()
+    if min_d > margin:
+        return 0, ()
+    rows, columns = numpy.nonzero(distances == min_d)
+    return float(deltas[rows[0], columns[0]]), edges[rows].tolist()
+
+
 def update_guides(view, handle, vedges, hedges, excluded_items=frozenset()):
     dx, edges_x = find_vertical_guides(
         view, handle, vedges, view.get_height(), excluded_items, MARGIN
@@ -22,6 +22,15 @@ class Handle:
     or ``function`` objects.
     """
 
+    __slots__ = (
+        "__weakref__",
+        "_connectable",
+        "_glued",
+        "_movable",
+        "_pos",
+        "_visible",
+    )
+
     def __init__(
         self,
         pos: Pos = (0, 0),
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import math
 from functools import singledispatch
 from operator import itemgetter
 from typing import TYPE_CHECKING, Iterable, Sequence, Iterator
@@ -8,6 +9,7 @@ from typing import TYPE_CHECKING, Iterable, Sequence, Iterator
 from gaphas.connector import ConnectionSink, ConnectionSinkType, Connector
 from gaphas.handle import Handle
 from gaphas.item import Item
+from gaphas.model import Model
 from gaphas.types import Pos
 
 if TYPE_CHECKING:
@@ -120,28 +122,30 @@ def item_distance(
     distance: float = 0.5,
     exclude: Sequence[Item] = (),
 ) -> Iterable[tuple[float, Item]]:
-    """Return the topmost item located at ``pos`` (x, y).
+    """Return items near ``pos`` (x, y), with their distance, nearest first.
 
     Parameters:
         - view: a view
         - pos: Position, a tuple ``(x, y)`` in view coordinates
-        - selected: if False returns first non-selected item
+        - exclude: items to skip
     """
-    item: Item
     vx, vy = pos
-    rect = (vx - distance, vy - distance, distance * 2, distance * 2)
-    for item in reversed(list(view.get_items_in_rectangle(rect))):
-        if item in exclude:
-            continue
 
+    def item_point_distance(item: Item) -> float:
+        if item in exclude:
+            return math.inf
         v2i = view.get_matrix_v2i(item)
         ix, iy = v2i.transform_point(vx, vy)
         d = item.point(ix, iy)
         if d is None:
             log.warning("Item distance is None for %s", item)
-            continue
-        if d < distance:
-            yield d, item
+            return math.inf
+        return d
+
+    for d, item in view.get_items_nearest(pos, distance, item_point_distance):
+        if d >= distance:
+            return
+        yield d, item
 
 
 def order_items(distance_items, key=itemgetter(0)):
@@ -166,11 +170,28 @@ def item_at_point(
 ) -> Iterator[Item]:
     """Return the topmost item located at ``pos`` (x, y).
 
+    Items that contain the point come first, then items near the point,
+    nearest first. Items further away are only looked up when needed.
+
     Parameters:
         - view: a view
         - pos: Position, a tuple ``(x, y)`` in view coordinates
-        - selected: if False returns first non-selected item
+        - exclude: items to skip
     """
-    return (
-        item for _d, item in order_items(item_distance(view, pos, distance, exclude))
-    )
+    model = view.model
+    assert model
+    nearby = item_distance(view, pos, distance, exclude)
+    inside: dict[Item, float] = {}
+    for d, item in nearby:
+        if d > 0:
+            yield from _topmost_first(model, inside)
+            yield item
+            yield from (item for _d, item in nearby)
+            return
+        inside[item] = d
+    yield from _topmost_first(model, inside)
+
+
+def _topmost_first(model: Model, inside: dict[Item, float]) -> Iterator[Item]:
+    topmost = [(inside[item], item) for item in reversed(list(model.sort(inside)))]
+    return (item for _d, item in order_items(topmost))
@@ -0,0 +1,372 @@
+"""
+Hash grid
+=========
+
+A hash grid divides the plane in square cells of equal size. Only the cells
+that contain items are stored, in a dictionary. An item is stored in all cells
+its bounding box overlaps.
+
+Adding, moving and removing items is cheap, as long as items are not much
+larger than a cell. Items that cover many cells are kept in a separate list,
+that is checked on every query.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from itertools import chain, count, islice
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+from gaphas.geometry import Point, Rect
+
+T = TypeVar("T")
+
+# Cell range: (i0, j0, i1, j1), inclusive
+Cells = tuple[int, int, int, int]
+
+
+class HashGrid(Generic[T]):
+    """A spatial hash on a uniform grid.
+
+    Rectangles use the same scheme throughout Gaphas: (x, y, width, height).
+
+    >>> grid = HashGrid(cell_size=50)
+    >>> for i in range(20):
+    ...     grid.add(f"{i}", (i * 10, 0, 5, 5))
+    >>> len(grid)
+    20
+    >>> sorted(grid.find_inside((0, 0, 30, 10)))
+    ['0', '1', '2']
+    >>> grid.soft_bounds
+    (0, 0, 195, 5)
+    """
+
+    def __init__(self, cell_size: float = 100.0, max_cells: int = 64) -> None:
+        """Create a new hash grid.
+
+        Items that cover more than ``max_cells`` cells are not stored in the grid
+        cells.
+        """
+        if cell_size <= 0:
+            raise ValueError("Cell size should be larger than 0")
+        self._cell_size = cell_size
+        self._max_cells = max_cells
+        self._cells: dict[tuple[int, int], set[T]] = {}
+        # Items that cover too many cells
+        self._large: set[T] = set()
+        # Easy lookup item->(bounds, cells)
+        self._ids: dict[T, tuple[Rect, Cells | None]] = {}
+        # Cached (x0, y0, x1, y1) of all items
+        self._extents: tuple[float, float, float, float] | None = None
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    @property
+    def soft_bounds(self) -> Rect:
+        """The bounding box of all items, as (x, y, width, height)."""
+        if not self._ids:
+            return 0, 0, 0, 0
+        if self._extents is None:
+            x0s, y0s, x1s, y1s = zip(
+                *((x, y, x + w, y + h) for (x, y, w, h), _ in self._ids.values())
+            )
+            self._extents = min(x0s), min(y0s), max(x1s), max(y1s)
+        x0, y0, x1, y1 = self._extents
+        return x0, y0, x1 - x0, y1 - y0
+
+    def add(self, item: T, bounds: Rect) -> None:
+        """Add an item to the grid.
+
+        If an item already exists, its bounds are updated.
+        """
+        cells = self._cells_for(bounds)
+        if item in self._ids:
+            old_bounds, old_cells = self._ids[item]
+            self._shrink(old_bounds)
+            if old_cells != cells or old_cells is None:
+                self._unlink(item, old_cells)
+                self._link(item, cells)
+        else:
+            self._link(item, cells)
+        self._ids[item] = (bounds, cells)
+        self._extend(bounds)
+
+    def load(self, items: Iterable[tuple[T, Rect]]) -> None:
+        """Add many items at once."""
+        for item, bounds in items:
+            self.add(item, bounds)
+
+    def remove(self, item: T) -> None:
+        """Remove an item from the grid."""
+        if item in self._ids:
+            bounds, cells = self._ids.pop(item)
+            self._unlink(item, cells)
+            self._shrink(bounds)
+
+    def clear(self) -> None:
+        """Remove all items from the grid."""
+        self._cells.clear()
+        self._large.clear()
+        self._ids.clear()
+        self._extents = None
+
+    def get_bounds(self, item: T) -> Rect:
+        """Return the bounding box for the given item."""
+        return self._ids[item][0]
+
+    def find_inside(self, rect: Rect) -> set[T]:
+        """Find all items in the given rectangle (x, y, with, height)."""
+        rx, ry, rw, rh = rect
+        rx1 = rx + rw
+        ry1 = ry + rh
+        ids = self._ids
+        found = set()
+        for item in self._candidates(rect, None):
+            (x, y, w, h), _ = ids[item]
+            if rx <= x and ry <= y and rx1 >= x + w and ry1 >= y + h:
+                found.add(item)
+        return found
+
+    def find_intersect(self, rect: Rect) -> set[T]:
+        """Find all items that intersect with the given rectangle (x, y, width,
+        height)."""
+        rx, ry, rw, rh = rect
+        rx1 = rx + rw
+        ry1 = ry + rh
+        ids = self._ids
+        # Items in cells that lie within the rectangle intersect for sure
+        found: set[T] = set()
+        for item in self._candidates(rect, found):
+            (x, y, w, h), _ = ids[item]
+            if x <= rx1 and x + w >= rx and y <= ry1 and y + h >= ry:
+                found.add(item)
+        return found
+
+    def find_nearest(
+        self,
+        point: Point,
+        k: int = 1,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> list[tuple[float, T]]:
+        """Find the ``k`` items nearest to ``point``.
+
+        Returns a list of ``(distance, item)`` tuples, nearest first.
+
+        >>> grid = HashGrid(cell_size=50)
+        >>> for i in range(10):
+        ...     grid.add(f"{i}", (i * 10, 0, 5, 5))
+        >>> grid.find_nearest((32, 2), k=2)
+        [(0.0, '3'), (7.0, '2')]
+        """
+        return list(islice(self.iter_nearest(point, max_distance, distance_fn), k))
+
+    def iter_nearest(
+        self,
+        point: Point,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> Iterator[tuple[float, T]]:
+        """Iterate ``(distance, item)`` tuples for items near ``point``,
+        nearest first.
+
+        Cells are visited in rings around the cell that contains the point.
+
+        See :meth:`gaphas.quadtree.Quadtree.iter_nearest`.
+        """
+        px, py = point
+        size = self._cell_size
+        cells = self._cells
+        ids = self._ids
+        # Distance for items that contain the point, if exact distances may be negative
+        inside = -math.inf if distance_fn else 0.0
+
+        def distance_to(item: T) -> float:
+            (x, y, w, h), _ = ids[item]
+            dx = x - px if px < x else px - x - w if px > x + w else 0.0
+            dy = y - py if py < y else py - y - h if py > y + h else 0.0
+            return math.hypot(dx, dy) if dx or dy else inside
+
+        ci = math.floor(px / size)
+        cj = math.floor(py / size)
+        # No items lie beyond this ring
+        if cells:
+            i0, j0, i1, j1 = self._cell_range(self.soft_bounds)
+            last_ring = max(ci - i0, i1 - ci, cj - j0, j1 - cj)
+            if max_distance < math.inf:
+                last_ring = min(last_ring, math.ceil(max_distance / size) + 1)
+        else:
+            last_ring = -1
+
+        seen = set(self._large)
+        # Entries are (distance, seq, item, exact)
+        seq = count()
+        heap = [(distance_to(item), next(seq), item, False) for item in seen]
+        heapq.heapify(heap)
+        push = heapq.heappush
+        pop = heapq.heappop
+        ring = 0
+        while True:
+            if ring > last_ring:
+                bound = math.inf
+            elif ring == 0:
+                bound = inside
+            else:
+                # Items in this ring and further lie outside the cells visited so far
+                bound = min(
+                    px - (ci - ring + 1) * size,
+                    (ci + ring) * size - px,
+                    py - (cj - ring + 1) * size,
+                    (cj + ring) * size - py,
+                )
+
+            while heap and heap[0][0] <= bound:
+                distance, _, item, exact = pop(heap)
+                if distance > max_distance:
+                    return
+                if exact or not distance_fn:
+                    yield distance, item
+                elif (d := distance_fn(item, point)) <= max_distance:
+                    push(heap, (d, next(seq), item, True))
+
+            if ring > last_ring or bound > max_distance:
+                return
+
+            for cell in self._ring(ci, cj, ring):
+                for item in cell - seen:
+                    seen.add(item)
+                    if (d := distance_to(item)) <= max_distance:
+                        push(heap, (d, next(seq), item, False))
+            ring += 1
+
+    def __len__(self) -> int:
+        """Return number of items in grid."""
+        return len(self._ids)
+
+    def __contains__(self, item: T) -> bool:
+        """Check if an item is in grid."""
+        return item in self._ids
+
+    def _cells_for(self, bounds: Rect) -> Cells | None:
+        """The range of cells covered by ``bounds``, or ``None`` for items that
+        cover too many cells."""
+        cells = self._cell_range(bounds)
+        i0, j0, i1, j1 = cells
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > self._max_cells:
+            return None
+        return cells
+
+    def _cell_range(self, bounds: Rect) -> Cells:
+        x, y, w, h = bounds
+        size = self._cell_size
+        i0 = math.floor(x / size)
+        j0 = math.floor(y / size)
+        i1 = math.floor((x + w) / size)
+        j1 = math.floor((y + h) / size)
+        return min(i0, i1), min(j0, j1), max(i0, i1), max(j0, j1)
+
+    def _link(self, item: T, cells: Cells | None) -> None:
+        if cells is None:
+            self._large.add(item)
+            return
+        grid = self._cells
+        i0, j0, i1, j1 = cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                if cell := grid.get((i, j)):
+                    cell.add(item)
+                else:
+                    grid[i, j] = {item}
+
+    def _unlink(self, item: T, cells: Cells | None) -> None:
+        if cells is None:
+            self._large.discard(item)
+            return
+        grid = self._cells
+        i0, j0, i1, j1 = cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = grid[i, j]
+                cell.discard(item)
+                if not cell:
+                    del grid[i, j]
+
+    def _candidates(self, rect: Rect, found: set[T] | None) -> set[T]:
+        """Items that may be in ``rect``.
+
+        If ``found`` is provided, items from cells that lie within ``rect``
+        entirely are added to ``found`` instead.
+        """
+        i0, j0, i1, j1 = self._cell_range(rect)
+        candidates = set(self._large)
+        grid = self._cells
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(grid):
+            matching = (
+                (key, cell)
+                for key, cell in grid.items()
+                if i0 <= key[0] <= i1 and j0 <= key[1] <= j1
+            )
+        else:
+            matching = (
+                ((i, j), cell)
+                for i in range(i0, i1 + 1)
+                for j in range(j0, j1 + 1)
+                if (cell := grid.get((i, j)))
+            )
+        for (i, j), cell in matching:
+            if found is not None and i0 < i < i1 and j0 < j < j1:
+                found.update(cell)
+            else:
+                candidates.update(cell)
+        return candidates - found if found else candidates
+
+    def _ring(self, ci: int, cj: int, ring: int) -> Iterator[set[T]]:
+        """The cells at a distance of ``ring`` cells from cell ``(ci, cj)``."""
+        grid = self._cells
+        if ring == 0:
+            if cell := grid.get((ci, cj)):
+                yield cell
+        elif 8 * ring > len(grid):
+            for (i, j), cell in grid.items():
+                if max(abs(i - ci), abs(j - cj)) == ring:
+                    yield cell
+        else:
+            rows = (
+                (ci + n, cj + m) for n in range(-ring, ring + 1) for m in (-ring, ring)
+            )
+            columns = (
+                (ci + m, cj + n) for n in range(1 - ring, ring) for m in (-ring, ring)
+            )
+            for key in chain(rows, columns):
+                if cell := grid.get(key):
+                    yield cell
+
+    def _extend(self, bounds: Rect) -> None:
+        if (extents := self._extents) is None:
+            if len(self._ids) == 1:
+                x, y, w, h = bounds
+                self._extents = x, y, x + w, y + h
+            return
+        x, y, w, h = bounds
+        self._extents = (
+            min(extents[0], x),
+            min(extents[1], y),
+            max(extents[2], x + w),
+            max(extents[3], y + h),
+        )
+
+    def _shrink(self, bounds: Rect) -> None:
+        """Invalidate the extents if an item on the edge is moved or removed."""
+        if (extents := self._extents) is None:
+            return
+        x, y, w, h = bounds
+        if (
+            x <= extents[0]
+            or y <= extents[1]
+            or x + w >= extents[2]
+            or y + h >= extents[3]
+        ):
+            self._extents = None
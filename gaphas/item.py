@@ -8,15 +8,27 @@ from typing import TYPE_CHECKING, Iterable, Protocol, Sequence, runtime_checkabl
 
 from cairo import Context as CairoContext
 
-from gaphas.constraint import Constraint, EqualsConstraint, constraint
-from gaphas.geometry import distance_line_point, distance_rectangle_border_point
+from gaphas.constraint import Constraint, EqualsConstraint, RectangleConstraint
+from gaphas.geometry import (
+    BATCH_SIZE,
+    distance_line_point,
+    distance_line_point_many,
+    distance_rectangle_border_point,
+    numpy,
+)
 from gaphas.handle import Handle
 from gaphas.matrix import Matrix
 from gaphas.port import LinePort, Port
-from gaphas.solver import REQUIRED, VERY_STRONG, variable
+from gaphas.segmentindex import SegmentIndex
+from gaphas.solver import REQUIRED, VERY_STRONG, Variable, variable
 
 if TYPE_CHECKING:
     from gaphas.connections import Connections
+    from gaphas.position import Position
+
+# Lines with more segments than this use a segment index for hit testing,
+# splitting and gluing.
+SEGMENT_INDEX_SIZE = 256
 
 
 @dataclass(frozen=True)
@@ -130,15 +142,18 @@ class Element(Matrices):
         # initialize min_x variables
         self.min_width, self.min_height = 10, 10
 
-        add = connections.add_constraint
-        add(self, constraint(horizontal=(h_nw.pos, h_ne.pos)))
-        add(self, constraint(horizontal=(h_sw.pos, h_se.pos)))
-        add(self, constraint(vertical=(h_nw.pos, h_sw.pos)))
-        add(self, constraint(vertical=(h_ne.pos, h_se.pos)))
-
-        # create minimal size constraints
-        add(self, constraint(left_of=(h_nw.pos, h_se.pos), delta=self.min_width))
-        add(self, constraint(above=(h_nw.pos, h_se.pos), delta=self.min_height))
+        # keep the handles on the corners, with a minimal size
+        connections.add_constraint(
+            self,
+            RectangleConstraint(
+                h_nw.pos,
+                h_ne.pos,
+                h_se.pos,
+                h_sw.pos,
+                min_width=self.min_width,
+                min_height=self.min_height,
+            ),
+        )
 
         self.width = width
         self.height = height
@@ -220,14 +235,36 @@ class Element(Matrices):
 def create_orthogonal_constraints(
     handles: Sequence[Handle], horizontal: bool
 ) -> Iterable[Constraint]:
+    for a, b in _orthogonal_variables(handles, horizontal):
+        yield EqualsConstraint(a=a, b=b)
+
+
+def _orthogonal_variables(
+    handles: Sequence[Handle], horizontal: bool
+) -> Iterable[tuple[Variable, Variable]]:
+    """The variables to keep equal for each segment of an orthogonal line."""
     rest = 1 if horizontal else 0
     for pos, (h0, h1) in enumerate(zip(handles, handles[1:])):
         p0 = h0.pos
         p1 = h1.pos
         if pos % 2 == rest:
-            yield EqualsConstraint(a=p0.x, b=p1.x)
+            yield p0.x, p1.x
         else:
-            yield EqualsConstraint(a=p0.y, b=p1.y)
+            yield p0.y, p1.y
+
+
+def _line_ports_on(
+    positions: Sequence[Position], ports: Sequence[Port]
+) -> Sequence[LinePort] | None:
+    """The ports, if they are plain line ports between consecutive
+    ``positions``."""
+    line_ports = [port for port in ports if type(port) is LinePort]
+    if len(line_ports) == len(ports) == len(positions) - 1 and all(
+        port.start is start and port.end is end
+        for port, start, end in zip(line_ports, positions, positions[1:])
+    ):
+        return line_ports
+    return None
 
 
 class Line(Matrices):
@@ -262,6 +299,10 @@ class Line(Matrices):
         self._horizontal = False
         self._orthogonal = False
         self._orthogonal_constraints: list[Constraint] = []
+        self._segment_index: SegmentIndex | None = None
+        self._segment_ports: Sequence[LinePort] | None = None
+        # Handle positions watched for changes, by id
+        self._watched: dict[int, Position] = {}
 
     @property
     def head(self) -> Handle:
@@ -288,20 +329,40 @@ class Line(Matrices):
         self._fuzziness = fuzziness
 
     def update_orthogonal_constraints(self) -> None:
-        """Update the constraints required to maintain the orthogonal line."""
+        """Update the constraints required to maintain the orthogonal line.
+
+        Constraints of segments that keep their handles and direction are
+        kept. Directions alternate along the line, so this only limits the
+        changes to the segments around an edit if an even number of handles
+        is added or removed, like when a segment is split in three. Adding
+        or removing an odd number of handles, like splitting a segment in
+        two, flips the direction of all later segments: their constraints
+        are replaced.
+        """
         # Use public `horizontal` and `orthogonal` field, so properties can be overwritten
+        if self.orthogonal and len(self._handles) >= 3:
+            wanted = list(_orthogonal_variables(self._handles, self.horizontal))
+        else:
+            wanted = []
+
+        current = {
+            (id(c.a), id(c.b)): c
+            for c in self._orthogonal_constraints
+            if isinstance(c, EqualsConstraint)
+        }
+        cons: list[Constraint] = []
+        for a, b in wanted:
+            kept = current.pop((id(a), id(b)), None)
+            cons.append(EqualsConstraint(a=a, b=b) if kept is None else kept)
+
+        old = set(self._orthogonal_constraints)
+        new = set(cons)
         for c in self._orthogonal_constraints:
-            self._connections.remove_constraint(self, c)
-        del self._orthogonal_constraints[:]
-
-        if not self.orthogonal or len(self._handles) < 3:
-            return
-
-        add = self._connections.add_constraint
-        cons = [
-            add(self, c)
-            for c in create_orthogonal_constraints(self._handles, self.horizontal)
-        ]
+            if c not in new:
+                self._connections.remove_constraint(self, c)
+        for c in cons:
+            if c not in old:
+                self._connections.add_constraint(self, c)
         self._set_orthogonal_constraints(cons)
 
     def _set_orthogonal_constraints(
@@ -346,15 +407,57 @@ class Line(Matrices):
 
     def insert_handle(self, index: int, handle: Handle) -> None:
         self._handles.insert(index, handle)
+        self._invalidate_segment_index()
 
     def remove_handle(self, handle: Handle) -> None:
         self._handles.remove(handle)
+        self._invalidate_segment_index()
 
     def insert_port(self, index: int, port: Port) -> None:
         self._ports.insert(index, port)
+        self._invalidate_segment_index()
 
     def remove_port(self, port: Port) -> None:
         self._ports.remove(port)
+        self._invalidate_segment_index()
+
+    def segment_index(self) -> SegmentIndex:
+        """An index over the segments between the handles of the line.
+
+        The index is rebuilt when it is needed after handles have been
+        moved, added or removed.
+        """
+        index = self._segment_index
+        if index is None or len(index) != len(self._handles) - 1:
+            positions = [h.pos for h in self._handles]
+            self._watch(positions)
+            index = SegmentIndex.from_points([p.tuple() for p in positions])
+            self._segment_ports = _line_ports_on(positions, self._ports)
+            self._segment_index = index
+        return index
+
+    @property
+    def segment_ports(self) -> Sequence[LinePort] | None:
+        """The ports of the line, if each segment has one line port, in
+        order, and ``None`` otherwise."""
+        self.segment_index()
+        return self._segment_ports
+
+    def _watch(self, positions: list[Position]) -> None:
+        watched = self._watched
+        current = {id(p): p for p in positions}
+        for key in watched.keys() - current.keys():
+            watched.pop(key).remove_handler(self._on_handle_moved)
+        for key in current.keys() - watched.keys():
+            current[key].add_handler(self._on_handle_moved)
+        self._watched = current
+
+    def _on_handle_moved(self, position: Position, oldpos: object) -> None:
+        self._segment_index = None
+
+    def _invalidate_segment_index(self) -> None:
+        self._segment_index = None
+        self._segment_ports = None
 
     def _update_ports(self) -> None:
         """Update line ports.
@@ -400,6 +503,14 @@ class Line(Matrices):
         """
         hpos = [h.pos for h in self._handles]
         p = (x, y)
+        if len(hpos) > SEGMENT_INDEX_SIZE:
+            nearest = self.segment_index().nearest(p)
+            assert nearest
+            return max(0.0, nearest[0] - self.fuzziness)
+        if numpy and len(hpos) > BATCH_SIZE:
+            points = numpy.array([pos.tuple() for pos in hpos], dtype=float)
+            distances, _points = distance_line_point_many(points[:-1], points[1:], p)
+            return max(0.0, float(distances.min()) - self.fuzziness)
         distance, _point = min(
             distance_line_point(start, end, p)  # type: ignore[arg-type]
             for start, end in zip(hpos[:-1], hpos[1:])
@@ -23,6 +23,8 @@ class Matrix:
     Matrix(1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
     """
 
+    __slots__ = ("__weakref__", "_handlers", "_matrix")
+
     def __init__(
         self,
         xx: float = 1.0,
@@ -34,23 +36,29 @@ class Matrix:
         matrix: cairo.Matrix | None = None,
     ) -> None:
         self._matrix = matrix or cairo.Matrix(xx, yx, xy, yy, x0, y0)
-        self._handlers: set[Callable[[Matrix, Matrixtuple], None]] = set()
+        # Created when the first handler is added
+        self._handlers: set[Callable[[Matrix, Matrixtuple], None]] | None = None
 
     def add_handler(
         self,
         handler: Callable[[Matrix, Matrixtuple], None],
     ) -> None:
-        self._handlers.add(handler)
+        if self._handlers is None:
+            self._handlers = {handler}
+        else:
+            self._handlers.add(handler)
 
     def remove_handler(
         self,
         handler: Callable[[Matrix, Matrixtuple], None],
     ) -> None:
-        self._handlers.discard(handler)
+        if self._handlers:
+            self._handlers.discard(handler)
 
     def notify(self, old: Matrixtuple) -> None:
-        for handler in self._handlers:
-            handler(self, old)
+        if self._handlers:
+            for handler in self._handlers:
+                handler(self, old)
 
     def invert(self) -> None:
         old: Matrixtuple = self.tuple()
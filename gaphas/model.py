@@ -10,17 +10,13 @@ from gaphas.item import Item
 class View(Protocol):
     def request_update(
         self,
-        items: Collection[Item],
-        matrix_only_items: Collection[Item],
-        removed_items: Collection[Item],
+        items: Iterable[Item],
+        removed_items: Iterable[Item] = (),
     ) -> None:
         """Propagate update requests to the view.
 
-        By invoking this method, the View will be made aware of state changes,
-        that will either:
-
-        1. Cause the item to be fully updated
-        2. Just cause the item to move, without any further updates.
+        By invoking this method, the View will be made aware of state changes:
+        items that need to be updated and items that have been removed.
         """
 
 
@@ -15,5 +15,7 @@ if TYPE_CHECKING:
 def DefaultPainter(view: GtkView) -> Painter:
     """Default painter, containing item, handle and tool painters."""
     return (
-        PainterChain().append(ItemPainter(view.selection)).append(HandlePainter(view))
+        PainterChain()
+        .append(ItemPainter(view.selection, view))
+        .append(HandlePainter(view))
     )
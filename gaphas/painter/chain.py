@@ -14,6 +14,11 @@ class PainterChain:
     def __init__(self) -> None:
         self._painters: list[Painter] = []
 
+    @property
+    def painters(self) -> tuple[Painter, ...]:
+        """The painters in this chain, in paint order."""
+        return tuple(self._painters)
+
     def append(self, painter: Painter) -> PainterChain:
         """Add a painter to the list of painters."""
         self._painters.append(painter)
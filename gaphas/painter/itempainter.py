@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from collections.abc import Collection
+from typing import TYPE_CHECKING
 
 from cairo import LINE_JOIN_ROUND
 from cairo import Context as CairoContext
@@ -8,10 +9,72 @@ from cairo import Context as CairoContext
 from gaphas.item import DrawContext, Item
 from gaphas.selection import Selection
 
+if TYPE_CHECKING:
+    from gaphas.view import GtkView
+
+# Levels of detail, from full detail to not drawn at all
+LOD_DETAIL = 0
+LOD_PROXY = 1
+LOD_SKIP = 2
+
+# Default on-screen sizes (in pixels) below which items are simplified
+LOD_PROXY_SIZE = 4.0
+LOD_SKIP_SIZE = 1.0
+
+PROXY_COLOR = (0.5, 0.5, 0.5, 0.5)
+
 
 class ItemPainter:
-    def __init__(self, selection: Selection | None = None) -> None:
+    """Draw items.
+
+    If a view is provided, the painter applies level of detail (LOD):
+    items that appear smaller than ``proxy_size`` pixels on screen are
+    drawn as a filled bounding box, items smaller than ``skip_size``
+    pixels are not drawn at all. Selected, focused and hovered items
+    are always drawn in full detail.
+
+    Items can provide their own simplified representation by implementing
+    an optional ``draw_lod(context, level)`` method. It's called instead of
+    ``draw(context)`` when the item should be drawn as a proxy.
+    """
+
+    def __init__(
+        self,
+        selection: Selection | None = None,
+        view: GtkView | None = None,
+        proxy_size: float = LOD_PROXY_SIZE,
+        skip_size: float = LOD_SKIP_SIZE,
+    ) -> None:
         self.selection = selection or Selection()
+        self.view = view
+        self.proxy_size = proxy_size
+        self.skip_size = skip_size
+
+    def level_of_detail(self, item: Item) -> int:
+        """Determine the level of detail an item should be drawn with."""
+        view = self.view
+        if view is None:
+            return LOD_DETAIL
+
+        selection = self.selection
+        if (
+            item in selection.selected_items
+            or item is selection.focused_item
+            or item is selection.hovered_item
+        ):
+            return LOD_DETAIL
+
+        try:
+            bounds = view.get_item_bounding_box(item)
+        except KeyError:
+            return LOD_DETAIL
+
+        size = max(abs(bounds.width), abs(bounds.height))
+        if size < self.skip_size:
+            return LOD_SKIP
+        if size < self.proxy_size:
+            return LOD_PROXY
+        return LOD_DETAIL
 
     def paint_item(self, item: Item, cairo: CairoContext) -> None:
         cairo.save()
@@ -32,8 +95,42 @@ class ItemPainter:
         finally:
             cairo.restore()
 
+    def paint_proxy(self, item: Item, cairo: CairoContext, level: int) -> None:
+        """Draw a simplified version of an item.
+
+        Items with a ``draw_lod()`` method draw themselves, otherwise
+        the bounding box of the item is filled.
+        """
+        cairo.save()
+        try:
+            if draw_lod := getattr(item, "draw_lod", None):
+                cairo.transform(item.matrix_i2c.to_cairo())
+                draw_lod(
+                    DrawContext(
+                        cairo=cairo, selected=False, focused=False, hovered=False
+                    ),
+                    level,
+                )
+            else:
+                assert self.view
+                cairo.identity_matrix()
+                cairo.rectangle(*self.view.get_item_bounding_box(item))
+                cairo.set_source_rgba(*PROXY_COLOR)
+                cairo.fill()
+        finally:
+            cairo.restore()
+
     def paint(self, items: Collection[Item], cairo: CairoContext) -> None:
         """Draw the items."""
+        if self.view is None:
+            for item in items:
+                self.paint_item(item, cairo)
+            return
 
+        level_of_detail = self.level_of_detail
         for item in items:
-            self.paint_item(item, cairo)
+            level = level_of_detail(item)
+            if level == LOD_DETAIL:
+                self.paint_item(item, cairo)
+            elif level != LOD_SKIP:
+                self.paint_proxy(item, cairo, level)
@@ -21,6 +21,8 @@ class Port:
     The Item's handle connects to a port.
     """
 
+    __slots__ = ("__weakref__", "_connectable")
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -43,6 +45,8 @@ class Port:
 class LinePort(Port):
     """Port defined as a line between two handles."""
 
+    __slots__ = ("end", "start")
+
     def __init__(self, start: Position, end: Position) -> None:
         super().__init__()
 
@@ -77,6 +81,8 @@ class LinePort(Port):
 class PointPort(Port):
     """Port defined as a point."""
 
+    __slots__ = ("point",)
+
     def __init__(self, point: Position) -> None:
         super().__init__()
         self.point = point
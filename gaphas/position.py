@@ -19,27 +19,36 @@ class Position:
     (Variable(3, 20), Variable(5, 20))
     """
 
+    __slots__ = ("__weakref__", "_handlers", "_setting_pos", "_x", "_y")
+
     def __init__(self, x, y, strength=NORMAL):
         self._x = Variable(x, strength)
         self._y = Variable(y, strength)
-        self._handlers: set[Callable[[Position, Pos], None]] = set()
+        # Created when the first handler is added
+        self._handlers: set[Callable[[Position, Pos], None]] | None = None
         self._setting_pos = 0
 
     def add_handler(self, handler: Callable[[Position, Pos], None]) -> None:
         if not self._handlers:
             self._x.add_handler(self._propagate_x)
             self._y.add_handler(self._propagate_y)
-        self._handlers.add(handler)
+        if self._handlers is None:
+            self._handlers = {handler}
+        else:
+            self._handlers.add(handler)
 
     def remove_handler(self, handler: Callable[[Position, Pos], None]) -> None:
+        if not self._handlers:
+            return
         self._handlers.discard(handler)
         if not self._handlers:
             self._x.remove_handler(self._propagate_x)
             self._y.remove_handler(self._propagate_y)
 
     def notify(self, oldpos: Pos) -> None:
-        for handler in self._handlers:
-            handler(self, oldpos)
+        if self._handlers:
+            for handler in self._handlers:
+                handler(self, oldpos)
 
     def _propagate_x(self, variable, oldval):
         if not self._setting_pos:
@@ -106,6 +115,8 @@ class Position:
 
 
 class MatrixProjection(BaseConstraint):
+    __slots__ = ("_orig_pos", "_proj_pos", "matrix")
+
     def __init__(self, pos: Position, matrix: Matrix):
         proj_pos = Position(0, 0, pos.strength)
         super().__init__(proj_pos.x, proj_pos.y, pos.x, pos.y)
@@ -20,17 +20,46 @@ as a Q-tree. All forms of Quadtrees share some common features:
 
 from __future__ import annotations
 
+import heapq
+import math
 import operator
-from typing import Callable, Generic, Iterable, TypeVar
+from dataclasses import dataclass, field
+from itertools import count, islice
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
 
-from gaphas.geometry import rectangle_contains, rectangle_intersects, Rect
+from gaphas.geometry import rectangle_contains, rectangle_intersects, Point, Rect
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore[assignment]
 
 Bounds = Rect
 
+# Maximum depth of the tree when loading items in bulk.
+MAX_DEPTH = 32
+
+# Buckets with at least this many items are queried with NumPy, if available.
+PACKED_BUCKET_SIZE = 128
+
 T = TypeVar("T")
 D = TypeVar("D")
 
 
+@dataclass
+class QuadtreeStats:
+    """Statistics about the structure of a quadtree."""
+
+    depth: int = 0
+    buckets: int = 0
+    empty_buckets: int = 0
+    items_per_level: list[int] = field(default_factory=list)
+
+    @property
+    def items(self) -> int:
+        return sum(self.items_per_level)
+
+
 class Quadtree(Generic[T, D]):
     """The Quad-tree.
 
@@ -79,27 +108,46 @@ class Quadtree(Generic[T, D]):
     ['13', '14', '15', '16']
     """
 
-    def __init__(self, capacity: int = 10, resize_step: int = 100) -> None:
+    def __init__(
+        self, capacity: int = 10, resize_step: int = 100, looseness: float = 1.0
+    ) -> None:
         """Create a new Quadtree instance.
 
         Capacity defines the number of elements in one tree bucket (default: 10).
 
         The resize_step defines the increments in which the quadtree will grow when items
         are moved out of the current quadtree boundaries.
+
+        Looseness defines how much sub-buckets are enlarged, as a factor of
+        their size (default: 1.0, no enlargement). In a loose quadtree
+        items are placed by their center. Items that straddle the center
+        lines of a bucket, like long lines, can then still be placed in a
+        sub-bucket, instead of piling up at the root. This makes nearest item
+        searches faster. Rectangle queries are not faster if NumPy is
+        installed, and can be slower, since loose buckets overlap.
         """
+        if looseness < 1.0:
+            raise ValueError("Looseness should be 1.0 or larger")
         self._capacity = capacity
         self._resize_step = resize_step
+        self._looseness = looseness
         self._bucket: QuadtreeBucket[T] = QuadtreeBucket(
-            (0, 0, resize_step, resize_step), capacity
+            (0, 0, resize_step, resize_step), capacity, looseness
         )
 
         # Easy lookup item->(bounds, data)
         self._ids: dict[T, tuple[Bounds, D | None]] = {}
+        # Edges (x0, y0, x1, y1) of all items, None if it needs recalculation
+        self._extents: tuple[float, float, float, float] | None = None
 
     @property
     def bounds(self) -> Bounds:
         return self._bucket.bounds
 
+    @property
+    def looseness(self) -> float:
+        return self._looseness
+
     @property
     def soft_bounds(self) -> Bounds:
         """Calculate the size of all items in the tree. This size may be beyond
@@ -117,17 +165,54 @@ class Quadtree(Generic[T, D]):
 
         >>> qtree.bounds
         (0, 0, 0, 0)
+
+        The size is maintained as items are added. It's only recalculated
+        when an item on the edge is removed, or moves inward.
         """
-        x_y_w_h = list(zip(*[d[0] for d in self._ids.values()]))
-        if not x_y_w_h:
-            return 0, 0, 0, 0
-        x0 = min(x_y_w_h[0])
-        y0 = min(x_y_w_h[1])
-        add = operator.add
-        x1 = max(map(add, x_y_w_h[0], x_y_w_h[2]))
-        y1 = max(map(add, x_y_w_h[1], x_y_w_h[3]))
+        if self._extents is None:
+            x_y_w_h = list(zip(*[d[0] for d in self._ids.values()]))
+            if not x_y_w_h:
+                return 0, 0, 0, 0
+            add = operator.add
+            self._extents = (
+                min(x_y_w_h[0]),
+                min(x_y_w_h[1]),
+                max(map(add, x_y_w_h[0], x_y_w_h[2])),
+                max(map(add, x_y_w_h[1], x_y_w_h[3])),
+            )
+        x0, y0, x1, y1 = self._extents
         return x0, y0, x1 - x0, y1 - y0
 
+    def _extend(self, bounds: Bounds) -> None:
+        if extents := self._extents:
+            x, y, w, h = bounds
+            x0, y0, x1, y1 = extents
+            self._extents = (
+                min(x0, x),
+                min(y0, y),
+                max(x1, x + w),
+                max(y1, y + h),
+            )
+
+    def _shrink(self, old_bounds: Bounds, bounds: Bounds | None = None) -> None:
+        """Invalidate the extents if an item on the edge moves inward, or is
+        removed."""
+        if not (extents := self._extents):
+            return
+        x, y, w, h = old_bounds
+        x0, y0, x1, y1 = extents
+        if bounds:
+            nx, ny, nw, nh = bounds
+            if (
+                (x <= x0 < nx)
+                or (y <= y0 < ny)
+                or (x + w >= x1 > nx + nw)
+                or (y + h >= y1 > ny + nh)
+            ):
+                self._extents = None
+        elif x <= x0 or y <= y0 or x + w >= x1 or y + h >= y1:
+            self._extents = None
+
     def add(self, item: T, bounds: Bounds, data: D | None = None) -> None:
         """Add an item to the tree.
 
@@ -140,18 +225,22 @@ class Quadtree(Generic[T, D]):
 
         if item in self._ids:
             if old_bounds := self._ids[item][0]:
-                if bucket := self._bucket.find_bucket(old_bounds):
+                self._shrink(old_bounds, bounds)
+                if bucket := self._find_owner(item, old_bounds):
                     # Fast lane, if item moved just a little it may still reside in the same bucket. We do not need to
                     # search from top-level.
-                    if rectangle_contains(bounds, bucket.bounds):
+                    if bucket.owns(bounds):
                         bucket.update(item, bounds)
                         self._ids[item] = (bounds, data)
+                        self._extend(bounds)
                         return
                     else:
                         bucket.remove(item)
+                        self._coalesce(bucket)
 
         self._bucket.find_bucket(bounds).add(item, bounds)
         self._ids[item] = (bounds, data)
+        self._extend(bounds)
 
     def remove(self, item: T) -> None:
         """Remove an item from the tree."""
@@ -161,42 +250,118 @@ class Quadtree(Generic[T, D]):
         except KeyError:
             pass  # Element does not exist
         else:
-            self._bucket.find_bucket(bounds).remove(item)
+            bucket = self._find_owner(item, bounds)
+            bucket.remove(item)
+            self._coalesce(bucket)
+            self._shrink(bounds)
+
+    def _coalesce(self, bucket: QuadtreeBucket[T]) -> None:
+        """Fold sparse sub-trees back into their parent bucket, once items
+        have been removed from ``bucket``.
+
+        Buckets are collapsed when they hold half their capacity or less.
+        Because buckets split only when they exceed their capacity, buckets
+        do not split and collapse over and over again.
+        """
+        threshold = self._capacity // 2
+        collapse = None
+        node: QuadtreeBucket[T] | None = bucket
+        while node and node.count <= threshold:
+            if node._buckets:
+                collapse = node
+            node = node.parent
+        if collapse:
+            collapse.collapse()
+
+    def _find_owner(self, item: T, bounds: Bounds) -> QuadtreeBucket[T]:
+        """Find the bucket an item is stored in."""
+        bucket = self._bucket.find_bucket(bounds)
+        if item in bucket.items:
+            return bucket
+
+        # An item on the center line of a bucket can end up in a
+        # neighbouring bucket once the tree has grown.
+        buckets = [self._bucket]
+        while buckets:
+            bucket = buckets.pop()
+            if item in bucket.items:
+                return bucket
+            buckets.extend(
+                b for b in bucket._buckets if rectangle_contains(bounds, b.loose_bounds)
+            )
+        raise KeyError(item)
 
     def clear(self):
         """Remove all items from the tree."""
         self._bucket.clear()
         self._ids.clear()
+        self._extents = None
 
     def resize(self, bounds: Bounds) -> None:
         """Resize the tree so `bounds` fits inside.
 
-        The QTree can only grow. The tree structure is rebuild.
+        The QTree can only grow. The tree grows by turning the root bucket
+        into a quadrant of a new root bucket, twice the size. Items do not
+        need to be re-added.
         """
-        resize_step = self._resize_step
+        bucket = self._bucket
+        x, y, _w, _h = bounds
+        while not rectangle_contains(bounds, bucket.bounds):
+            bx, by, bw, bh = bucket.bounds
+            if bw <= 0 or bh <= 0:
+                self._bucket = QuadtreeBucket(
+                    _union(bucket.bounds, bounds, self._resize_step),
+                    self._capacity,
+                    self._looseness,
+                )
+                self.rebuild()
+                return
+            bucket = bucket.grow(left=x < bx, up=y < by)
+        self._bucket = bucket
+
+    def load(self, items: Iterable[tuple[T, Bounds]]) -> None:
+        """Add many items at once.
+
+        The tree is rebuilt in one pass: items are partitioned recursively,
+        resulting in a balanced tree. This is a lot faster than adding
+        items one by one.
+
+        >>> qtree = Quadtree()
+        >>> qtree.load((f"{i}", (i * 10, 0, 10, 10)) for i in range(20))
+        >>> len(qtree)
+        20
+        >>> qtree.bounds
+        (0, 0, 200, 100)
+        >>> sorted(qtree.find_inside((0, 0, 30, 10)))
+        ['0', '1', '2']
+        """
+        ids = self._ids
+        for item, bounds in items:
+            ids[item] = (bounds, ids[item][1] if item in ids else None)
+        self._extents = None
+
+        entries = [(item, bounds) for item, (bounds, _data) in ids.items()]
         x, y, w, h = self._bucket.bounds
-        while bounds[0] < x:
-            x -= resize_step
-            w += resize_step
-        while bounds[1] < y:
-            y -= resize_step
-            h += resize_step
-        while bounds[0] + bounds[2] > x + w:
-            w += resize_step
-        while bounds[1] + bounds[3] > y + h:
-            h += resize_step
-
-        self._bucket = QuadtreeBucket((x, y, w, h), self._capacity)
-        self.rebuild()
+        x1, y1 = x + w, y + h
+        if entries:
+            xs, ys, ws, hs = zip(*(bounds for _item, bounds in entries))
+            add = operator.add
+            x = min(x, *xs)
+            y = min(y, *ys)
+            x1 = max(x1, *map(add, xs, ws))
+            y1 = max(y1, *map(add, ys, hs))
+
+        step = self._resize_step
+        self._bucket = QuadtreeBucket(
+            (x, y, _size(x, max(x1, x + step)), _size(y, max(y1, y + step))),
+            self._capacity,
+            self._looseness,
+        )
+        self._bucket.load(entries)
 
     def rebuild(self):
         """Rebuild the tree structure."""
-        # Clean bucket and items:
-        self._bucket.clear()
-
-        for item, (bounds, data) in dict(self._ids).items():
-            self._bucket.find_bucket(bounds).add(item, bounds)
-            self._ids[item] = (bounds, data)
+        self.load(())
 
     def get_bounds(self, item: T) -> Bounds:
         """Return the bounding box for the given item."""
@@ -211,7 +376,7 @@ class Quadtree(Generic[T, D]):
 
         Returns a set.
         """
-        return set(self._bucket.find(rect, method=rectangle_contains))
+        return self._bucket.find_items(rect, contain=True)
 
     def find_intersect(self, rect: Bounds) -> set[T]:
         """Find all items that intersect with the given rectangle (x, y, width,
@@ -219,7 +384,87 @@ class Quadtree(Generic[T, D]):
 
         Returns a set.
         """
-        return set(self._bucket.find(rect, method=rectangle_intersects))
+        return self._bucket.find_items(rect, contain=False)
+
+    def find_nearest(
+        self,
+        point: Point,
+        k: int = 1,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> list[tuple[float, T]]:
+        """Find the ``k`` items nearest to ``point``.
+
+        Returns a list of ``(distance, item)`` tuples, nearest first. See
+        :meth:`iter_nearest` for details.
+
+        >>> qtree = Quadtree()
+        >>> for i in range(10):
+        ...     qtree.add(f"{i}", (i * 10, 0, 5, 5))
+        >>> qtree.find_nearest((32, 2), k=2)
+        [(0.0, '3'), (7.0, '2')]
+        """
+        return list(islice(self.iter_nearest(point, max_distance, distance_fn), k))
+
+    def iter_nearest(
+        self,
+        point: Point,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> Iterator[tuple[float, T]]:
+        """Iterate ``(distance, item)`` tuples for items near ``point``,
+        nearest first.
+
+        Buckets and items are visited best-first, by distance to their
+        bounds, so only the nearest part of the tree is searched.
+
+        By default the distance is the distance to the bounding box of an
+        item. A ``distance_fn(item, point)`` can provide the exact distance
+        to an item. Outside the bounding box, it should not be smaller than
+        the distance to the bounding box. Inside the bounding box it can be
+        any value, including negative values. The exact distance is only
+        calculated for items that are candidates to be returned next.
+
+        Only items within ``max_distance`` are returned.
+        """
+        px, py = point
+        # Distance for items that contain the point, if exact distances may be negative
+        inside = -math.inf if distance_fn else 0.0
+
+        def distance_to(bounds: Bounds) -> float:
+            x, y, w, h = bounds
+            dx = x - px if px < x else px - x - w if px > x + w else 0.0
+            dy = y - py if py < y else py - y - h if py > y + h else 0.0
+            return math.hypot(dx, dy) if dx or dy else inside
+
+        # Entries are (distance, seq, bucket, item, exact)
+        seq = count()
+        heap: list[tuple[float, int, QuadtreeBucket[T] | None, T | None, bool]] = [
+            (
+                distance_to(self._bucket.loose_bounds),
+                next(seq),
+                self._bucket,
+                None,
+                False,
+            )
+        ]
+        push = heapq.heappush
+        pop = heapq.heappop
+        while heap:
+            distance, _, bucket, item, exact = pop(heap)
+            if distance > max_distance:
+                return
+            if bucket:
+                for i, bounds in bucket.items.items():
+                    if (d := distance_to(bounds)) <= max_distance:
+                        push(heap, (d, next(seq), None, i, False))
+                for b in bucket._buckets:
+                    if (d := distance_to(b.loose_bounds)) <= max_distance:
+                        push(heap, (d, next(seq), b, None, False))
+            elif exact or not distance_fn:
+                yield distance, item  # type: ignore[misc]
+            elif (d := distance_fn(item, point)) <= max_distance:  # type: ignore[arg-type]
+                push(heap, (d, next(seq), None, item, True))
 
     def __len__(self):
         """Return number of items in tree."""
@@ -229,6 +474,25 @@ class Quadtree(Generic[T, D]):
         """Check if an item is in tree."""
         return item in self._ids
 
+    def stats(self) -> QuadtreeStats:
+        """Return statistics about the structure of the tree.
+
+        >>> qtree = Quadtree(capacity=2)
+        >>> for i in range(4):
+        ...     qtree.add(f"{i}", (i * 20, i * 20, 10, 10))
+        >>> qtree.stats()
+        QuadtreeStats(depth=2, buckets=9, empty_buckets=5, items_per_level=[0, 2, 2])
+        """
+        stats = QuadtreeStats()
+        level = [self._bucket]
+        while level:
+            stats.depth = len(stats.items_per_level)
+            stats.buckets += len(level)
+            stats.empty_buckets += sum(1 for b in level if not b.items)
+            stats.items_per_level.append(sum(len(b.items) for b in level))
+            level = [child for b in level for child in b._buckets]
+        return stats
+
     def dump(self) -> None:
         """Print structure to stdout."""
         self._bucket.dump()
@@ -237,13 +501,43 @@ class Quadtree(Generic[T, D]):
 class QuadtreeBucket(Generic[T]):
     """A node in a Quadtree structure."""
 
-    def __init__(self, bounds: Bounds, capacity: int):
+    __slots__ = (
+        "_buckets",
+        "_columns",
+        "_split",
+        "bounds",
+        "capacity",
+        "count",
+        "items",
+        "loose_bounds",
+        "looseness",
+        "parent",
+    )
+
+    def __init__(
+        self,
+        bounds: Bounds,
+        capacity: int,
+        looseness: float = 1.0,
+        parent: QuadtreeBucket[T] | None = None,
+    ):
         """Set bounding box for the node as (x, y, width, height)."""
         self.bounds = bounds
         self.capacity = capacity
+        self.looseness = looseness
+        self.parent = parent
+        # Number of items in this bucket and its sub-buckets
+        self.count = 0
+        # Items in this bucket are contained by the loose bounds
+        self.loose_bounds = bounds if looseness == 1.0 else _loosen(bounds, looseness)
 
         self.items: dict[T, Bounds] = {}
         self._buckets: list[QuadtreeBucket[T]] = []
+        # Item bounds as columns (items, x0, y0, x1, y1), for large buckets
+        self._columns: tuple | None = None
+        # Point where the bucket is split in quadrants
+        x, y, w, h = bounds
+        self._split = (x + w / 2.0, y + h / 2.0)
 
     def add(self, item: T, bounds: Bounds) -> None:
         """Add an item to the quadtree.
@@ -251,29 +545,149 @@ class QuadtreeBucket(Generic[T]):
         The bucket is split when necessary. Items are otherwise added to
         this bucket, not some sub-bucket.
         """
-        assert rectangle_contains(bounds, self.bounds), (
-            f"{bounds} do not fit in {self.bounds}"
+        assert rectangle_contains(bounds, self.loose_bounds), (
+            f"{bounds} do not fit in {self.loose_bounds}"
         )
 
+        parent = self.parent
+        while parent:
+            parent.count += 1
+            parent = parent.parent
+        self._insert(item, bounds)
+
+    def _insert(self, item: T, bounds: Bounds) -> None:
+        self.count += 1
+        self._columns = None
         if self._buckets or len(self.items) < self.capacity:
             self.items[item] = bounds
             return
 
+        self._split_buckets()
+
+        items = list(self.items.items())
+        self.items.clear()
+        for i, b in items:
+            self._place(i, b)
+        self._place(item, bounds)
+
+    def _place(self, item: T, bounds: Bounds) -> None:
+        """Place an item, already counted by this bucket, in the bucket or a
+        sub-bucket."""
+        bucket = self.find_bucket(bounds)
+        if bucket is self:
+            self.items[item] = bounds
+            self._columns = None
+            return
+
+        parent = bucket.parent
+        while parent is not self:
+            assert parent
+            parent.count += 1
+            parent = parent.parent
+        bucket._insert(item, bounds)
+
+    def _split_buckets(self) -> None:
         x, y, w, h = self.bounds
         rw, rh = w / 2.0, h / 2.0
-        cx, cy = x + rw, y + rh
+        cx, cy = self._split
+        capacity = self.capacity
+        looseness = self.looseness
         self._buckets = [
-            QuadtreeBucket((x, y, rw, rh), self.capacity),
-            QuadtreeBucket((cx, y, rw, rh), self.capacity),
-            QuadtreeBucket((x, cy, rw, rh), self.capacity),
-            QuadtreeBucket((cx, cy, rw, rh), self.capacity),
+            QuadtreeBucket((x, y, rw, rh), capacity, looseness, self),
+            QuadtreeBucket((cx, y, rw, rh), capacity, looseness, self),
+            QuadtreeBucket((x, cy, rw, rh), capacity, looseness, self),
+            QuadtreeBucket((cx, cy, rw, rh), capacity, looseness, self),
         ]
 
-        items = list(self.items.items())
-        self.items.clear()
-        for i, b in items:
-            self.find_bucket(b).add(i, b)
-        self.find_bucket(bounds).add(item, bounds)
+    def load(self, items: list[tuple[T, Bounds]], depth: int = 0) -> None:
+        """Add items to an empty bucket, splitting it as needed."""
+        self.count = len(items)
+        if len(items) <= self.capacity or depth >= MAX_DEPTH:
+            self.items.update(items)
+            return
+
+        self._split_buckets()
+        own_items = self.items
+        cx, cy = self._split
+        # Edges of the sub-buckets, west and east, north and south
+        wx0, ny0, ww, nh = self._buckets[0].loose_bounds
+        ex0, sy0, ew, sh = self._buckets[3].loose_bounds
+        wx1, ny1, ex1, sy1 = wx0 + ww, ny0 + nh, ex0 + ew, sy0 + sh
+        # Items are placed by their center, like find_bucket() does
+        west: list[tuple[T, Bounds]] = []
+        east: list[tuple[T, Bounds]] = []
+        for entry in items:
+            x, _y, w, _h = entry[1]
+            if x + w / 2.0 >= cx:
+                if x >= ex0 and x + w <= ex1:
+                    east.append(entry)
+                    continue
+            elif x >= wx0 and x + w <= wx1:
+                west.append(entry)
+                continue
+            own_items[entry[0]] = entry[1]
+
+        quadrants: list[list[tuple[T, Bounds]]] = [[], [], [], []]
+        for index, side in ((0, west), (1, east)):
+            north = quadrants[index]
+            south = quadrants[index + 2]
+            for entry in side:
+                _x, y, _w, h = entry[1]
+                if y + h / 2.0 >= cy:
+                    if y >= sy0 and y + h <= sy1:
+                        south.append(entry)
+                        continue
+                elif y >= ny0 and y + h <= ny1:
+                    north.append(entry)
+                    continue
+                own_items[entry[0]] = entry[1]
+
+        for bucket, quadrant in zip(self._buckets, quadrants):
+            if quadrant:
+                bucket.load(quadrant, depth + 1)
+
+    def grow(self, left: bool, up: bool) -> QuadtreeBucket[T]:
+        """Create a bucket, twice the size, with this bucket as quadrant.
+
+        The new bucket grows to the left and/or up, or to the right and/or
+        down.
+        """
+        x, y, w, h = self.bounds
+        capacity = self.capacity
+        looseness = self.looseness
+        xs = (x - w, x) if left else (x, x + w)
+        ys = (y - h, y) if up else (y, y + h)
+        own_index = (1 if left else 0) + (2 if up else 0)
+        buckets = [
+            self
+            if index == own_index
+            else QuadtreeBucket(
+                (xs[index & 1], ys[index >> 1], w, h), capacity, looseness
+            )
+            for index in range(4)
+        ]
+        # Make sure the parent covers all quadrants, despite rounding errors
+        parent: QuadtreeBucket[T] = QuadtreeBucket(
+            _union(buckets[0].bounds, buckets[3].bounds), capacity, looseness
+        )
+        parent._split = (xs[1], ys[1])
+        parent._buckets = buckets
+        parent.count = self.count
+        for bucket in buckets:
+            bucket.parent = parent
+        return parent
+
+    def collapse(self) -> None:
+        """Move all items from sub-buckets into this bucket, and remove the
+        sub-buckets."""
+        items = self.items
+        buckets = self._buckets
+        self._buckets = []
+        self._columns = None
+        while buckets:
+            bucket = buckets.pop()
+            items.update(bucket.items)
+            buckets.extend(bucket._buckets)
 
     def remove(self, item: T) -> None:
         """Remove an item from the quadtree bucket.
@@ -282,6 +696,11 @@ class QuadtreeBucket(Generic[T]):
         bucket).
         """
         del self.items[item]
+        self._columns = None
+        bucket: QuadtreeBucket[T] | None = self
+        while bucket:
+            bucket.count -= 1
+            bucket = bucket.parent
 
     def update(self, item: T, new_bounds: Bounds) -> None:
         """Update the position of an item within the current bucket.
@@ -293,28 +712,108 @@ class QuadtreeBucket(Generic[T]):
         self.remove(item)
         self.find_bucket(new_bounds).add(item, new_bounds)
 
+    def owns(self, bounds: Bounds) -> bool:
+        """Check if a bounding box belongs in this bucket, or one of its sub-
+        buckets."""
+        x, y, w, h = bounds
+        bx, by, bw, bh = self.bounds
+        return (
+            bx <= x + w / 2.0 < bx + bw
+            and by <= y + h / 2.0 < by + bh
+            and rectangle_contains(bounds, self.loose_bounds)
+        )
+
     def find_bucket(self, bounds: Bounds) -> QuadtreeBucket:
         """Find the bucket that holds a bounding box.
 
+        The sub-bucket is selected by the center of the bounding box.
+        The bounding box is kept in a bucket if it does not fit in that sub-
+        bucket.
+
         This method should be used to find a bucket that fits, before
         add() or remove() is called.
         """
-        if not self._buckets:
-            return self
-        sx, sy, sw, sh = self.bounds
-        cx, cy = sx + sw / 2.0, sy + sh / 2.0
         x, y, w, h = bounds
-        index = 0
-        if x >= cx:
-            index += 1
-        elif x + w > cx:
-            return self
-
-        if y >= cy:
-            index += 2
-        elif y + h > cy:
-            return self
-        return self._buckets[index].find_bucket(bounds)
+        x1 = x + w
+        y1 = y + h
+        mx = x + w / 2.0
+        my = y + h / 2.0
+        bucket = self
+        while bucket._buckets:
+            cx, cy = bucket._split
+            index = 1 if mx >= cx else 0
+            if my >= cy:
+                index += 2
+
+            child = bucket._buckets[index]
+            bx, by, bw, bh = child.loose_bounds
+            if x < bx or y < by or x1 > bx + bw or y1 > by + bh:
+                break
+            bucket = child
+        return bucket
+
+    def find_items(self, rect: Bounds, contain: bool = False) -> set[T]:
+        """Find all items inside, or intersecting with, the given rectangle
+        (x, y, width, height).
+
+        Sub-buckets that lie completely inside the rectangle are added
+        without checking individual items. Large buckets are checked with
+        NumPy, if it's installed.
+        """
+        rx, ry, rw, rh = rect
+        rx1 = rx + rw
+        ry1 = ry + rh
+        found: set[T] = set()
+        buckets = [self]
+        while buckets:
+            bucket = buckets.pop()
+            bx, by, bw, bh = bucket.loose_bounds
+            bx1 = bx + bw
+            by1 = by + bh
+            if rx > bx1 or rx1 < bx or ry > by1 or ry1 < by:
+                continue
+            if rx <= bx and ry <= by and rx1 >= bx1 and ry1 >= by1:
+                bucket._all_items(found)
+                continue
+
+            items = bucket.items
+            if numpy and len(items) >= PACKED_BUCKET_SIZE:
+                found.update(bucket._find_packed(rx, ry, rx1, ry1, contain))
+            elif contain:
+                found.update(
+                    item
+                    for item, (x, y, w, h) in items.items()
+                    if rx <= x and ry <= y and rx1 >= x + w and ry1 >= y + h
+                )
+            else:
+                found.update(
+                    item
+                    for item, (x, y, w, h) in items.items()
+                    if x <= rx1 and x + w >= rx and y <= ry1 and y + h >= ry
+                )
+            buckets.extend(bucket._buckets)
+        return found
+
+    def _all_items(self, found: set[T]) -> None:
+        buckets = [self]
+        while buckets:
+            bucket = buckets.pop()
+            found.update(bucket.items)
+            buckets.extend(bucket._buckets)
+
+    def _find_packed(
+        self, rx: float, ry: float, rx1: float, ry1: float, contain: bool
+    ) -> Iterable[T]:
+        if self._columns is None:
+            bounds = numpy.array(list(self.items.values()), dtype=float)
+            x, y, w, h = bounds.T
+            self._columns = (list(self.items), x, y, x + w, y + h)
+        items, x0, y0, x1, y1 = self._columns
+        if contain:
+            mask = (x0 >= rx) & (y0 >= ry) & (x1 <= rx1) & (y1 <= ry1)
+        else:
+            mask = (x0 <= rx1) & (x1 >= rx) & (y0 <= ry1) & (y1 >= ry)
+        return (items[i] for i in numpy.flatnonzero(mask))
 
     def find(
         self, rect: Bounds, method: Callable[[Bounds, Bounds], bool]
@@ -324,7 +823,7 @@ class QuadtreeBucket(Generic[T]):
 
         Returns an iterator.
         """
-        if rectangle_intersects(rect, self.bounds):
+        if rectangle_intersects(rect, self.loose_bounds):
             for item, bounds in list(self.items.items()):
                 if method(bounds, rect):
                     yield item
@@ -335,6 +834,8 @@ class QuadtreeBucket(Generic[T]):
         """Clear the bucket, including sub-buckets."""
         del self._buckets[:]
         self.items.clear()
+        self.count = 0
+        self._columns = None
 
     def dump(self, indent=""):
         print(indent, self, self.bounds)
@@ -343,3 +844,34 @@ class QuadtreeBucket(Generic[T]):
             print(indent, item, bounds)
         for bucket in self._buckets:
             bucket.dump(indent)
+
+
+def _union(a: Bounds, b: Bounds, min_size: float = 0) -> Bounds:
+    """Return the bounds containing both ``a`` and ``b``, at least
+    ``min_size`` wide and high."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    x = min(ax, bx)
+    y = min(ay, by)
+    return (
+        x,
+        y,
+        _size(x, max(ax + aw, bx + bw, x + min_size)),
+        _size(y, max(ay + ah, by + bh, y + min_size)),
+    )
+
+
+def _loosen(bounds: Bounds, looseness: float) -> Bounds:
+    """Enlarge bounds by a factor, keeping the same center."""
+    x, y, w, h = bounds
+    dx = w * (looseness - 1.0) / 2.0
+    dy = h * (looseness - 1.0) / 2.0
+    return x - dx, y - dy, _size(x - dx, x + w + dx), _size(y - dy, y + h + dy)
+
+
+def _size(start: float, end: float) -> float:
+    """Size from start to end, rounded up so ``start + size >= end``."""
+    size = end - start
+    while start + size < end:
+        size = math.nextafter(size, math.inf)
+    return size
@@ -0,0 +1,445 @@
+"""Render a model without a view.
+
+The :class:`Renderer` draws a model through the regular painters, without
+GTK. It can be used to export diagrams to PNG, SVG and PDF, e.g. on a server.
+
+Very large images can be rendered in tiles, in parallel, with
+:meth:`Renderer.render_png_tiled`.
+
+>>> from gaphas import Canvas
+>>> renderer = Renderer(Canvas())
+>>> renderer.bounding_box
+Rectangle()
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import struct
+import sys
+import threading
+import zlib
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from math import ceil
+from typing import IO, Callable, Union
+
+import cairo
+
+from gaphas.canvas import with_descendants
+from gaphas.geometry import Rect, Rectangle
+from gaphas.item import Item
+from gaphas.model import Model
+from gaphas.painter import ItemPainter
+from gaphas.painter.painter import ItemPainterType, Painter
+from gaphas.quadtree import Quadtree
+from gaphas.spatialindex import SpatialIndex
+
+# The tolerance for Cairo when calculating bounding boxes.
+BOUNDING_BOX_TOLERANCE = 1.0
+
+# Default size (in pixels) of tiles for tiled rendering.
+TILE_SIZE = 1024
+
+Color = tuple[float, float, float, float]
+Target = Union[str, IO[bytes]]
+
+
+def calculate_bounding_box(painter: ItemPainterType, item: Item) -> Rect:
+    """Calculate the bounding box of an item, in model coordinates."""
+    surface = cairo.RecordingSurface(cairo.Content.COLOR_ALPHA, None)
+    cr = cairo.Context(surface)
+    cr.set_tolerance(BOUNDING_BOX_TOLERANCE)
+    painter.paint_item(item, cr)
+    return surface.ink_extents()  # type: ignore[no-any-return]
+
+
+class Renderer:
+    """Render a model to a Cairo context.
+
+    The renderer registers itself on the model, like a view. Bounding
+    boxes of items are kept in a spatial index and are only recalculated
+    for items that have been updated since the last render.
+
+    Regions are defined in model coordinates. The top-left corner of the
+    region is rendered at the origin of the output.
+
+    Call :meth:`close` when the renderer is no longer needed.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        painter: Painter | None = None,
+        bounding_box_painter: ItemPainterType | None = None,
+        spatial_index: SpatialIndex[Item] | None = None,
+    ) -> None:
+        self._model = model
+        self._bounding_box_painter: ItemPainterType = (
+            bounding_box_painter or ItemPainter()
+        )
+        self._painter: Painter = painter or self._bounding_box_painter
+        self._qtree: SpatialIndex[Item] = (
+            Quadtree() if spatial_index is None else spatial_index
+        )
+        self._dirty_items: set[Item] = set(model.get_all_items())
+        model.register_view(self)
+
+    def __enter__(self) -> Renderer:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unregister the renderer from the model."""
+        self._model.unregister_view(self)
+
+    @property
+    def model(self) -> Model:
+        return self._model
+
+    @property
+    def painter(self) -> Painter:
+        """Painter used for rendering."""
+        return self._painter
+
+    @property
+    def bounding_box_painter(self) -> ItemPainterType:
+        """Painter used for calculating item bounding boxes."""
+        return self._bounding_box_painter
+
+    @property
+    def bounding_box(self) -> Rectangle:
+        """The bounding box of all items, in model coordinates."""
+        self.update()
+        return Rectangle(*self._qtree.soft_bounds)
+
+    def get_item_bounding_box(self, item: Item) -> Rectangle:
+        """Get the bounding box for the item, in model coordinates."""
+        self.update()
+        return Rectangle(*self._qtree.get_bounds(item))
+
+    def get_items_in_rectangle(
+        self, rect: Rect, contain: bool = False
+    ) -> Iterable[Item]:
+        """Return the items in the rectangle ``rect`` (in model coordinates).
+
+        Items are sorted in model's processing order.
+        """
+        self.update()
+        items = (
+            self._qtree.find_inside(rect)
+            if contain
+            else self._qtree.find_intersect(rect)
+        )
+        return self._model.sort(items)
+
+    def request_update(
+        self,
+        items: Iterable[Item],
+        removed_items: Iterable[Item] = (),
+    ) -> None:
+        """Request update for items.
+
+        Called by the model.
+        """
+        if items:
+            self._dirty_items.update(items)
+
+        if removed_items:
+            self._dirty_items.difference_update(removed_items)
+            for item in removed_items:
+                self._qtree.remove(item)
+
+    def update(self) -> None:
+        """Update bounding boxes of items that changed since the last
+        update."""
+        if not self._dirty_items:
+            return
+
+        dirty_items = self._all_dirty_items()
+        self._model.update_now(dirty_items)
+        dirty_items |= self._all_dirty_items()
+
+        painter = self._bounding_box_painter
+        qtree = self._qtree
+        if not qtree:
+            qtree.load(
+                (item, calculate_bounding_box(painter, item)) for item in dirty_items
+            )
+        else:
+            for item in dirty_items:
+                qtree.add(item=item, bounds=calculate_bounding_box(painter, item))
+
+    def _all_dirty_items(self) -> set[Item]:
+        dirty_items = with_descendants(self._model, self._dirty_items)
+        self._dirty_items.clear()
+        return dirty_items
+
+    def render(
+        self, cr: cairo.Context, region: Rect | None = None, scale: float = 1.0
+    ) -> None:
+        """Render the items in ``region`` onto a Cairo context.
+
+        If no region is provided, the bounding box of all items is rendered.
+        """
+        self.update()
+        x, y, width, height = region or self._qtree.soft_bounds
+        cr.save()
+        try:
+            cr.scale(scale, scale)
+            cr.translate(-x, -y)
+            cr.rectangle(x, y, width, height)
+            cr.clip()
+            items = list(self.get_items_in_rectangle((x, y, width, height)))
+            self._painter.paint(items, cr)
+        finally:
+            cr.restore()
+
+    def size(self, region: Rect | None = None, scale: float = 1.0) -> tuple[int, int]:
+        """Size of the output, in pixels (or points)."""
+        _, _, width, height = region or self.bounding_box
+        return max(1, ceil(width * scale)), max(1, ceil(height * scale))
+
+    def render_png(
+        self,
+        target: Target,
+        region: Rect | None = None,
+        scale: float = 1.0,
+        background: Color | None = None,
+    ) -> None:
+        """Render to a PNG file or stream."""
+        width, height = self.size(region, scale)
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        self._render_surface(surface, region, scale, background)
+        surface.write_to_png(target)
+
+    def render_png_tiled(
+        self,
+        target: Target,
+        region: Rect | None = None,
+        scale: float = 1.0,
+        background: Color = (1.0, 1.0, 1.0, 1.0),
+        tile_size: int = TILE_SIZE,
+        processes: int | None = None,
+    ) -> None:
+        """Render a (very large) PNG image in tiles.
+
+        Tiles are rendered in parallel by ``processes`` worker processes
+        (defaults to the number of CPUs). Worker processes are forked, which
+        is only done on Linux, and only if no other threads are running.
+        Otherwise tiles are rendered one by one. Only the items that intersect
+        a tile are painted.
+
+        Rendered tiles are written to the image band by band, so the complete
+        image is never held in memory. The image has an opaque background.
+        """
+        self.update()
+        x, y, _, _ = region or self._qtree.soft_bounds
+        width, height = self.size(region, scale)
+        columns = [
+            (px, min(tile_size, width - px)) for px in range(0, width, tile_size)
+        ]
+        bands = iter(
+            [(py, min(tile_size, height - py)) for py in range(0, height, tile_size)]
+        )
+        workers = processes or os.cpu_count() or 1
+        # Keep enough tiles in progress to keep all workers busy
+        bands_ahead = max(1, ceil(2 * workers / len(columns)))
+
+        with _open_target(target) as stream, _tile_executor(self, workers) as pool:
+            executor, render_tile = pool
+
+            def submit_band(py: int, th: int) -> tuple[int, list[Future[bytes]]]:
+                return th, [
+                    executor.submit(
+                        render_tile,
+                        (x + px / scale, y + py / scale, tw / scale, th / scale),
+                        scale,
+                        tw,
+                        th,
+                        background,
+                    )
+                    for px, tw in columns
+                ]
+
+            pending = deque(submit_band(*band) for band in islice(bands, bands_ahead))
+            writer = _PngWriter(stream, width, height)
+            while pending:
+                th, futures = pending.popleft()
+                if band := next(bands, None):
+                    pending.append(submit_band(*band))
+                tiles = [(f.result(), tw * 3) for f, (_, tw) in zip(futures, columns)]
+                for row in range(th):
+                    writer.write_row(
+                        b"".join(tile[row * n : (row + 1) * n] for tile, n in tiles)
+                    )
+            writer.close()
+
+    def render_svg(
+        self,
+        target: Target,
+        region: Rect | None = None,
+        scale: float = 1.0,
+        background: Color | None = None,
+    ) -> None:
+        """Render to an SVG file or stream."""
+        width, height = self.size(region, scale)
+        surface = cairo.SVGSurface(target, width, height)
+        self._render_surface(surface, region, scale, background)
+        surface.finish()
+
+    def render_pdf(
+        self,
+        target: Target,
+        region: Rect | None = None,
+        scale: float = 1.0,
+        background: Color | None = None,
+    ) -> None:
+        """Render to a PDF file or stream."""
+        width, height = self.size(region, scale)
+        surface = cairo.PDFSurface(target, width, height)
+        self._render_surface(surface, region, scale, background)
+        surface.finish()
+
+    def _render_surface(
+        self,
+        surface: cairo.Surface,
+        region: Rect | None,
+        scale: float,
+        background: Color | None,
+    ) -> None:
+        cr = cairo.Context(surface)
+        if background:
+            cr.set_source_rgba(*background)
+            cr.paint()
+        self.render(cr, region, scale)
+        cr.show_page()
+        surface.flush()
+
+
+# Renderer of a tile worker process. Worker processes are forked, so they
+# inherit the renderer, including its model and bounding boxes.
+_worker_renderer: Renderer | None = None
+
+
+def _init_tile_worker(renderer: Renderer) -> None:
+    global _worker_renderer
+    _worker_renderer = renderer
+
+
+def _render_worker_tile(
+    region: Rect, scale: float, width: int, height: int, background: Color
+) -> bytes:
+    assert _worker_renderer
+    return _render_tile(_worker_renderer, region, scale, width, height, background)
+
+
+def _render_tile(
+    renderer: Renderer,
+    region: Rect,
+    scale: float,
+    width: int,
+    height: int,
+    background: Color,
+) -> bytes:
+    """Render a tile, and return its pixels as RGB data."""
+    surface = cairo.ImageSurface(cairo.FORMAT_RGB24, width, height)
+    cr = cairo.Context(surface)
+    cr.set_source_rgba(*background)
+    cr.paint()
+    renderer.render(cr, region, scale)
+    surface.flush()
+
+    # Pixels are stored as native-endian 32-bit integers: 0xXXRRGGBB
+    r, g, b = (2, 1, 0) if sys.byteorder == "little" else (1, 2, 3)
+    data = surface.get_data()
+    stride = surface.get_stride()
+    size = width * 3
+    rgb = bytearray(size * height)
+    for row in range(height):
+        line = bytes(data[row * stride : row * stride + width * 4])
+        offset = row * size
+        rgb[offset : offset + size : 3] = line[r::4]
+        rgb[offset + 1 : offset + size : 3] = line[g::4]
+        rgb[offset + 2 : offset + size : 3] = line[b::4]
+    return bytes(rgb)
+
+
+class _SerialExecutor(Executor):
+    """Execute tasks in the calling process."""
+
+    def submit(self, fn: Callable, /, *args: object, **kwargs: object) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def _can_fork() -> bool:
+    """Forking is only safe on Linux, from a process without other threads
+    (such as a GTK application)."""
+    return (
+        sys.platform.startswith("linux")
+        and "fork" in multiprocessing.get_all_start_methods()
+        and threading.active_count() == 1
+    )
+
+
+@contextmanager
+def _tile_executor(
+    renderer: Renderer, processes: int
+) -> Iterator[tuple[Executor, Callable[[Rect, float, int, int, Color], bytes]]]:
+    """Provide an executor, and the function that renders a tile in it."""
+    if processes > 1 and _can_fork():
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_tile_worker,
+            initargs=(renderer,),
+        ) as executor:
+            yield executor, _render_worker_tile
+    else:
+        yield _SerialExecutor(), partial(_render_tile, renderer)
+
+
+@contextmanager
+def _open_target(target: Target) -> Iterator[IO[bytes]]:
+    if isinstance(target, str):
+        with open(target, "wb") as stream:
+            yield stream
+    else:
+        yield target
+
+
+class _PngWriter:
+    """Write an RGB PNG image, row by row."""
+
+    def __init__(self, stream: IO[bytes], width: int, height: int) -> None:
+        self._stream = stream
+        self._compressor = zlib.compressobj()
+        stream.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bits per channel, RGB, no interlacing
+        self._write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        )
+
+    def write_row(self, row: bytes) -> None:
+        # Each row starts with the filter type (0: None)
+        if data := self._compressor.compress(b"\x00" + row):
+            self._write_chunk(b"IDAT", data)
+
+    def close(self) -> None:
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_chunk(self, tag: bytes, data: bytes) -> None:
+        self._stream.write(struct.pack(">I", len(data)))
+        self._stream.write(tag)
+        self._stream.write(data)
+        self._stream.write(struct.pack(">I", zlib.crc32(tag + data)))
@@ -0,0 +1,536 @@
+"""
+R-tree
+======
+
+An R-tree groups nearby items in nodes. Each node knows the bounding box
+of its entries. Leaf nodes hold items, other nodes hold child nodes.
+Unlike a quadtree, an R-tree does not divide space in fixed parts, so large
+items do not end up near the root of the tree.
+
+Nodes are split the R*-tree way: along the axis that results in the smallest
+nodes, at the point where nodes overlap least. Items loaded in bulk are
+packed with the Sort-Tile-Recursive (STR) algorithm.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from itertools import count, islice
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+from gaphas.geometry import Point, Rect
+
+T = TypeVar("T")
+
+# Rectangle edges: (x0, y0, x1, y1)
+Edges = tuple[float, float, float, float]
+
+EMPTY: Edges = (math.inf, math.inf, -math.inf, -math.inf)
+
+
+class RTree(Generic[T]):
+    """An R-tree.
+
+    Rectangles use the same scheme throughout Gaphas: (x, y, width, height).
+
+    >>> rtree = RTree()
+    >>> for i in range(20):
+    ...     rtree.add(f"{i}", (i * 10, 0, 5, 5))
+    >>> len(rtree)
+    20
+    >>> sorted(rtree.find_inside((0, 0, 30, 10)))
+    ['0', '1', '2']
+    >>> rtree.soft_bounds
+    (0, 0, 195, 5)
+    """
+
+    def __init__(self, max_entries: int = 16, min_entries: int | None = None) -> None:
+        """Create a new R-tree.
+
+        Nodes hold at most ``max_entries`` entries. Nodes with fewer than
+        ``min_entries`` entries (default: 40% of ``max_entries``) are
+        removed, and their items are added again.
+        """
+        if max_entries < 4:
+            raise ValueError("An R-tree node should hold at least 4 entries")
+        self._max_entries = max_entries
+        self._min_entries = min(
+            min_entries or max(2, int(max_entries * 0.4)), max_entries // 2
+        )
+        self._root: RTreeNode[T] = RTreeNode(leaf=True)
+        # Easy lookup item->bounds, and item->leaf node
+        self._ids: dict[T, Rect] = {}
+        self._leaves: dict[T, RTreeNode[T]] = {}
+
+    @property
+    def soft_bounds(self) -> Rect:
+        """The bounding box of all items, as (x, y, width, height)."""
+        if not self._ids:
+            return 0, 0, 0, 0
+        x0, y0, x1, y1 = self._root.edges
+        return x0, y0, x1 - x0, y1 - y0
+
+    @property
+    def height(self) -> int:
+        """The number of levels in the tree."""
+        height = 1
+        node = self._root
+        while not node.leaf:
+            node = node.children[0]
+            height += 1
+        return height
+
+    def add(self, item: T, bounds: Rect) -> None:
+        """Add an item to the tree.
+
+        If an item already exists, its bounds are updated.
+        """
+        x, y, w, h = bounds
+        edges = (x, y, x + w, y + h)
+        if (leaf := self._leaves.get(item)) is not None:
+            if _contains(leaf.edges, edges):
+                # Fast lane: the item is still in the area of its leaf
+                leaf.items = [
+                    (edges, i) if i == item else (e, i) for e, i in leaf.items
+                ]
+                self._ids[item] = bounds
+                _adjust(leaf)
+                return
+            self._remove(item)
+
+        self._ids[item] = bounds
+        self._insert(item, edges)
+
+    def load(self, items: Iterable[tuple[T, Rect]]) -> None:
+        """Add many items at once.
+
+        The tree is rebuilt with all items, new and existing. Nodes are
+        packed with the Sort-Tile-Recursive algorithm, which results in
+        a well balanced tree.
+        """
+        ids = self._ids
+        ids.update(items)
+        self._leaves.clear()
+        entries = [((x, y, x + w, y + h), item) for item, (x, y, w, h) in ids.items()]
+        if not entries:
+            self._root = RTreeNode(leaf=True)
+            return
+
+        capacity = self._max_entries
+        leaves = []
+        for chunk in _str_pack(entries, capacity, lambda entry: entry[0]):
+            leaf: RTreeNode[T] = RTreeNode(leaf=True)
+            leaf.items = chunk
+            leaf.edges = _union_all(e for e, _ in chunk)
+            for _e, item in chunk:
+                self._leaves[item] = leaf
+            leaves.append(leaf)
+
+        nodes = leaves
+        while len(nodes) > 1:
+            parents = []
+            for chunk_nodes in _str_pack(nodes, capacity, lambda node: node.edges):
+                parent: RTreeNode[T] = RTreeNode(leaf=False)
+                parent.children = chunk_nodes
+                parent.edges = _union_all(n.edges for n in chunk_nodes)
+                for node in chunk_nodes:
+                    node.parent = parent
+                parents.append(parent)
+            nodes = parents
+        self._root = nodes[0]
+        self._root.parent = None
+
+    def remove(self, item: T) -> None:
+        """Remove an item from the tree."""
+        if item in self._ids:
+            self._remove(item)
+            del self._ids[item]
+
+    def clear(self) -> None:
+        """Remove all items from the tree."""
+        self._root = RTreeNode(leaf=True)
+        self._ids.clear()
+        self._leaves.clear()
+
+    def get_bounds(self, item: T) -> Rect:
+        """Return the bounding box for the given item."""
+        return self._ids[item]
+
+    def find_inside(self, rect: Rect) -> set[T]:
+        """Find all items in the given rectangle (x, y, with, height)."""
+        return self._find(rect, contain=True)
+
+    def find_intersect(self, rect: Rect) -> set[T]:
+        """Find all items that intersect with the given rectangle (x, y, width,
+        height)."""
+        return self._find(rect, contain=False)
+
+    def find_nearest(
+        self,
+        point: Point,
+        k: int = 1,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> list[tuple[float, T]]:
+        """Find the ``k`` items nearest to ``point``.
+
+        Returns a list of ``(distance, item)`` tuples, nearest first.
+
+        >>> rtree = RTree()
+        >>> for i in range(10):
+        ...     rtree.add(f"{i}", (i * 10, 0, 5, 5))
+        >>> rtree.find_nearest((32, 2), k=2)
+        [(0.0, '3'), (7.0, '2')]
+        """
+        return list(islice(self.iter_nearest(point, max_distance, distance_fn), k))
+
+    def iter_nearest(
+        self,
+        point: Point,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> Iterator[tuple[float, T]]:
+        """Iterate ``(distance, item)`` tuples for items near ``point``,
+        nearest first.
+
+        See :meth:`gaphas.quadtree.Quadtree.iter_nearest`.
+        """
+        px, py = point
+        # Distance for items that contain the point, if exact distances may be negative
+        inside = -math.inf if distance_fn else 0.0
+
+        def distance_to(edges: Edges) -> float:
+            x0, y0, x1, y1 = edges
+            dx = x0 - px if px < x0 else px - x1 if px > x1 else 0.0
+            dy = y0 - py if py < y0 else py - y1 if py > y1 else 0.0
+            return math.hypot(dx, dy) if dx or dy else inside
+
+        if not self._ids:
+            return
+
+        # Entries are (distance, seq, node, item, exact)
+        seq = count()
+        heap: list[tuple[float, int, RTreeNode[T] | None, T | None, bool]] = [
+            (distance_to(self._root.edges), next(seq), self._root, None, False)
+        ]
+        push = heapq.heappush
+        pop = heapq.heappop
+        while heap:
+            distance, _, node, item, exact = pop(heap)
+            if distance > max_distance:
+                return
+            if node is not None:
+                if node.leaf:
+                    for edges, i in node.items:
+                        if (d := distance_to(edges)) <= max_distance:
+                            push(heap, (d, next(seq), None, i, False))
+                else:
+                    for child in node.children:
+                        if (d := distance_to(child.edges)) <= max_distance:
+                            push(heap, (d, next(seq), child, None, False))
+            elif exact or not distance_fn:
+                yield distance, item  # type: ignore[misc]
+            elif (d := distance_fn(item, point)) <= max_distance:  # type: ignore[arg-type]
+                push(heap, (d, next(seq), None, item, True))
+
+    def __len__(self) -> int:
+        """Return number of items in tree."""
+        return len(self._ids)
+
+    def __contains__(self, item: T) -> bool:
+        """Check if an item is in tree."""
+        return item in self._ids
+
+    def _find(self, rect: Rect, contain: bool) -> set[T]:
+        rx, ry, rw, rh = rect
+        rx1 = rx + rw
+        ry1 = ry + rh
+        found: set[T] = set()
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            x0, y0, x1, y1 = node.edges
+            if rx > x1 or rx1 < x0 or ry > y1 or ry1 < y0:
+                continue
+            if rx <= x0 and ry <= y0 and rx1 >= x1 and ry1 >= y1:
+                node.all_items(found)
+            elif not node.leaf:
+                nodes.extend(node.children)
+            elif contain:
+                found.update(
+                    item
+                    for (x0, y0, x1, y1), item in node.items
+                    if rx <= x0 and ry <= y0 and rx1 >= x1 and ry1 >= y1
+                )
+            else:
+                found.update(
+                    item
+                    for (x0, y0, x1, y1), item in node.items
+                    if x0 <= rx1 and x1 >= rx and y0 <= ry1 and y1 >= ry
+                )
+        return found
+
+    def _insert(self, item: T, edges: Edges) -> None:
+        node = self._root
+        while not node.leaf:
+            node = _choose_child(node.children, edges)
+        node.items.append((edges, item))
+        self._leaves[item] = node
+        if len(node.items) > self._max_entries:
+            self._split(node)
+        else:
+            _extend(node, edges)
+
+    def _split(self, node: RTreeNode[T]) -> None:
+        """Split an overflowing node, and its ancestors if they overflow."""
+        while True:
+            sibling: RTreeNode[T] = RTreeNode(leaf=node.leaf)
+            if node.leaf:
+                node.items, sibling.items = _split_entries(
+                    node.items, self._min_entries, lambda entry: entry[0]
+                )
+                node.edges = _union_all(e for e, _ in node.items)
+                sibling.edges = _union_all(e for e, _ in sibling.items)
+                for _e, item in sibling.items:
+                    self._leaves[item] = sibling
+            else:
+                node.children, sibling.children = _split_entries(
+                    node.children, self._min_entries, lambda child: child.edges
+                )
+                node.edges = _union_all(c.edges for c in node.children)
+                sibling.edges = _union_all(c.edges for c in sibling.children)
+                for child in sibling.children:
+                    child.parent = sibling
+
+            parent = node.parent
+            if parent is None:
+                root: RTreeNode[T] = RTreeNode(leaf=False)
+                root.children = [node, sibling]
+                root.edges = _union(node.edges, sibling.edges)
+                node.parent = sibling.parent = root
+                self._root = root
+                return
+
+            parent.children.append(sibling)
+            sibling.parent = parent
+            if len(parent.children) <= self._max_entries:
+                _adjust(parent)
+                return
+            node = parent
+
+    def _remove(self, item: T) -> None:
+        """Remove an item, and add items of nodes that became too small
+        again."""
+        leaf = self._leaves.pop(item)
+        leaf.items = [(e, i) for e, i in leaf.items if i != item]
+
+        orphans: set[T] = set()
+        node = leaf
+        while (parent := node.parent) is not None:
+            if len(node) < self._min_entries:
+                parent.children.remove(node)
+                node.all_items(orphans)
+            node.edges = _union_all(node.entry_edges())
+            node = parent
+        node.edges = _union_all(node.entry_edges())
+
+        root = self._root
+        while not root.leaf and len(root.children) == 1:
+            root = root.children[0]
+            root.parent = None
+        if not root.leaf and not root.children:
+            root = RTreeNode(leaf=True)
+        self._root = root
+
+        for orphan in orphans:
+            x, y, w, h = self._ids[orphan]
+            self._insert(orphan, (x, y, x + w, y + h))
+
+
+class RTreeNode(Generic[T]):
+    """A node in an R-tree."""
+
+    __slots__ = ("children", "edges", "items", "leaf", "parent")
+
+    def __init__(self, leaf: bool, parent: RTreeNode[T] | None = None) -> None:
+        self.leaf = leaf
+        self.parent = parent
+        self.edges: Edges = EMPTY
+        # Leaf nodes contain items, other nodes contain child nodes
+        self.items: list[tuple[Edges, T]] = []
+        self.children: list[RTreeNode[T]] = []
+
+    def __len__(self) -> int:
+        return len(self.items) if self.leaf else len(self.children)
+
+    def entry_edges(self) -> Iterator[Edges]:
+        if self.leaf:
+            return (edges for edges, _item in self.items)
+        return (child.edges for child in self.children)
+
+    def all_items(self, found: set[T]) -> None:
+        """Add all items in this node and its children to ``found``."""
+        nodes = [self]
+        while nodes:
+            node = nodes.pop()
+            if node.leaf:
+                found.update(item for _edges, item in node.items)
+            else:
+                nodes.extend(node.children)
+
+
+def _union(a: Edges, b: Edges) -> Edges:
+    return (
+        a[0] if a[0] < b[0] else b[0],
+        a[1] if a[1] < b[1] else b[1],
+        a[2] if a[2] > b[2] else b[2],
+        a[3] if a[3] > b[3] else b[3],
+    )
+
+
+def _union_all(edges: Iterable[Edges]) -> Edges:
+    ux0, uy0, ux1, uy1 = EMPTY
+    for x0, y0, x1, y1 in edges:
+        if x0 < ux0:
+            ux0 = x0
+        if y0 < uy0:
+            uy0 = y0
+        if x1 > ux1:
+            ux1 = x1
+        if y1 > uy1:
+            uy1 = y1
+    return ux0, uy0, ux1, uy1
+
+
+def _contains(outer: Edges, inner: Edges) -> bool:
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[2] >= inner[2]
+        and outer[3] >= inner[3]
+    )
+
+
+def _area(edges: Edges) -> float:
+    x0, y0, x1, y1 = edges
+    return max(0.0, x1 - x0) * max(0.0, y1 - y0)
+
+
+def _margin(edges: Edges) -> float:
+    x0, y0, x1, y1 = edges
+    return max(0.0, x1 - x0) + max(0.0, y1 - y0)
+
+
+def _extend(node: RTreeNode[T] | None, edges: Edges) -> None:
+    """Extend the edges of a node and its ancestors to include ``edges``."""
+    while node is not None and not _contains(node.edges, edges):
+        node.edges = _union(node.edges, edges)
+        node = node.parent
+
+
+def _adjust(node: RTreeNode[T] | None) -> None:
+    """Recalculate the edges of a node and its ancestors."""
+    while node is not None:
+        edges = _union_all(node.entry_edges())
+        if edges == node.edges:
+            return
+        node.edges = edges
+        node = node.parent
+
+
+def _choose_child(children: list[RTreeNode[T]], edges: Edges) -> RTreeNode[T]:
+    """The child that needs the least enlargement to include ``edges``."""
+    ex0, ey0, ex1, ey1 = edges
+    best = children[0]
+    best_growth = best_area = math.inf
+    for child in children:
+        x0, y0, x1, y1 = child.edges
+        area = (x1 - x0) * (y1 - y0)
+        growth = ((x1 if x1 > ex1 else ex1) - (x0 if x0 < ex0 else ex0)) * (
+            (y1 if y1 > ey1 else ey1) - (y0 if y0 < ey0 else ey0)
+        ) - area
+        if growth < best_growth or (growth == best_growth and area < best_area):
+            best, best_growth, best_area = child, growth, area
+    return best
+
+
+E = TypeVar("E")
+
+
+def _split_entries(
+    entries: list[E], min_entries: int, edges_of: Callable[[E], Edges]
+) -> tuple[list[E], list[E]]:
+    """Split entries in two groups, R*-tree style.
+
+    The split axis is the one where the groups have the smallest margins.
+    Along that axis the distribution with the least overlap between groups
+    is chosen, then the one with the smallest area.
+    """
+    n = len(entries)
+    best_margin = math.inf
+    candidates: list[tuple[list[E], list[Edges], list[Edges]]] = []
+    for axis in (0, 1):
+        margin = 0.0
+        axis_candidates = []
+        for edge in (axis, axis + 2):
+            ordered = sorted(entries, key=lambda e: edges_of(e)[edge])  # noqa: B023
+            heads = list(_running_unions(ordered, edges_of))
+            tails = list(_running_unions(ordered[::-1], edges_of))[::-1]
+            for k in range(min_entries, n - min_entries + 1):
+                margin += _margin(heads[k - 1]) + _margin(tails[k])
+            axis_candidates.append((ordered, heads, tails))
+        if margin < best_margin:
+            best_margin = margin
+            candidates = axis_candidates
+
+    best_key = (math.inf, math.inf)
+    best_split: tuple[list[E], list[E]] = ([], [])
+    for ordered, heads, tails in candidates:
+        for k in range(min_entries, n - min_entries + 1):
+            head, tail = heads[k - 1], tails[k]
+            overlap = _area(
+                (
+                    max(head[0], tail[0]),
+                    max(head[1], tail[1]),
+                    min(head[2], tail[2]),
+                    min(head[3], tail[3]),
+                )
+            )
+            key = (overlap, _area(head) + _area(tail))
+            if key < best_key:
+                best_key = key
+                best_split = (ordered[:k], ordered[k:])
+    return best_split
+
+
+def _running_unions(
+    entries: list[E], edges_of: Callable[[E], Edges]
+) -> Iterator[Edges]:
+    edges = EMPTY
+    for entry in entries:
+        edges = _union(edges, edges_of(entry))
+        yield edges
+
+
+def _str_pack(
+    entries: list[E], capacity: int, edges_of: Callable[[E], Edges]
+) -> Iterator[list[E]]:
+    """Sort-Tile-Recursive packing: group entries in chunks of ``capacity``
+    entries, that are close together."""
+    slices = math.ceil(math.sqrt(math.ceil(len(entries) / capacity)))
+    slice_size = slices * capacity
+
+    def center_x(entry: E) -> float:
+        x0, _y0, x1, _y1 = edges_of(entry)
+        return x0 + x1
+
+    def center_y(entry: E) -> float:
+        _x0, y0, _x1, y1 = edges_of(entry)
+        return y0 + y1
+
+    by_x = sorted(entries, key=center_x)
+    for s in range(0, len(by_x), slice_size):
+        by_y = sorted(by_x[s : s + slice_size], key=center_y)
+        for c in range(0, len(by_y), capacity):
+            yield by_y[c : c + capacity]
@@ -3,12 +3,12 @@
 from __future__ import annotations
 
 from functools import singledispatch
-from typing import Union
+from typing import Iterable, Union
 
 from gaphas.connector import Handle, LinePort
 from gaphas.cursor import DEFAULT_CURSOR, LINE_CURSOR, cursor, line_hover
 from gaphas.geometry import distance_point_point_fast
-from gaphas.item import Line, matrix_i2i
+from gaphas.item import SEGMENT_INDEX_SIZE, Line, matrix_i2i
 from gaphas.model import Model
 from gaphas.painter.handlepainter import GREEN_4, draw_handle
 from gaphas.selection import Selection
@@ -38,11 +38,18 @@ class LineSegment:
         item = self.item
         handles = item.handles()
         x, y = item.matrix_i2c.inverse().transform_point(*pos)
-        for h1, h2 in zip(handles, handles[1:]):
+        if len(handles) > SEGMENT_INDEX_SIZE:
+            # Segments with their middle within 4 points from pos
+            segments: Iterable[int] = item.segment_index().find_intersect(
+                (x - 4, y - 4, 8, 8)
+            )
+        else:
+            segments = range(len(handles) - 1)
+        for segment in segments:
+            h1, h2 = handles[segment], handles[segment + 1]
             xp = (h1.pos.x + h2.pos.x) / 2
             yp = (h1.pos.y + h2.pos.y) / 2
             if distance_point_point_fast((x, y), (xp, yp)) <= 4:
-                segment = handles.index(h1)
                 handles, ports = self.split_segment(segment)
                 return handles and handles[0]
 
@@ -86,7 +93,7 @@ class LineSegment:
 
         do_split(segment, count)
 
-        # force orthogonal constraints to be recreated
+        # update orthogonal constraints of the changed segments
         item.update_orthogonal_constraints()
 
         self.recreate_constraints()
@@ -133,7 +140,7 @@ class LineSegment:
         port = LinePort(p1, p2)
         item.insert_port(segment, port)
 
-        # force orthogonal constraints to be recreated
+        # update orthogonal constraints of the changed segments
         item.update_orthogonal_constraints()
 
         self.recreate_constraints()
@@ -0,0 +1,185 @@
+"""
+Segment index
+=============
+
+A bounding volume hierarchy over the segments of a line. Consecutive
+segments of a line lie close to each other, so segments are grouped in
+order: each leaf holds a run of segments, and each node above the leaves
+holds two nodes from the level below. Building the index takes linear time,
+finding the segments nearest to a point takes logarithmic time.
+
+The index is static: if the segments change, a new index should be built.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections.abc import Iterator, Sequence
+from itertools import islice
+
+from gaphas.geometry import Point, Rect, distance_line_point
+
+# Rectangle edges: (x0, y0, x1, y1)
+Edges = tuple[float, float, float, float]
+
+
+class SegmentIndex:
+    """An index over line segments, for nearest segment queries.
+
+    Segments are identified by their position in the sequence of segments
+    the index is built from.
+
+    >>> index = SegmentIndex.from_points([(0, 0), (10, 0), (10, 10), (0, 10)])
+    >>> len(index)
+    3
+    >>> index.nearest((12, 5))
+    (2.0, 1, (10.0, 5.0))
+    >>> index.find_intersect((8, 8, 4, 4))
+    [1, 2]
+    """
+
+    def __init__(
+        self, segments: Sequence[tuple[Point, Point]], leaf_size: int = 8
+    ) -> None:
+        if leaf_size < 1:
+            raise ValueError("A leaf should hold at least one segment")
+        self._segments = [
+            ((float(x0), float(y0)), (float(x1), float(y1)))
+            for (x0, y0), (x1, y1) in segments
+        ]
+        self._leaf_size = leaf_size
+        self._edges: list[Edges] = [
+            (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+            for (x0, y0), (x1, y1) in self._segments
+        ]
+        # Node edges per level, from the leaves up to the root
+        self._levels: list[list[Edges]] = []
+        if self._edges:
+            level = [
+                _union(self._edges[i : i + leaf_size])
+                for i in range(0, len(self._edges), leaf_size)
+            ]
+            self._levels.append(level)
+            while len(level) > 1:
+                level = [_union(level[i : i + 2]) for i in range(0, len(level), 2)]
+                self._levels.append(level)
+
+    @classmethod
+    def from_points(cls, points: Sequence[Point], leaf_size: int = 8) -> SegmentIndex:
+        """Create an index for the segments of a line through ``points``."""
+        return cls(list(zip(points[:-1], points[1:])), leaf_size)
+
+    @property
+    def segments(self) -> Sequence[tuple[Point, Point]]:
+        return self._segments
+
+    def find_intersect(self, rect: Rect) -> list[int]:
+        """Find the segments of which the bounding box intersects with the
+        given rectangle (x, y, width, height).
+
+        Segments are returned in order.
+        """
+        if not self._levels:
+            return []
+        rx, ry, rw, rh = rect
+        rx1 = rx + rw
+        ry1 = ry + rh
+        levels = self._levels
+        edges = self._edges
+        leaf_size = self._leaf_size
+        found = []
+        # Entries are (level, node)
+        stack = [(len(levels) - 1, 0)]
+        while stack:
+            level, node = stack.pop()
+            x0, y0, x1, y1 = levels[level][node]
+            if x0 > rx1 or x1 < rx or y0 > ry1 or y1 < ry:
+                continue
+            if level:
+                children = levels[level - 1]
+                # Right child first, so segments are found in order
+                if 2 * node + 1 < len(children):
+                    stack.append((level - 1, 2 * node + 1))
+                stack.append((level - 1, 2 * node))
+            else:
+                start = node * leaf_size
+                for i in range(start, min(start + leaf_size, len(edges))):
+                    x0, y0, x1, y1 = edges[i]
+                    if x0 <= rx1 and x1 >= rx and y0 <= ry1 and y1 >= ry:
+                        found.append(i)
+        return found
+
+    def nearest(
+        self, point: Point, max_distance: float = math.inf
+    ) -> tuple[float, int, Point] | None:
+        """Find the segment nearest to ``point``.
+
+        Returns a ``(distance, segment, point on segment)`` tuple, or ``None``
+        if there are no segments within ``max_distance``.
+        """
+        return next(self.iter_nearest(point, max_distance), None)
+
+    def find_nearest(
+        self, point: Point, k: int = 1, max_distance: float = math.inf
+    ) -> list[tuple[float, int, Point]]:
+        """Find the ``k`` segments nearest to ``point``.
+
+        Returns a list of ``(distance, segment, point on segment)`` tuples,
+        nearest first.
+        """
+        return list(islice(self.iter_nearest(point, max_distance), k))
+
+    def iter_nearest(
+        self, point: Point, max_distance: float = math.inf
+    ) -> Iterator[tuple[float, int, Point]]:
+        """Iterate ``(distance, segment, point on segment)`` tuples for
+        segments near ``point``, nearest first."""
+        if not self._levels:
+            return
+        px, py = float(point[0]), float(point[1])
+        p = (px, py)
+        levels = self._levels
+        segments = self._segments
+        leaf_size = self._leaf_size
+
+        def distance_to(edges: Edges) -> float:
+            x0, y0, x1, y1 = edges
+            dx = x0 - px if px < x0 else px - x1 if px > x1 else 0.0
+            dy = y0 - py if py < y0 else py - y1 if py > y1 else 0.0
+            return math.hypot(dx, dy) if dx or dy else 0.0
+
+        # Entries are (distance, kind, level or segment, node, point): nodes
+        # (kind 0) are expanded before segments (kind 1) at the same distance.
+        root = len(levels) - 1
+        heap: list[tuple[float, int, int, int, Point | None]] = [
+            (distance_to(levels[root][0]), 0, root, 0, None)
+        ]
+        push = heapq.heappush
+        pop = heapq.heappop
+        while heap:
+            distance, kind, level, node, on_segment = pop(heap)
+            if distance > max_distance:
+                return
+            if kind:
+                yield distance, level, on_segment  # type: ignore[misc]
+            elif level:
+                children = levels[level - 1]
+                for child in range(2 * node, min(2 * node + 2, len(children))):
+                    if (d := distance_to(children[child])) <= max_distance:
+                        push(heap, (d, 0, level - 1, child, None))
+            else:
+                start = node * leaf_size
+                for i in range(start, min(start + leaf_size, len(segments))):
+                    d, q = distance_line_point(*segments[i], p)
+                    if d <= max_distance:
+                        push(heap, (d, 1, i, 0, q))
+
+    def __len__(self) -> int:
+        """Return number of segments in the index."""
+        return len(self._segments)
+
+
+def _union(edges: Sequence[Edges]) -> Edges:
+    x0s, y0s, x1s, y1s = zip(*edges)
+    return min(x0s), min(y0s), max(x1s), max(y1s)
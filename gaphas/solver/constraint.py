@@ -27,6 +27,8 @@ class BaseConstraint:
     - weakest   - list of weakest variables
     """
 
+    __slots__ = ("__weakref__", "_handlers", "_variables", "_weakest")
+
     def __init__(self, *variables):
         """Create new constraint, register all variables, and find weakest
         variables.
@@ -39,7 +41,8 @@ class BaseConstraint:
         strength = min(v.strength for v in self._variables)
         # manage weakest based on id, so variables are uniquely identifiable
         self._weakest = [(id(v), v) for v in self._variables if v.strength == strength]
-        self._handlers: set[Callable[[Constraint], None]] = set()
+        # Created when the first handler is added
+        self._handlers: set[Callable[[Constraint], None]] | None = None
 
     def variables(self):
         """Return an iterator which iterates over the variables that are held
@@ -50,17 +53,23 @@ class BaseConstraint:
         if not self._handlers:
             for v in self._variables:
                 v.add_handler(self._propagate)
-        self._handlers.add(handler)
+        if self._handlers is None:
+            self._handlers = {handler}
+        else:
+            self._handlers.add(handler)
 
     def remove_handler(self, handler: Callable[[Constraint], None]) -> None:
+        if not self._handlers:
+            return
         self._handlers.discard(handler)
         if not self._handlers:
             for v in self._variables:
                 v.remove_handler(self._propagate)
 
     def notify(self):
-        for handler in self._handlers:
-            handler(self)
+        if self._handlers:
+            for handler in self._handlers:
+                handler(self)
 
     def _propagate(self, variable, _old):
         self.mark_dirty(variable)
@@ -111,6 +120,8 @@ class BaseConstraint:
 class MultiConstraint:
     """A constraint containing constraints."""
 
+    __slots__ = ("__weakref__", "_constraints")
+
     def __init__(self, *constraints: Constraint):
         self._constraints = constraints
 
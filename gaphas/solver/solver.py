@@ -36,7 +36,7 @@ variables to make the constraint valid again.
 from __future__ import annotations
 
 import functools
-from collections.abc import Callable, Collection
+from collections.abc import Callable, Collection, Iterable
 
 from gaphas.solver.constraint import Constraint, ContainsConstraints
 
@@ -96,19 +96,33 @@ class Solver:
         >>> len(s._constraints)
         1
         """
-        assert constraint, f"No constraint ({constraint})"
-        self._constraints.add(constraint)
-        self._marked_cons.append(constraint)
-        constraint.add_handler(self.request_resolve_constraint)
+        self.add_constraints((constraint,))
         return constraint
 
+    def add_constraints(self, constraints: Iterable[Constraint]) -> None:
+        """Add many constraints at once."""
+        new_constraints = list(constraints)
+        assert all(new_constraints), f"No constraint in ({new_constraints})"
+        self._constraints.update(new_constraints)
+        self._marked_cons.extend(new_constraints)
+        request_resolve = self.request_resolve_constraint
+        for constraint in new_constraints:
+            constraint.add_handler(request_resolve)
+
     def remove_constraint(self, constraint: Constraint) -> None:
         """Remove a constraint from the solver."""
         assert constraint, f"No constraint ({constraint})"
-        constraint.remove_handler(self.request_resolve_constraint)
-        self._constraints.discard(constraint)
-        while constraint in self._marked_cons:
-            self._marked_cons.remove(constraint)
+        self.remove_constraints((constraint,))
+
+    def remove_constraints(self, constraints: Iterable[Constraint]) -> None:
+        """Remove many constraints at once."""
+        removed = set(constraints)
+        request_resolve = self.request_resolve_constraint
+        for constraint in removed:
+            constraint.remove_handler(request_resolve)
+        self._constraints.difference_update(removed)
+        # Update in place: the list may be in use by solve()
+        self._marked_cons[:] = [c for c in self._marked_cons if c not in removed]
 
     def request_resolve_constraint(self, c: Constraint) -> None:
         """Request resolving a constraint."""
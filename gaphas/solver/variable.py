@@ -71,23 +71,31 @@ class Variable:
     The ``variable`` decorator can be used to easily define variables in classes.
     """
 
+    __slots__ = ("__weakref__", "_handlers", "_strength", "_value")
+
     def __init__(self, value: SupportsFloat = 0.0, strength: int = NORMAL):
         self._value = float(value)
         self._strength = strength
-        self._handlers: set[Callable[[Variable, float], None]] = set()
+        # Created when the first handler is added
+        self._handlers: set[Callable[[Variable, float], None]] | None = None
 
     def add_handler(self, handler: Callable[[Variable, float], None]) -> None:
         """Add a handler, to be invoked when the value changes."""
-        self._handlers.add(handler)
+        if self._handlers is None:
+            self._handlers = {handler}
+        else:
+            self._handlers.add(handler)
 
     def remove_handler(self, handler: Callable[[Variable, float], None]) -> None:
         """Remove a handler."""
-        self._handlers.discard(handler)
+        if self._handlers:
+            self._handlers.discard(handler)
 
     def notify(self, old: float) -> None:
         """Notify all handlers."""
-        for handler in self._handlers:
-            handler(self, old)
+        if self._handlers:
+            for handler in self._handlers:
+                handler(self, old)
 
     @property
     def strength(self) -> int:
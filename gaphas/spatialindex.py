@@ -0,0 +1,91 @@
+"""Spatial indexes keep track of the bounding boxes of items.
+
+The view uses a spatial index to find the items that should be drawn, and
+the items near the mouse pointer. Gaphas ships three implementations:
+
+:class:`~gaphas.quadtree.Quadtree`
+    The default. A good fit for most diagrams.
+:class:`~gaphas.rtree.RTree`
+    Groups items by proximity. Works well for diagrams with large
+    containers and long lines, and for sparse diagrams.
+:class:`~gaphas.hashgrid.HashGrid`
+    A uniform grid. Fast for dense diagrams with items of similar size.
+
+The view can be given another index::
+
+    view = GtkView(spatial_index=RTree())
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Iterable, Iterator
+from typing import Protocol, TypeVar
+
+from gaphas.geometry import Point, Rect
+
+T = TypeVar("T")
+
+
+class SpatialIndex(Protocol[T]):
+    """Index items by their bounding box.
+
+    Bounds are rectangles ``(x, y, width, height)``.
+    """
+
+    @property
+    def soft_bounds(self) -> Rect:
+        """The bounding box of all items in the index."""
+
+    def add(self, item: T, bounds: Rect) -> None:
+        """Add an item, or update the bounds of an item already in the
+        index."""
+
+    def load(self, items: Iterable[tuple[T, Rect]]) -> None:
+        """Add (or update) many ``(item, bounds)`` pairs at once."""
+
+    def remove(self, item: T) -> None:
+        """Remove an item. Unknown items are ignored."""
+
+    def clear(self) -> None:
+        """Remove all items."""
+
+    def get_bounds(self, item: T) -> Rect:
+        """Return the bounds of an item.
+
+        Raises a :exc:`KeyError` if the item is not in the index.
+        """
+
+    def find_inside(self, rect: Rect) -> set[T]:
+        """Find all items inside ``rect``."""
+
+    def find_intersect(self, rect: Rect) -> set[T]:
+        """Find all items inside, or intersecting with, ``rect``."""
+
+    def find_nearest(
+        self,
+        point: Point,
+        k: int = 1,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> list[tuple[float, T]]:
+        """Find the ``k`` items nearest to ``point``, as ``(distance, item)``
+        tuples."""
+
+    def iter_nearest(
+        self,
+        point: Point,
+        max_distance: float = math.inf,
+        distance_fn: Callable[[T, Point], float] | None = None,
+    ) -> Iterator[tuple[float, T]]:
+        """Iterate ``(distance, item)`` tuples, nearest first.
+
+        The distance is the distance to the bounding box of an item, unless
+        a ``distance_fn(item, point)`` is provided. Outside the bounding
+        box, that distance should not be smaller than the distance to the
+        bounding box.
+        """
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, item: T) -> bool: ...
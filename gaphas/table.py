@@ -2,10 +2,10 @@
 would in a database table, with indexes on the desired "columns."."""
 
 from __future__ import annotations
-from contextlib import suppress
-from functools import reduce
 from typing import (
+    Collection,
     Generic,
+    Iterable,
     Iterator,
     Protocol,
     Sequence,
@@ -30,23 +30,61 @@ class Table(Generic[T]):
     Optimized for lookups.
     """
 
-    def __init__(self, columns: Type[T], indexes: Sequence[int]) -> None:
+    def __init__(
+        self,
+        columns: Type[T],
+        indexes: Sequence[int | tuple[int, ...]],
+        unique: Sequence[int | tuple[int, ...]] = (),
+    ) -> None:
         """Create a new Store instance with columns and indexes:
 
         >>> from collections import namedtuple
         >>> C = namedtuple('C', "foo bar baz")
         >>> s = Table(C, (2,))
+
+        An index on a tuple of columns is a composite index. It is used for
+        queries on exactly those columns. Unique indexes map a (composite)
+        key to a single row. Rows with ``None`` in a unique key are not
+        part of that index.
+
+        >>> s = Table(C, (0, (0, 1)), unique=(2,))
         """
         assert isinstance(columns, NamedTupleish)
         fields: Sequence[str] = columns._fields
 
         self._type: Type[T] = columns
-        self._indexes: Sequence[str] = [fields[i] for i in indexes]
+        self._indexes: Sequence[str] = [
+            fields[i] for i in indexes if isinstance(i, int)
+        ]
         self._fields: Sequence[str] = fields
+        self._indexed: frozenset[str] = frozenset(self._indexes)
 
         # create data structure, which acts as cache
         self._index: dict[str, dict[object, set[object]]] = {n: {} for n in fields}
 
+        # Composite and unique indexes, by column names (in index order)
+        self._composite: dict[tuple[str, ...], dict[object, set[object]]] = {
+            tuple(fields[c] for c in i): {} for i in indexes if not isinstance(i, int)
+        }
+        self._unique: dict[tuple[str, ...], dict[object, object]] = {
+            tuple(fields[c] for c in _columns(i)): {} for i in unique
+        }
+        # Lookup of composite and unique indexes by the set of columns
+        self._keyed: dict[
+            frozenset[str], tuple[tuple[str, ...], dict[object, set[object]]]
+        ] = {
+            frozenset(names): (names, index) for names, index in self._composite.items()
+        }
+        self._keyed_unique: dict[
+            frozenset[str], tuple[tuple[str, ...], dict[object, object]]
+        ] = {frozenset(names): (names, index) for names, index in self._unique.items()}
+        # Column names (as passed to query()) that have been validated
+        self._validated: set[tuple[str, ...]] = set()
+        # Unique index lookup, by the column names as passed to get()
+        self._get_cache: dict[
+            tuple[str, ...], tuple[tuple[str, ...], dict[object, object]]
+        ] = {}
+
     @property
     def columns(self) -> Type[T]:
         return self._type
@@ -67,20 +105,113 @@ class Table(Generic[T]):
         Traceback (most recent call last):
         ...
         ValueError: Number of arguments doesn't match the number of columns (2 != 3)
+
+        Values in a unique index can occur only once. Inserting the same
+        row again is a no-op, like it is for a table without unique indexes:
+
+        >>> s = Table(C, (), unique=(0,))
+        >>> s.insert('a', 'b', 'c')
+        >>> s.insert('a', 'b', 'c')
+        >>> s.get(foo='a')
+        C(foo='a', bar='b', baz='c')
+        >>> s.insert('a', 'v', 'd')                     # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        ValueError: Duplicate value ('a',) for unique index ('foo',)
         """
-        if len(values) != len(self._fields):
-            raise ValueError(
-                f"Number of arguments doesn't match the number of columns ({len(values)} != {len(self._fields)})"
-            )
+        self.insert_many((values,))
+
+    def insert_many(self, rows: Iterable[Sequence[object]]) -> None:
+        """Add many sets of values to the store.
+
+        All rows are checked before the first row is added.
+
+        >>> from collections import namedtuple
+        >>> C = namedtuple('C', "foo bar baz")
+        >>> s = Table(C, (0,), unique=(1,))
+        >>> s.insert_many([('a', 'b', 'c'), ('a', 'v', 'd')])
+        >>> s.insert_many([(1, 2, 3), (1, 'b', 4)])     # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        ValueError: Duplicate value ('b',) for unique index ('bar',)
+        >>> sorted(s.query(foo='a'))
+        [C(foo='a', bar='b', baz='c'), C(foo='a', bar='v', baz='d')]
+        """
+        columns = len(self._fields)
+        make = self._type._make  # type: ignore[attr-defined]
+        data = []
+        for values in rows:
+            if len(values) != columns:
+                raise ValueError(
+                    f"Number of arguments doesn't match the number of columns ({len(values)} != {columns})"
+                )
+            data.append(make(values))
+
+        unique_rows = []
+        for names, unique in self._unique.items():
+            new_rows: dict[object, object] = {}
+            for row in data:
+                key = _key(row, names)
+                if key is None:
+                    continue
+                if (other := unique.get(key, new_rows.get(key))) == row:
+                    continue
+                if other is not None:
+                    raise ValueError(
+                        f"Duplicate value {tuple(getattr(row, n) for n in names)} for unique index {names}"
+                    )
+                new_rows[key] = row
+            unique_rows.append((unique, new_rows))
+        for unique, new_rows in unique_rows:
+            unique.update(new_rows)
+
         # Add value to index entries
-        index = self._index
-        data = self._type._make(values)  # type: ignore[attr-defined]
         for n in self._indexes:
-            v = getattr(data, n)
-            if v in index[n]:
-                index[n][v].add(data)
-            else:
-                index[n][v] = {data}
+            index = self._index[n]
+            for row in data:
+                v = getattr(row, n)
+                if (bucket := index.get(v)) is None:
+                    index[v] = {row}
+                else:
+                    bucket.add(row)
+        for names, composite in self._composite.items():
+            for row in data:
+                key = tuple(getattr(row, n) for n in names)
+                if (bucket := composite.get(key)) is None:
+                    composite[key] = {row}
+                else:
+                    bucket.add(row)
+
+    def get(self, **kv: object) -> T | None:
+        """Get the row for a key in a unique index, or ``None``.
+
+        >>> from collections import namedtuple
+        >>> C = namedtuple('C', "foo bar baz")
+        >>> s = Table(C, (0,), unique=(1, (0, 2)))
+        >>> s.insert('a', 'b', 'c')
+        >>> s.insert('a', 'v', 'd')
+        >>> s.get(bar='b')
+        C(foo='a', bar='b', baz='c')
+        >>> s.get(baz='d', foo='a')
+        C(foo='a', bar='v', baz='d')
+        >>> s.get(bar='q')
+        >>> s.get(foo='a')                                # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        AttributeError: Column foo is not uniquely indexed
+        """
+        try:
+            names, unique = self._get_cache[tuple(kv)]
+        except KeyError:
+            self._validate(kv)
+            try:
+                names, unique = self._keyed_unique[frozenset(kv)]
+            except KeyError:
+                raise AttributeError(
+                    f"Column{'s' if len(kv) > 1 else ''} {', '.join(kv)} {'are' if len(kv) > 1 else 'is'} not uniquely indexed"
+                ) from None
+            self._get_cache[tuple(kv)] = names, unique
+        return unique.get(_lookup_key(kv, names))  # type: ignore[return-value]
 
     def delete(self, *_row: object, **kv: object) -> None:
         """Remove value from the table. Either a complete set may be given or
@@ -127,18 +258,17 @@ class Table(Generic[T]):
             )
         if _row:
             assert len(_row) == len(fields)
-            kv = dict(list(zip(self._indexes, _row)))
-
-        rows = list(self.query(**kv))
+            data = self._type._make(_row)  # type: ignore[attr-defined]
+            rows: tuple[object, ...] = (data,) if self._contains(data) else ()
+        else:
+            if (names := tuple(kv)) not in self._validated:
+                self._validate(kv)
+                self._validated.add(names)
+            # Take a snapshot, since rows are removed from the index entries
+            rows = tuple(self._select(kv))
 
-        index = self._index
         for row in rows:
-            for i, n in enumerate(self._indexes):
-                v = row[i]
-                if v in index[n]:
-                    index[n][v].remove(row)
-                    if len(index[n][v]) == 0:
-                        del index[n][v]
+            self._remove(row)
 
     def query(self, **kv: object) -> Iterator[T]:
         """Get rows (tuples) for each key defined. An iterator is returned.
@@ -167,25 +297,141 @@ class Table(Generic[T]):
         Traceback (most recent call last):
         ...
         AttributeError: Column baz is not indexed
+
+        Queries on exactly the columns of a composite index use that index:
+
+        >>> s = Table(C, ((0, 2),))
+        >>> s.insert('a', 'b', 'c')
+        >>> list(s.query(baz='c', foo='a'))
+        [C(foo='a', bar='b', baz='c')]
         """
-        index = self._index
+        if (names := tuple(kv)) not in self._validated:
+            self._validate(kv)
+            self._validated.add(names)
+        return self._select(kv)  # type: ignore[return-value]
+
+    def _select(self, kv: dict[str, object]) -> Iterator[object]:
+        """Find rows matching ``kv``.
+
+        Rows are taken from the smallest matching index entry, and checked
+        against the other query values one at a time.
+        """
+        items = [(n, v) for n, v in kv.items() if v is not None]
+        if not items:
+            return iter(())
+
+        names = frozenset(n for n, _ in items)
+        if keyed_unique := self._keyed_unique.get(names):
+            columns, unique = keyed_unique
+            row = unique.get(_lookup_key(kv, columns))
+            return iter(() if row is None else (row,))
+        if keyed := self._keyed.get(names):
+            columns, composite = keyed
+            return iter(composite.get(_lookup_key(kv, columns), ()))
 
+        index = self._index
+        buckets: list[Collection[object]] = []
+        filters = []
+        for n, v in items:
+            if n in self._indexed:
+                if (bucket := index[n].get(v)) is None:
+                    return iter(())
+                buckets.append(bucket)
+            elif (unique_rows := self._unique.get((n,))) is not None:
+                if (row := unique_rows.get(v)) is None:
+                    return iter(())
+                buckets.append((row,))
+            else:
+                filters.append((n, v))
+
+        if not buckets:
+            rows: Iterable[object] = self._rows()
+        else:
+            buckets.sort(key=len)
+            rows = buckets[0]
+            del buckets[0]
+        if not buckets and not filters:
+            return iter(rows)
+        return (
+            row
+            for row in rows
+            if all(row in bucket for bucket in buckets)
+            and all(getattr(row, n) == v for n, v in filters)
+        )
+
+    def _validate(self, kv: dict[str, object]) -> None:
         bad = set(kv.keys()) - set(self._fields)
         if len(bad) == 1:
             raise KeyError(f"Invalid column {bad.pop()}")
         elif len(bad) > 1:
             raise KeyError(f"Invalid columns {tuple(bad)}")
 
-        bad = set(kv.keys()) - set(self._indexes)
+        names = frozenset(kv)
+        if names in self._keyed or names in self._keyed_unique:
+            return
+
+        bad = {n for n in kv if n not in self._indexes and (n,) not in self._unique}
         if len(bad) == 1:
             raise AttributeError(f"Column {bad.pop()} is not indexed")
         elif len(bad) > 1:
             raise AttributeError(f"Columns {tuple(bad)} are not indexed")
 
-        r: Iterator[T] = iter([])
-        items = tuple((n, v) for n, v in list(kv.items()) if v is not None)
-        if all(v in index[n] for n, v in items):
-            rows = (index[n][v] for n, v in items)
-            with suppress(TypeError):
-                r = iter(reduce(set.intersection, rows))  # type: ignore[arg-type]
-        return r
+    def _rows(self) -> Iterator[object]:
+        """All rows in the table."""
+        if self._indexes:
+            for rows in self._index[self._indexes[0]].values():
+                yield from rows
+        elif self._composite:
+            for rows in next(iter(self._composite.values())).values():
+                yield from rows
+        else:
+            for unique in self._unique.values():
+                yield from unique.values()
+                return
+
+    def _contains(self, row: tuple) -> bool:
+        if self._indexes:
+            n = self._indexes[0]
+            return row in self._index[n].get(getattr(row, n), ())
+        for names, composite in self._composite.items():
+            return row in composite.get(tuple(getattr(row, n) for n in names), ())
+        return any(
+            unique.get(_key(row, names)) == row
+            for names, unique in self._unique.items()
+        )
+
+    def _remove(self, row: object) -> None:
+        index = self._index
+        for n in self._indexes:
+            v = getattr(row, n)
+            if (rows := index[n].get(v)) is not None:
+                rows.discard(row)
+                if not rows:
+                    del index[n][v]
+        for names, composite in self._composite.items():
+            key = tuple(getattr(row, n) for n in names)
+            if (rows := composite.get(key)) is not None:
+                rows.discard(row)
+                if not rows:
+                    del composite[key]
+        for names, unique in self._unique.items():
+            unique_key = _key(row, names)
+            if unique_key is not None and unique.get(unique_key) == row:
+                del unique[unique_key]
+
+
+def _columns(index: int | tuple[int, ...]) -> tuple[int, ...]:
+    return (index,) if isinstance(index, int) else index
+
+
+def _key(row: object, names: tuple[str, ...]) -> object:
+    """The key of a row in a unique index, or ``None`` if part of the key is
+    ``None``."""
+    if len(names) == 1:
+        return getattr(row, names[0])
+    key = tuple(getattr(row, n) for n in names)
+    return None if any(v is None for v in key) else key
+
+
+def _lookup_key(kv: dict[str, object], names: tuple[str, ...]) -> object:
+    return kv[names[0]] if len(names) == 1 else tuple(kv[n] for n in names)
@@ -31,6 +31,16 @@ class Tree(Generic[T]):
     def nodes(self) -> Sequence[T]:
         return list(self._nodes)
 
+    def __contains__(self, node: object) -> bool:
+        """Check if ``node`` is part of the tree.
+
+        >>> tree = Tree()
+        >>> tree.add('n1')
+        >>> 'n1' in tree, 'n2' in tree
+        (True, False)
+        """
+        return node is not None and node in self._children
+
     def get_parent(self, node: T) -> T | None:
         """Return the parent item of ``node``.
 
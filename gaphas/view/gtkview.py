@@ -3,20 +3,42 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from dataclasses import dataclass
 from math import isclose
-from collections.abc import Collection, Iterable
+from collections.abc import Callable, Collection, Iterable, Iterator, Sequence
 
 import cairo
-from gi.repository import Graphene, GObject, Gtk
-
-from gaphas.geometry import Rect, Rectangle
+from gi.repository import GLib, Graphene, GObject, Gtk
+
+from gaphas.canvas import with_descendants
+from gaphas.geometry import (
+    Rect,
+    Rectangle,
+    rectangle_contains,
+    rectangle_intersects,
+)
 from gaphas.item import Item
 from gaphas.matrix import Matrix
 from gaphas.model import Model
-from gaphas.painter import DefaultPainter, ItemPainter
+from gaphas.painter import DefaultPainter, ItemPainter, PainterChain
+from gaphas.painter.itempainter import PROXY_COLOR
 from gaphas.painter.painter import ItemPainterType, Painter
 from gaphas.quadtree import Quadtree, QuadtreeBucket
+from gaphas.render import BOUNDING_BOX_TOLERANCE  # noqa: F401 (re-export)
+from gaphas.render import calculate_bounding_box
 from gaphas.selection import Selection
+from gaphas.spatialindex import SpatialIndex
+from gaphas.types import Pos
+from gaphas.view.profiling import (
+    PAINT,
+    UPDATE,
+    FrameRecord,
+    Profiler,
+    profile,
+    profiled_paint,
+    stage,
+)
 from gaphas.view.scrolling import Scrolling
 
 
@@ -27,7 +49,34 @@ DEBUG_DRAW_QUADTREE = False
 # The tolerance for Cairo. Bigger values increase speed and reduce accuracy
 # (default: 0.1)
 PAINT_TOLERANCE = 0.8
-BOUNDING_BOX_TOLERANCE = 1.0
+
+# Paint items progressively, over multiple frames, if more than this number
+# of items is visible. Set to 0 to disable progressive painting.
+PROGRESSIVE_THRESHOLD = 5000
+# Time (in seconds) spent painting items per frame, in progressive mode.
+PROGRESSIVE_BUDGET = 0.008
+PROGRESSIVE_CHUNK_SIZE = 100
+# Keep showing the last complete frame, as long as the progressive paint
+# has not been restarted more often than this.
+PROGRESSIVE_MAX_RESTARTS = 3
+
+
+@dataclass
+class _VisibleItems:
+    key: tuple
+    rect: Rect  # in model coordinates
+    contain: bool
+    items: tuple[Item, ...]
+    parents: dict[Item, Item | None]
+
+
+@dataclass
+class _ProgressivePaint:
+    key: tuple
+    surface: cairo.ImageSurface
+    cr: cairo.Context
+    items: list[Item]
+    index: int = 0
 
 
 class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
@@ -39,6 +88,13 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
 
     This view registers itself on the model, so it will receive
     update events.
+
+    If more than `progressive_threshold` items are visible, items are
+    painted progressively: no more than `progressive_budget` seconds are
+    spent per frame. Items that are not painted yet are shown as boxes.
+
+    Set `profiler` to a :class:`~gaphas.view.profiling.Profiler` to record
+    timings of updates and paints.
     """
 
     # Just defined a name to make GTK register this class.
@@ -74,22 +130,40 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
         ),
     }
 
-    def __init__(self, model: Model | None = None, selection: Selection | None = None):
+    def __init__(
+        self,
+        model: Model | None = None,
+        selection: Selection | None = None,
+        spatial_index: SpatialIndex[Item] | None = None,
+    ):
         """Create a new view.
 
         Args:
             model (Model): optional model to be set on construction time.
             selection (Selection): optional selection object, in case the default
                 selection object (hover/select/focus) is not enough.
+            spatial_index (SpatialIndex): optional index for item bounding boxes.
+                Defaults to a :class:`~gaphas.quadtree.Quadtree`.
         """
         super().__init__()
 
         self._dirty_items: set[Item] = set()
 
         self._back_buffer: cairo.Surface | None = None
-        self._back_buffer_needs_resizing = True
+        self._back_buffer_key: tuple | None = None
+        self._back_buffer_valid = False
+        self._progressive: _ProgressivePaint | None = None
+        self._progressive_restarts = 0
+        self._progressive_tick_id = 0
+
+        self.progressive_threshold = PROGRESSIVE_THRESHOLD
+        self.progressive_budget = PROGRESSIVE_BUDGET
+
+        self.profiler: Profiler | None = None
 
-        self._update_task: asyncio.Task | None = None
+        self._update_task: asyncio.Future | None = None
+        self._update_tick_id = 0
+        self._update_handle: asyncio.Handle | None = None
 
         self._controllers: set[Gtk.EventController] = set()
 
@@ -112,8 +186,14 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
         self._painter: Painter = DefaultPainter(self)
         self._bounding_box_painter: ItemPainterType = ItemPainter(self._selection)
 
-        # quadtree bounds are in canvas coordinates (not view!)
-        self._qtree: Quadtree[Item, None] = Quadtree()
+        # spatial index bounds are in canvas coordinates (not view!)
+        self._qtree: SpatialIndex[Item] = (
+            Quadtree() if spatial_index is None else spatial_index
+        )
+        # Items in the view port, as painted
+        self._visible_items: _VisibleItems | None = None
+        # Result of the last get_items_in_rectangle() call
+        self._queried_items: _VisibleItems | None = None
 
         self._model: Model | None = None
         if model:
@@ -155,8 +235,10 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
             self._selection.clear()
             self._dirty_items.clear()
             self._qtree.clear()
-            if self._update_task:
-                self._update_task.cancel()
+            self._visible_items = None
+            self._queried_items = None
+            self._cancel_update()
+            self.update_back_buffer()
 
         self._model = model
 
@@ -242,19 +324,117 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
 
     def get_items_in_rectangle(
         self, rect: Rect, contain: bool = False
-    ) -> Iterable[Item]:
+    ) -> Sequence[Item]:
         """Return the items in the rectangle 'rect' (in view coordinates).
 
         Items are automatically sorted in model's processing order.
+
+        The result of the last query is cached. When item bounding boxes
+        change, the cached items are updated, as long as the order of the
+        items is not affected. The items in the view port are cached
+        separately, so queries do not affect painting.
         """
-        assert self._model
+        queried = self._queried_items = self._find_items(
+            self._queried_items, rect, contain
+        )
+        return queried.items
+
+    def _get_visible_items(self, width: int, height: int) -> Sequence[Item]:
+        """Return the items in the view port, sorted."""
+        visible = self._visible_items = self._find_items(
+            self._visible_items, (0, 0, width, height), False
+        )
+        return visible.items
+
+    def _find_items(
+        self, cached: _VisibleItems | None, rect: Rect, contain: bool
+    ) -> _VisibleItems:
+        model = self._model
+        assert model
+        key = (self._matrix.tuple(), tuple(rect), contain)
+        if cached and cached.key == key:
+            return cached
+
         crect = transform_rectangle(self._matrix.inverse(), rect)
-        items = (
-            self._qtree.find_inside(crect)
-            if contain
-            else self._qtree.find_intersect(crect)
+        items = tuple(
+            model.sort(
+                self._qtree.find_inside(crect)
+                if contain
+                else self._qtree.find_intersect(crect)
+            )
         )
-        return self._model.sort(items)
+        return _VisibleItems(
+            key, crect, contain, items, {item: model.get_parent(item) for item in items}
+        )
+
+    def get_items_nearest(
+        self,
+        pos: Pos,
+        distance: float,
+        distance_fn: Callable[[Item], float] | None = None,
+    ) -> Iterator[tuple[float, Item]]:
+        """Iterate ``(distance, item)`` tuples for items near ``pos`` (in view
+        coordinates), nearest first.
+
+        Only items within ``distance`` (in view coordinates) of their
+        bounding box are considered. A ``distance_fn(item)`` can provide
+        the exact distance from ``pos`` to an item. It should not be smaller
+        than the distance to the item's bounding box, unless ``pos`` lies
+        within the bounding box.
+        """
+        v2m = self._matrix.inverse()
+        point = v2m.transform_point(*pos)
+        dx, dy = v2m.transform_distance(distance, distance)
+        return self._qtree.iter_nearest(
+            point,
+            max(abs(dx), abs(dy)),
+            distance_fn and (lambda item, _point: distance_fn(item)),
+        )
+
+    def _update_visible_items(
+        self, updated_items: Collection[Item], removed_items: Iterable[Item] = ()
+    ) -> None:
+        """Update the cached visible and queried items, or drop them if items
+        have to be (re)sorted."""
+        removed = set(removed_items)
+        if self._visible_items and not self._update_cached_items(
+            self._visible_items, updated_items, removed
+        ):
+            self._visible_items = None
+        if self._queried_items and not self._update_cached_items(
+            self._queried_items, updated_items, removed
+        ):
+            self._queried_items = None
+
+    def _update_cached_items(
+        self,
+        visible: _VisibleItems,
+        updated_items: Collection[Item],
+        removed_items: set[Item],
+    ) -> bool:
+        """Update cached items.
+
+        Returns ``False`` if the items have to be (re)sorted.
+        """
+        model = self._model
+        assert model
+        get_bounds = self._qtree.get_bounds
+        test = rectangle_contains if visible.contain else rectangle_intersects
+        parents = visible.parents
+        hidden = removed_items.intersection(parents)
+        for item in updated_items:
+            if test(get_bounds(item), visible.rect):
+                if item not in parents or parents[item] is not model.get_parent(item):
+                    # Newly visible, or reparented: order is unknown
+                    return False
+            elif item in parents:
+                hidden.add(item)
+
+        if hidden:
+            visible.items = tuple(i for i in visible.items if i not in hidden)
+            for item in hidden:
+                del parents[item]
+        return True
 
     def get_item_bounding_box(self, item: Item) -> Rectangle:
         """Get the bounding box for the item, in view coordinates."""
@@ -279,54 +459,103 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
                 self._qtree.remove(item)
                 selection.unselect_item(item)
 
+            self._update_visible_items((), removed_items)
+
         if items or removed_items:
             self.update()
 
-    def update(self) -> asyncio.Task:
-        """Update view status according to the items updated in the model."""
+    def update(self) -> asyncio.Future:
+        """Update view status according to the items updated in the model.
 
-        async def _update():
-            model = self._model
-            if not model:
-                return
+        Updates are coalesced. If the view is mapped, the update is
+        performed on the next frame clock tick, so the view is updated at
+        most once per frame. Otherwise, for instance if the view is on a
+        hidden notebook page, the frame clock does not tick and the update
+        is performed from the asyncio event loop.
+        """
+        if self._update_task:
+            return self._update_task
+
+        self._update_task = asyncio.get_running_loop().create_future()
+        self._schedule_update()
+        return self._update_task
 
-            dirty_items = self.all_dirty_items()
-            model.update_now(dirty_items)
-            dirty_items |= self.all_dirty_items()
+    def _schedule_update(self) -> None:
+        if self.get_mapped() and self.get_frame_clock():
+            self._update_tick_id = self.add_tick_callback(self._on_update_tick)
+        else:
+            self._update_handle = asyncio.get_running_loop().call_soon(self._run_update)
+
+    def _on_update_tick(self, _widget: Gtk.Widget, _frame_clock: object) -> bool:
+        self._update_tick_id = 0
+        self._run_update()
+        return GLib.SOURCE_REMOVE  # type: ignore[no-any-return]
+
+    def _run_update(self) -> None:
+        future = self._update_task
+        assert future
+        self._update_task = None
+        self._update_handle = None
+        if future.cancelled():
+            # The caller stopped waiting, but items still need an update
+            self._do_update()
+            return
+        try:
+            self._do_update()
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+    def _do_update(self) -> None:
+        model = self._model
+        if not model:
+            return
+
+        with profile(self.profiler, UPDATE) as record:
+            with stage(record, "all_dirty_items"):
+                dirty_items = self.all_dirty_items()
+            with stage(record, "update_now"):
+                model.update_now(dirty_items)
+            with stage(record, "all_dirty_items"):
+                dirty_items |= self.all_dirty_items()
 
             old_bb = self._qtree.soft_bounds
-            self.update_bounding_box(dirty_items)
+            with stage(record, "update_bounding_box"):
+                self.update_bounding_box(dirty_items)
             if self._qtree.soft_bounds != old_bb:
-                self.update_scrolling()
+                with stage(record, "update_scrolling"):
+                    self.update_scrolling()
             self.update_back_buffer()
 
-        def clear_task(task):
-            self._update_task = None
+            if record:
+                record.counts["dirty_items"] = len(dirty_items)
 
-        if not self._update_task:
-            self._update_task = asyncio.create_task(_update())
-            self._update_task.add_done_callback(clear_task)
-        return self._update_task
+        if self._dirty_items:
+            # Items requested an update while updating
+            self.update()
+
+    def _cancel_update(self) -> None:
+        if self._update_tick_id:
+            self.remove_tick_callback(self._update_tick_id)
+            self._update_tick_id = 0
+        if self._update_handle:
+            self._update_handle.cancel()
+            self._update_handle = None
+        if self._update_task:
+            self._update_task.cancel()
+            self._update_task = None
 
     def all_dirty_items(self) -> set[Item]:
-        """Return all dirty items, clearing the marked items."""
+        """Return all dirty items, clearing the marked items.
+
+        Children of dirty items are dirty as well.
+        """
         model = self._model
         if not model:
             return set()
 
-        def iterate_items(items: Iterable[Item]) -> Iterable[Item]:
-            assert model
-            for item in items:
-                parent = model.get_parent(item)
-                if parent is not None and parent in items:
-                    # item's matrix will be updated thanks to parent's matrix update
-                    continue
-
-                yield item
-
-                yield from iterate_items(set(model.get_children(item)))
-
-        dirty_items = set(iterate_items(self._dirty_items))
+        dirty_items = with_descendants(model, self._dirty_items)
         self._dirty_items.clear()
         return dirty_items
 
@@ -335,15 +564,13 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
         coordinates."""
         painter = self._bounding_box_painter
         qtree = self._qtree
-        for item in items:
-            surface = cairo.RecordingSurface(cairo.Content.COLOR_ALPHA, None)
-            cr = cairo.Context(surface)
-            cr.set_tolerance(BOUNDING_BOX_TOLERANCE)
-
-            painter.paint_item(item, cr)
-            x, y, w, h = surface.ink_extents()
-
-            qtree.add(item=item, bounds=(x, y, w, h))
+        if not qtree:
+            # Initial population: build a balanced tree in one pass
+            qtree.load((item, calculate_bounding_box(painter, item)) for item in items)
+        else:
+            for item in items:
+                qtree.add(item=item, bounds=calculate_bounding_box(painter, item))
+        self._update_visible_items(items)
 
     def update_scrolling(self) -> None:
         matrix = Matrix(*self._matrix)  # type: ignore[misc]
@@ -354,7 +581,7 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
         self._scrolling.update_adjustments(self.get_width(), self.get_height(), bounds)
 
     def _debug_draw_bounding_box(self, cr, width, height):
-        for item in self.get_items_in_rectangle((0, 0, width, height)):
+        for item in self._get_visible_items(width, height):
             try:
                 b = self.get_item_bounding_box(item)
             except KeyError:
@@ -369,6 +596,9 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
                 cr.restore()
 
     def _debug_draw_quadtree(self, cr):
+        if not isinstance(self._qtree, Quadtree):
+            return
+
         def draw_qtree_bucket(bucket: QuadtreeBucket) -> None:
             cr.rectangle(*bucket.bounds)
             cr.stroke()
@@ -387,10 +617,26 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
             self._model.register_view(self)
             self.request_update(self._model.get_all_items())
 
+    def do_unmap(self) -> None:
+        Gtk.DrawingArea.do_unmap(self)
+
+        # Tick callbacks are not called while the view is not mapped
+        if self._update_tick_id:
+            self.remove_tick_callback(self._update_tick_id)
+            self._update_tick_id = 0
+            self._schedule_update()
+        if self._progressive_tick_id:
+            self.remove_tick_callback(self._progressive_tick_id)
+            self._progressive_tick_id = 0
+
     def do_unrealize(self) -> None:
         if self._model:
             self._model.unregister_view(self)
 
+        self._progressive = None
+        self._back_buffer = None
+        self._back_buffer_valid = False
+
         Gtk.DrawingArea.do_unrealize(self)
 
     def on_selection_update(self, item: Item | None) -> None:
@@ -410,12 +656,15 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
     def on_resize(self, _width: int, _height: int) -> None:
         self.update_scrolling()
         if self.get_realized():
-            self._back_buffer_needs_resizing = True
             self.update_back_buffer()
         else:
             self._back_buffer = None
 
     def update_back_buffer(self) -> None:
+        if self._progressive:
+            self._progressive_restarts += 1
+        self._progressive = None
+        self._back_buffer_valid = False
         self.queue_draw()
 
     def do_snapshot(self, snapshot):
@@ -426,11 +675,8 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
             r.init(0, 0, width, height)
             cr = snapshot.append_cairo(r)
             cr.set_matrix(self.matrix.to_cairo())
-            cr.save()
-            cr.set_tolerance(PAINT_TOLERANCE)
-            items = self.get_items_in_rectangle((0, 0, width, height))
-            self.painter.paint(list(items), cr)
-            cr.restore()
+            with profile(self.profiler, PAINT) as record:
+                self._paint(cr, width, height, record)
 
             if DEBUG_DRAW_BOUNDING_BOX:
                 self._debug_draw_bounding_box(cr, width, height)
@@ -438,6 +684,153 @@ class GtkView(Gtk.DrawingArea, Gtk.Scrollable):
             if DEBUG_DRAW_QUADTREE:
                 self._debug_draw_quadtree(cr)
 
+    def _paint(
+        self,
+        cr: cairo.Context,
+        width: int,
+        height: int,
+        record: FrameRecord | None = None,
+    ) -> None:
+        """Paint the view port.
+
+        If more than ``progressive_threshold`` items are visible, items
+        are painted progressively: every frame, items are painted for at
+        most ``progressive_budget`` seconds onto a back buffer. Items not
+        painted yet are shown as a (coarse) bounding box. Once all items
+        are painted, the back buffer is reused until the view changes.
+
+        In progressive mode items are painted in chunks by the item painters
+        of ``painter``, the painters with a ``paint_item()`` method. The
+        ``painter`` is called without items, to draw handles, guides, etc.
+        on top.
+        """
+        key = (self._matrix.tuple(), width, height, self.get_scale_factor())
+        progress = self._progressive
+        if progress and progress.key != key:
+            progress = self._progressive = None
+
+        if not progress and not (
+            self._back_buffer_valid and self._back_buffer_key == key
+        ):
+            with stage(record, "visible_items"):
+                items = list(self._get_visible_items(width, height))
+            if not 0 < self.progressive_threshold < len(items):
+                # The back buffer of a progressive paint is outdated now
+                self._back_buffer = None
+                self._back_buffer_key = None
+                self._progressive_restarts = 0
+                if record:
+                    record.counts["visible_items"] = len(items)
+                cr.save()
+                cr.set_tolerance(PAINT_TOLERANCE)
+                profiled_paint(self.painter, items, cr, record)
+                cr.restore()
+                return
+
+            progress = self._progressive = self._start_progressive_paint(
+                items, key, width, height
+            )
+
+        if progress:
+            painted = progress.index
+            with stage(record, "progressive"):
+                self._paint_progressive(progress)
+            if record:
+                record.counts["visible_items"] = len(progress.items)
+                record.counts["painted_items"] = progress.index - painted
+
+        cr.save()
+        cr.identity_matrix()
+        if not self._progressive:
+            cr.set_source_surface(self._back_buffer)
+            cr.paint()
+        elif (
+            self._back_buffer
+            and self._back_buffer_key == key
+            and self._progressive_restarts < PROGRESSIVE_MAX_RESTARTS
+        ):
+            # Show the last complete frame while the new one is painted
+            cr.set_source_surface(self._back_buffer)
+            cr.paint()
+        else:
+            assert progress
+            cr.set_source_surface(progress.surface)
+            cr.paint()
+            self._paint_pending_items(cr, progress)
+        cr.restore()
+
+        cr.save()
+        cr.set_tolerance(PAINT_TOLERANCE)
+        profiled_paint(self.painter, (), cr, record)
+        cr.restore()
+
+    def _start_progressive_paint(
+        self, items: list[Item], key: tuple, width: int, height: int
+    ) -> _ProgressivePaint:
+        scale = self.get_scale_factor()
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width * scale, height * scale)
+        surface.set_device_scale(scale, scale)
+        cr = cairo.Context(surface)
+        cr.set_matrix(self._matrix.to_cairo())
+        cr.set_tolerance(PAINT_TOLERANCE)
+        return _ProgressivePaint(key, surface, cr, items)
+
+    def _paint_progressive(self, progress: _ProgressivePaint) -> None:
+        painters = _item_painters(self.painter)
+        items = progress.items
+        deadline = time.perf_counter() + self.progressive_budget
+        while progress.index < len(items):
+            chunk = items[progress.index : progress.index + PROGRESSIVE_CHUNK_SIZE]
+            for painter in painters:
+                painter.paint(chunk, progress.cr)
+            progress.index += len(chunk)
+            if time.perf_counter() >= deadline:
+                break
+
+        if progress.index < len(items):
+            if not self._progressive_tick_id:
+                self._progressive_tick_id = self.add_tick_callback(
+                    self._on_progressive_tick
+                )
+        else:
+            self._progressive = None
+            self._progressive_restarts = 0
+            self._back_buffer = progress.surface
+            self._back_buffer_key = progress.key
+            self._back_buffer_valid = True
+
+    def _paint_pending_items(
+        self, cr: cairo.Context, progress: _ProgressivePaint
+    ) -> None:
+        for item in progress.items[progress.index :]:
+            try:
+                cr.rectangle(*self.get_item_bounding_box(item))
+            except KeyError:
+                pass  # Item has been removed
+        cr.set_source_rgba(*PROXY_COLOR)
+        cr.fill()
+
+    def _on_progressive_tick(self, _widget: Gtk.Widget, _frame_clock: object) -> bool:
+        self._progressive_tick_id = 0
+        self.queue_draw()
+        return GLib.SOURCE_REMOVE  # type: ignore[no-any-return]
+
+
+def _item_painters(painter: Painter) -> Sequence[Painter]:
+    """The painters that draw items, as opposed to handles, guides, etc.
+
+    If no item painters can be found, the painter itself is returned.
+    """
+
+    def item_painters(painter: Painter) -> Iterator[Painter]:
+        if isinstance(painter, PainterChain):
+            for p in painter.painters:
+                yield from item_painters(p)
+        elif hasattr(painter, "paint_item"):
+            yield painter
+
+    return list(item_painters(painter)) or [painter]
+
 
 def transform_rectangle(matrix: Matrix, rect: Rect) -> Rect:
     x, y, w, h = rect
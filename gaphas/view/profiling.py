@@ -0,0 +1,116 @@
+"""Timings of the view update and paint pipeline.
+
+Assign a :class:`Profiler` to ``GtkView.profiler`` to record a
+:class:`FrameRecord` for every update and every paint of the view:
+
+    >>> profiler = Profiler(size=100)
+    >>> with profile(profiler, UPDATE) as record:
+    ...     with stage(record, "update_now"):
+    ...         pass
+    >>> [r.kind for r in profiler.records]
+    ['update']
+    >>> list(profiler.records[0].timings)
+    ['update_now']
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable
+
+from cairo import Context as CairoContext
+
+from gaphas.item import Item
+from gaphas.painter.chain import PainterChain
+from gaphas.painter.painter import Painter
+
+UPDATE = "update"
+PAINT = "paint"
+
+
+@dataclass
+class FrameRecord:
+    """Timings and counts of one update or paint of the view.
+
+    Timings are in seconds.
+    """
+
+    kind: str
+    start: float
+    duration: float = 0.0
+    timings: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+
+class Profiler:
+    """Keep the most recent frame records.
+
+    Older records are dropped once ``size`` records are kept. If a
+    ``callback`` is provided, it's called with every new record.
+    """
+
+    def __init__(
+        self, size: int = 300, callback: Callable[[FrameRecord], None] | None = None
+    ) -> None:
+        self.records: deque[FrameRecord] = deque(maxlen=size)
+        self.callback = callback
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    @contextmanager
+    def record(self, kind: str) -> Iterator[FrameRecord]:
+        record = FrameRecord(kind, perf_counter())
+        try:
+            yield record
+        finally:
+            record.duration = perf_counter() - record.start
+            self.records.append(record)
+            if self.callback:
+                self.callback(record)
+
+
+@contextmanager
+def profile(profiler: Profiler | None, kind: str) -> Iterator[FrameRecord | None]:
+    """Record a frame, if a profiler is provided."""
+    if profiler is None:
+        yield None
+    else:
+        with profiler.record(kind) as record:
+            yield record
+
+
+@contextmanager
+def stage(record: FrameRecord | None, name: str) -> Iterator[None]:
+    """Add the time spent in a stage to a frame record."""
+    if record is None:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record.timings[name] = record.timings.get(name, 0.0) + perf_counter() - start
+
+
+def profiled_paint(
+    painter: Painter,
+    items: Collection[Item],
+    cairo: CairoContext,
+    record: FrameRecord | None,
+) -> None:
+    """Paint, and record the time spent per painter of a painter chain."""
+    if record is None:
+        painter.paint(items, cairo)
+    elif isinstance(painter, PainterChain):
+        for p in painter.painters:
+            with stage(record, type(p).__name__):
+                p.paint(items, cairo)
+    else:
+        with stage(record, type(painter).__name__):
+            painter.paint(items, cairo)
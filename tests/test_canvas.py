@@ -1,6 +1,6 @@
 import pytest
 
-from gaphas.canvas import Canvas
+from gaphas.canvas import Canvas, all_children, with_descendants
 from gaphas.connections import ConnectionError
 from gaphas.connector import ConnectionSink, Connector
 from gaphas.item import Element as Box
@@ -99,12 +99,12 @@ def test_disconnect_item_with_constraint():
     )
     assert count(c.connections.get_connections(handle=line.handles()[0])) == 1
 
-    assert len(c.solver.constraints) == 13
+    assert len(c.solver.constraints) == 3
 
     c.connections.disconnect_item(line, line.handles()[0])
     assert count(c.connections.get_connections(handle=line.handles()[0])) == 0
 
-    assert len(c.solver.constraints) == 12
+    assert len(c.solver.constraints) == 2
 
 
 def test_disconnect_item_by_deleting_element():
@@ -149,13 +149,13 @@ def test_disconnect_item_with_constraint_by_deleting_element():
     assert count(c.connections.get_connections(handle=line.handles()[0])) == 1
 
     ncons = len(c.solver.constraints)
-    assert ncons == 13
+    assert ncons == 3
 
     c.remove(b1)
 
     assert count(c.connections.get_connections(handle=line.handles()[0])) == 0
 
-    assert 6 == len(c.solver.constraints)
+    assert 1 == len(c.solver.constraints)
 
 
 def test_remove_connected_item():
@@ -195,3 +195,47 @@ def test_remove_connected_item():
 
     # Expecting a class + line connected at one end only
     assert number_cons1 + 1 == len(canvas.solver.constraints)
+
+
+def test_all_children_in_depth_first_order(canvas):
+    b1, b2, b3, b4 = (Box(canvas.connections) for _ in range(4))
+    canvas.add(b1)
+    canvas.add(b2, parent=b1)
+    canvas.add(b3, parent=b2)
+    canvas.add(b4, parent=b1)
+
+    assert list(all_children(canvas, b1)) == [b2, b3, b4]
+    assert list(all_children(canvas, None)) == [b1, b2, b3, b4]
+
+
+def test_with_descendants(canvas):
+    b1, b2, b3, b4 = (Box(canvas.connections) for _ in range(4))
+    canvas.add(b1)
+    canvas.add(b2, parent=b1)
+    canvas.add(b3, parent=b2)
+    canvas.add(b4)
+
+    assert with_descendants(canvas, [b2, b1]) == {b1, b2, b3}
+    assert with_descendants(canvas, [b4]) == {b4}
+    assert with_descendants(canvas, []) == set()
+
+
+class RecordingView:
+    def __init__(self):
+        self.updated = set()
+
+    def request_update(self, items=(), removed_items=()):
+        self.updated.update(items)
+
+
+def test_solved_constraints_update_views():
+    c = Canvas()
+    b1 = Box(c.connections)
+    Box(c.connections)  # not on the canvas
+    c.add(b1)
+    view = RecordingView()
+    c.register_view(view)
+
+    c.update_now((b1,))
+
+    assert view.updated == {b1}
@@ -1,7 +1,7 @@
 import pytest
 
 from gaphas import item
-from gaphas.connections import Connections
+from gaphas.connections import Connection, ConnectionError, Connections
 from gaphas.constraint import EqualsConstraint
 from gaphas.solver import Solver
 
@@ -85,6 +85,22 @@ def test_notify_on_constraint_solved(connections):
     assert events[0].constraint is c
 
 
+def test_notify_on_constraint_solved_after_reconnect(connections):
+    events = []
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    cons1 = EqualsConstraint(i.handles()[0].pos.x, i.handles()[0].pos.x)
+    cons2 = EqualsConstraint(i.handles()[0].pos.y, i.handles()[0].pos.y)
+    connections.connect_item(i, i.handles()[0], ii, ii.ports()[0], cons1)
+    connections.reconnect_item(i, i.handles()[0], constraint=cons2)
+    connections.solver.add_constraint(cons1)
+
+    connections.add_handler(events.append)
+    connections.solve()
+
+    assert [cinfo.constraint for cinfo in events] == [cons2]
+
+
 def test_connection_remove_handler(connections):
     events = []
 
@@ -101,3 +117,187 @@ def test_connection_remove_handler(connections):
     connections.solve()
 
     assert not events
+
+
+def test_get_connection(connections):
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    connections.connect_item(i, i.handles()[0], ii, ii.ports()[0])
+
+    assert connections.get_connection(i.handles()[0]).connected is ii
+    assert connections.get_connection(i.handles()[1]) is None
+
+    connections.disconnect_item(i, i.handles()[0])
+
+    assert connections.get_connection(i.handles()[0]) is None
+
+
+def test_handle_can_be_connected_once(connections):
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    connections.connect_item(i, i.handles()[0], ii, ii.ports()[0])
+
+    with pytest.raises(ConnectionError):
+        connections.connect_item(i, i.handles()[0], ii, ii.ports()[0])
+
+
+def test_disconnect_one_of_two_similar_connections(connections):
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    head, tail = i.handles()
+    connections.connect_item(i, head, ii, ii.ports()[0])
+    connections.connect_item(i, tail, ii, ii.ports()[0])
+
+    connections.disconnect_item(i, head)
+
+    assert connections.get_connection(head) is None
+    assert connections.get_connection(tail)
+
+
+def test_notify_batch_on_solve(connections):
+    batches = []
+
+    def on_notify(cinfos):
+        batches.append(list(cinfos))
+
+    i = item.Line(connections)
+    c1 = EqualsConstraint(i.handles()[0].pos.x, i.handles()[0].pos.x)
+    c2 = EqualsConstraint(i.handles()[0].pos.y, i.handles()[0].pos.y)
+    connections.add_constraint(i, c1)
+    connections.add_constraint(i, c2)
+
+    connections.add_batch_handler(on_notify)
+    connections.solve()
+    connections.solve()
+
+    assert len(batches) == 1
+    assert {cinfo.constraint for cinfo in batches[0]} == {c1, c2}
+
+
+def test_add_constraint_twice(connections):
+    i = item.Line(connections)
+    c = EqualsConstraint(i.handles()[0].pos.x, i.handles()[0].pos.x)
+    connections.add_constraint(i, c)
+    connections.add_constraint(i, c)
+
+    assert [cinfo.constraint for cinfo in connections.get_connections(item=i)] == [c]
+
+    connections.remove_constraint(i, c)
+
+    assert list(connections.get_connections(item=i)) == []
+
+
+def test_connect_many(connections):
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    head, tail = i.handles()
+    cons = EqualsConstraint(head.pos.x, ii.handles()[0].pos.x)
+
+    connections.connect_many(
+        [
+            Connection(i, head, ii, ii.ports()[0], cons, None),
+            Connection(i, tail, ii, ii.ports()[0], None, None),
+        ]
+    )
+
+    assert connections.get_connection(head).constraint is cons
+    assert connections.get_connection(tail).connected is ii
+    assert cons in connections.solver.constraints
+    assert not connections.solver.needs_solving
+
+
+def test_connect_many_connects_all_or_nothing(connections):
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    head, tail = i.handles()
+    connections.connect_item(i, tail, ii, ii.ports()[0])
+    cons = EqualsConstraint(head.pos.x, ii.handles()[0].pos.x)
+
+    with pytest.raises(ConnectionError):
+        connections.connect_many(
+            [
+                Connection(i, head, ii, ii.ports()[0], cons, None),
+                Connection(i, tail, ii, ii.ports()[0], None, None),
+            ]
+        )
+
+    assert connections.get_connection(head) is None
+    assert cons not in connections.solver.constraints
+
+
+def test_connect_many_with_duplicate_handle(connections):
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    head = i.handles()[0]
+
+    with pytest.raises(ConnectionError):
+        connections.connect_many(
+            [
+                Connection(i, head, ii, ii.ports()[0], None, None),
+                Connection(i, head, ii, ii.ports()[0], None, None),
+            ]
+        )
+
+    assert connections.get_connection(head) is None
+
+
+def test_disconnect_many(connections):
+    disconnected = []
+
+    def callback(*args):
+        disconnected.append(args)
+
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    head, tail = i.handles()
+    cons = EqualsConstraint(head.pos.x, ii.handles()[0].pos.x)
+    connections.connect_item(i, head, ii, ii.ports()[0], cons, callback)
+    connections.connect_item(i, tail, ii, ii.ports()[0])
+
+    connections.disconnect_many(connections.get_connections(item=i))
+
+    assert not list(connections.get_connections(item=i))
+    assert cons not in connections.solver.constraints
+    assert disconnected == [(i, head, ii, ii.ports()[0])]
+
+
+def test_neighbours_and_degree(connections):
+    i = item.Line(connections)
+    ii = item.Line(connections)
+    head, tail = i.handles()
+    connections.connect_item(i, head, ii, ii.ports()[0])
+    connections.connect_item(i, tail, ii, ii.ports()[0])
+
+    assert set(connections.neighbours(i)) == {ii}
+    assert set(connections.neighbours(ii)) == {i}
+    assert connections.degree(i) == 2
+
+    connections.disconnect_item(i, head)
+
+    assert connections.degree(ii) == 1
+
+    connections.disconnect_item(i, tail)
+
+    assert not connections.neighbours(i)
+    assert connections.degree(ii) == 0
+
+
+def test_connected_components(connections):
+    a, b, c, d, e = (item.Line(connections) for _ in range(5))
+    connections.connect_item(a, a.handles()[0], b, b.ports()[0])
+    connections.connect_item(c, c.handles()[0], b, b.ports()[0])
+    connections.connect_item(d, d.handles()[0], e, e.ports()[0])
+    connections.connect_item(d, d.handles()[1], d, d.ports()[0])
+
+    assert connections.reachable(a) == {a, b, c}
+    assert connections.reachable(e) == {d, e}
+    assert sorted(map(len, connections.connected_components())) == [2, 3]
+
+    connections.remove_connections_to_item(b)
+
+    assert connections.reachable(a) == {a}
+    assert list(connections.connected_components()) == [{d, e}]
+
+    connections.remove_connections_to_item(d)
+
+    assert not list(connections.connected_components())
@@ -1,7 +1,10 @@
 import pytest
 
+from gaphas import connector
 from gaphas.connector import ConnectionSink
-from gaphas.item import Element
+from gaphas.handle import Handle
+from gaphas.item import Element, Line
+from gaphas.port import LinePort
 
 
 @pytest.fixture
@@ -46,3 +49,34 @@ def test_element_glue_on_border_with_secondary_position(
     glue_pos = sink.glue(pos, secondary_pos=secondary_pos)
 
     assert glue_pos == expected_glue_pos
+
+
+@pytest.mark.parametrize(
+    "pos,expected_glue_pos",
+    [
+        [(50, -5), (50, 0)],
+        [(105, 50), (100, 50)],
+        [(50, 50), None],
+    ],
+)
+def test_element_glue_on_many_ports(monkeypatch, element, pos, expected_glue_pos):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(connector, "BATCH_SIZE", 2)
+    sink = ConnectionSink(element)
+    glue_pos = sink.glue(pos)
+
+    assert glue_pos == expected_glue_pos
+    assert (sink.port is None) == (expected_glue_pos is None)
+
+
+def test_line_glue_with_segment_index(monkeypatch, connections):
+    monkeypatch.setattr(connector, "SEGMENT_INDEX_SIZE", 2)
+    line = Line(connections)
+    line.handles()[1].pos = (100, 0)
+    line.insert_handle(2, Handle((100, 100)))
+    line.insert_port(1, LinePort(line.handles()[1].pos, line.handles()[2].pos))
+    sink = ConnectionSink(line)
+
+    assert sink.glue((95, 50)) == (100, 50)
+    assert sink.port is line.ports()[1]
+    assert sink.glue((50, 50)) is None
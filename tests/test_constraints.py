@@ -1,3 +1,5 @@
+import weakref
+
 import pytest
 
 from gaphas.constraint import (
@@ -6,10 +8,11 @@ from gaphas.constraint import (
     LineAlignConstraint,
     LineConstraint,
     PositionConstraint,
+    RectangleConstraint,
     constraint,
 )
 from gaphas.position import Position
-from gaphas.solver import Variable
+from gaphas.solver import Solver, Variable
 
 
 def test_pos_constraint():
@@ -150,3 +153,32 @@ def test_above_constraint(pos1, pos2):
     assert isinstance(c, LessThanConstraint)
     assert 2 == c.smaller
     assert 4 == c.bigger
+
+
+def test_rectangle_constraint():
+    nw, ne, se, sw = Position(0, 0), Position(10, 0), Position(10, 10), Position(0, 10)
+    c = RectangleConstraint(nw, ne, se, sw, min_width=5, min_height=5)
+    solver = Solver()
+    solver.add_constraint(c)
+
+    nw.pos = (-10, -10)
+    solver.solve()
+
+    assert ne.tuple() == (10, -10)
+    assert sw.tuple() == (-10, 10)
+    assert se.tuple() == (10, 10)
+
+    # Moved past the opposite side: the moved side is pushed back
+    ne.x.value = -20
+    solver.solve()
+
+    assert nw.tuple() == (-10, -10)
+    assert ne.tuple() == (-5, -10)
+    assert se.tuple() == (-5, 10)
+
+
+def test_constraint_can_be_weakly_referenced():
+    c = EqualsConstraint(Variable(), Variable())
+
+    assert weakref.ref(c)() is c
+    assert weakref.ref(c.a)() is c.a
@@ -55,3 +55,20 @@ def test_point_outside_box(box):
     box.handles()[SE].pos = (10, 10)
 
     assert box.point(10, 50) == 40
+
+
+def test_minimal_size(canvas, box):
+    h_nw, h_ne, h_se, h_sw = box.handles()
+
+    h_se.pos = (-100, -100)
+    canvas.update_now((box,))
+
+    assert h_se.pos.tuple() == (10, 10)
+    assert h_sw.pos.tuple() == (0, 10)
+
+    box.min_width = 30
+    canvas.update_now((box,))
+
+    assert box.width == 30
+    assert box.height == 10
+    assert h_ne.pos.x == 30
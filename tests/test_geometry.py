@@ -111,3 +111,55 @@ def test_intersect_line_line():
 def test_intersect_line_line_not_crossing():
     assert intersect_line_line((0, 0), (0, 10), (3, 0), (8, 10)) is None
     assert intersect_line_line((0, 0), (0, 10), (3, 0), (3, 10)) is None
+
+
+def test_distance_line_point_many():
+    numpy = pytest.importorskip("numpy")
+    from gaphas.geometry import distance_line_point_many
+
+    lines = [((0.0, 0.0), (2.0, 4.0)), ((0.0, 0.0), (0.0, 0.0)), ((5.0, 0.0), (9, 0))]
+    points = [(3.0, 4.0), (1.0, 1.0), (10.0, 2.0)]
+
+    distances, nearest = distance_line_point_many(
+        [s for s, _ in lines], [e for _, e in lines], points
+    )
+
+    for (start, end), point, d, p in zip(lines, points, distances, nearest):
+        expected_d, expected_p = distance_line_point(start, end, point)
+        assert d == pytest.approx(expected_d)
+        assert numpy.allclose(p, expected_p)
+
+
+def test_distance_rectangle_point_many():
+    pytest.importorskip("numpy")
+    from gaphas.geometry import distance_rectangle_point_many
+
+    rects = [(2, 2, 2, 2), (0, 0, 10, 10), (1, 1, 10, 10)]
+
+    assert distance_rectangle_point_many(rects, (5, 12)).tolist() == [
+        distance_rectangle_point(rect, (5, 12)) for rect in rects
+    ]
+
+
+def test_point_on_rectangle_many():
+    pytest.importorskip("numpy")
+    from gaphas.geometry import point_on_rectangle_many
+
+    points = [(4, 9), (4, 6), (5, 3), (8, 4), (0, 3), (12, 5)]
+
+    for border in (False, True):
+        result = point_on_rectangle_many((1, 1, 10, 10), points, border=border)
+        assert [tuple(p) for p in result.tolist()] == [
+            point_on_rectangle((1, 1, 10, 10), p, border=border) for p in points
+        ]
+
+
+def test_rectangle_intersects_many():
+    pytest.importorskip("numpy")
+    from gaphas.geometry import rectangle_intersects, rectangle_intersects_many
+
+    rects = [(5, 5, 20, 20), (40, 30, 10, 1), (11, 11, 1, 1)]
+
+    assert rectangle_intersects_many(rects, (10, 10, 1, 1)).tolist() == [
+        rectangle_intersects(rect, (10, 10, 1, 1)) for rect in rects
+    ]
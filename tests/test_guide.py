@@ -2,7 +2,7 @@ import pytest
 
 from gaphas.connections import Connections
 from gaphas.connector import Handle
-from gaphas.guide import Guide, GuidedItemMove, find_closest
+from gaphas.guide import Guide, GuidedItemMove, find_closest, find_closest_many
 from gaphas.item import Element, Line
 from gaphas.solver import WEAK
 
@@ -24,6 +24,15 @@ def test_find_closest(view, connections):
     assert [2.0] == closest
 
 
+def test_find_closest_many():
+    pytest.importorskip("numpy")
+    item_edges = [0, 10, 20]
+    edges = [2, 15, 30, 8, -2, 12]
+
+    assert find_closest_many(item_edges, edges) == find_closest(item_edges, edges)
+    assert find_closest_many(item_edges, [50, 60]) == (0, ())
+
+
 def test_element_guide():
     e1 = Element(Connections())
     assert 10 == e1.width
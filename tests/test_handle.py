@@ -1,3 +1,5 @@
+import weakref
+
 from gaphas.connector import Handle
 
 
@@ -5,3 +7,10 @@ def test_handle_x_y():
     h = Handle()
     assert 0.0 == h.pos.x
     assert 0.0 == h.pos.y
+
+
+def test_handle_can_be_weakly_referenced():
+    h = Handle()
+
+    assert weakref.ref(h)() is h
+    assert weakref.ref(h.pos)() is h.pos
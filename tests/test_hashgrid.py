@@ -0,0 +1,43 @@
+import pytest
+
+from gaphas.hashgrid import HashGrid
+
+
+def test_cell_size_should_be_positive():
+    with pytest.raises(ValueError):
+        HashGrid(cell_size=0)
+
+
+def test_items_are_stored_in_all_overlapping_cells():
+    grid: HashGrid[str] = HashGrid(cell_size=10)
+
+    grid.add("a", (5, 5, 10, 10))
+
+    assert set(grid._cells) == {(0, 0), (0, 1), (1, 0), (1, 1)}
+
+
+def test_empty_cells_are_removed():
+    grid: HashGrid[str] = HashGrid(cell_size=10)
+    grid.add("a", (5, 5, 10, 10))
+
+    grid.add("a", (25, 5, 1, 1))
+
+    assert set(grid._cells) == {(2, 0)}
+
+
+def test_large_items_are_kept_apart():
+    grid: HashGrid[str] = HashGrid(cell_size=10, max_cells=4)
+
+    grid.add("large", (0, 0, 100, 100))
+
+    assert not grid._cells
+    assert grid.find_intersect((50, 50, 1, 1)) == {"large"}
+    assert grid.find_nearest((200, 50)) == [(100.0, "large")]
+
+
+def test_nearest_looks_beyond_neighbouring_cells():
+    grid: HashGrid[str] = HashGrid(cell_size=10)
+    grid.add("near", (31, 0, 1, 1))
+    grid.add("far", (-100, 0, 1, 1))
+
+    assert grid.find_nearest((0, 0), k=2) == [(31.0, "near"), (99.0, "far")]
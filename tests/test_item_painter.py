@@ -0,0 +1,65 @@
+import cairo
+import pytest
+
+from gaphas.painter.itempainter import (
+    LOD_DETAIL,
+    LOD_PROXY,
+    LOD_SKIP,
+    ItemPainter,
+)
+
+
+@pytest.fixture
+def context():
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    return cairo.Context(surface)
+
+
+def test_full_detail_without_view(box):
+    painter = ItemPainter()
+
+    assert painter.level_of_detail(box) == LOD_DETAIL
+
+
+@pytest.mark.asyncio
+async def test_full_detail_when_zoomed_in(view, box):
+    painter = ItemPainter(view.selection, view)
+
+    assert painter.level_of_detail(box) == LOD_DETAIL
+
+
+@pytest.mark.asyncio
+async def test_proxy_when_zoomed_out(view, box):
+    painter = ItemPainter(view.selection, view)
+    view.matrix.scale(0.2, 0.2)
+
+    assert painter.level_of_detail(box) == LOD_PROXY
+
+
+@pytest.mark.asyncio
+async def test_skip_when_zoomed_out_far(view, box):
+    painter = ItemPainter(view.selection, view)
+    view.matrix.scale(0.01, 0.01)
+
+    assert painter.level_of_detail(box) == LOD_SKIP
+
+
+@pytest.mark.asyncio
+async def test_selected_items_are_drawn_in_detail(view, box):
+    painter = ItemPainter(view.selection, view)
+    view.matrix.scale(0.01, 0.01)
+    view.selection.select_items(box)
+
+    assert painter.level_of_detail(box) == LOD_DETAIL
+
+
+@pytest.mark.asyncio
+async def test_draw_lod_is_called_for_proxies(view, box, context):
+    levels = []
+    box.draw_lod = lambda context, level: levels.append(level)
+    painter = ItemPainter(view.selection, view)
+    view.matrix.scale(0.2, 0.2)
+
+    painter.paint([box], context)
+
+    assert levels == [LOD_PROXY]
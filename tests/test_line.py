@@ -1,6 +1,10 @@
 """Basic item tests for lines."""
 
+import pytest
+
+from gaphas import item
 from gaphas.canvas import Canvas
+from gaphas.handle import Handle
 from gaphas.item import Line
 
 
@@ -9,3 +13,37 @@ def test_initial_ports():
     canvas = Canvas()
     line = Line(canvas.connections)
     assert 1 == len(line.ports())
+
+
+def test_point_on_line_with_many_segments(monkeypatch):
+    pytest.importorskip("numpy")
+    canvas = Canvas()
+    line = Line(canvas.connections)
+    line.handles()[1].pos = (100, 0)
+    line.insert_handle(2, Handle((100, 100)))
+    line.insert_handle(3, Handle((0, 100)))
+    expected = [line.point(x, y) for x, y in [(50, 10), (110, 50), (-1, 100)]]
+
+    monkeypatch.setattr(item, "BATCH_SIZE", 2)
+
+    assert [line.point(x, y) for x, y in [(50, 10), (110, 50), (-1, 100)]] == (
+        pytest.approx(expected)
+    )
+
+
+def test_point_with_segment_index(monkeypatch):
+    monkeypatch.setattr(item, "SEGMENT_INDEX_SIZE", 2)
+    canvas = Canvas()
+    line = Line(canvas.connections)
+    line.handles()[1].pos = (100, 0)
+    line.insert_handle(2, Handle((100, 100)))
+
+    assert line.point(75, 0) == 0.0
+
+    line.handles()[1].pos = (50, 0)
+
+    assert line.point(75, 0) == pytest.approx(22.36, abs=0.01)
+
+    line.remove_handle(line.handles()[2])
+
+    assert line.point(100, 50) == pytest.approx(70.71, abs=0.01)
@@ -1,6 +1,9 @@
 import itertools
+import math
 import pytest
 
+from gaphas.geometry import rectangle_contains
+from gaphas import quadtree
 from gaphas.quadtree import Quadtree
 
 
@@ -99,3 +102,243 @@ def test_dump_quadtree(qtree, capsys):
     captured = capsys.readouterr()
 
     assert "gaphas.quadtree.QuadtreeBucket" in captured.out
+
+
+def test_resize_keeps_existing_buckets(qtree: Quadtree):
+    bucket = qtree._bucket
+
+    qtree.add("far", (10_000, -5_000, 10, 10), None)
+
+    assert rectangle_contains((10_000, -5_000, 10, 10), qtree.bounds)
+    assert qtree._bucket is not bucket
+    assert qtree._bucket.find_bucket(bucket.bounds) is bucket
+    assert qtree.find_intersect((1, 1, 1, 1)) == {"0x0"}
+    assert qtree.find_intersect((10_000, -5_000, 1, 1)) == {"far"}
+
+
+def test_load():
+    qtree: Quadtree[str, None] = Quadtree()
+    qtree.load(
+        (f"{i:d}x{j:d}", (i, j, 10, 10))
+        for i, j in itertools.product(range(0, 100, 10), range(0, 100, 10))
+    )
+
+    assert len(qtree) == 100
+    assert qtree.bounds == (0, 0, 100, 100)
+    assert len(qtree._bucket.items) == 0
+    for i, j in itertools.product(range(0, 100, 10), range(0, 100, 10)):
+        bounds = qtree.get_bounds(f"{i:d}x{j:d}")
+        assert qtree.find_intersect((i + 1, j + 1, 1, 1)) == {f"{i:d}x{j:d}"}
+        assert f"{i:d}x{j:d}" in qtree._bucket.find_bucket(bounds).items
+
+
+def test_load_keeps_existing_items(qtree: Quadtree):
+    qtree.load([("new", (150, 150, 10, 10)), ("0x0", (20, 20, 5, 5))])
+
+    assert len(qtree) == 101
+    assert qtree.get_bounds("0x0") == (20, 20, 5, 5)
+    assert qtree.find_inside((0, 0, 10, 10)) == set()
+    assert qtree.find_intersect((151, 151, 1, 1)) == {"new"}
+    assert qtree.find_intersect((91, 91, 1, 1)) == {"90x90"}
+
+
+def test_rebuild(qtree: Quadtree):
+    qtree.rebuild()
+
+    assert len(qtree) == 100
+    assert qtree.find_intersect((51, 51, 1, 1)) == {"50x50"}
+
+
+def test_loose_quadtree_places_straddling_items_in_sub_buckets():
+    qtree: Quadtree[str, None] = Quadtree(capacity=2, looseness=2.0)
+    for i in range(4):
+        qtree.add(f"box{i}", (i * 20 + 5, 5, 10, 10))
+    qtree.add("line", (40, 10, 20, 10))
+
+    assert "line" not in qtree._bucket.items
+    assert qtree.find_intersect((51, 18, 1, 1)) == {"line"}
+
+
+def test_regular_quadtree_keeps_straddling_items_at_root():
+    qtree: Quadtree[str, None] = Quadtree(capacity=2)
+    for i in range(4):
+        qtree.add(f"box{i}", (i * 20 + 5, 5, 10, 10))
+    qtree.add("line", (40, 10, 20, 10))
+
+    assert "line" in qtree._bucket.items
+
+
+@pytest.mark.parametrize("looseness", [1.0, 1.5, 2.0])
+def test_loose_quadtree_finds_moved_items(looseness):
+    qtree: Quadtree[str, None] = Quadtree(capacity=4, looseness=looseness)
+    qtree.load(
+        (f"{i:d}x{j:d}", (i, j, 10, 10))
+        for i, j in itertools.product(range(0, 100, 10), range(0, 100, 10))
+    )
+
+    qtree.add("0x0", (42, 47, 30, 5))
+    qtree.add("90x90", (-50, 10, 200, 5))
+    qtree.remove("50x50")
+
+    assert qtree.find_intersect((43, 48, 1, 1)) == {"0x0", "40x40"}
+    assert qtree.find_intersect((-40, 11, 1, 1)) == {"90x90"}
+    assert qtree.find_inside((0, 0, 10, 10)) == set()
+    assert qtree.find_intersect((55, 55, 1, 1)) == set()
+
+
+def test_looseness_should_be_at_least_one():
+    with pytest.raises(ValueError):
+        Quadtree(looseness=0.5)
+
+
+def test_removing_items_collapses_buckets(qtree: Quadtree):
+    assert qtree.stats().depth == 2
+
+    for i, j in itertools.product(range(0, 100, 10), range(0, 100, 10)):
+        if (i, j) != (0, 0):
+            qtree.remove(f"{i:d}x{j:d}")
+
+    stats = qtree.stats()
+    assert stats.depth == 0
+    assert stats.buckets == 1
+    assert stats.items == 1
+    assert qtree.find_intersect((1, 1, 1, 1)) == {"0x0"}
+
+
+def test_moving_items_collapses_buckets(qtree: Quadtree):
+    for i, j in itertools.product(range(0, 100, 10), range(0, 50, 10)):
+        qtree.add(f"{i:d}x{j:d}", (i + 2, j + 52, 6, 6))
+
+    assert not qtree._bucket._buckets[0]._buckets
+    assert not qtree._bucket._buckets[1]._buckets
+    assert qtree.stats().items == 100
+
+
+def test_stats(qtree: Quadtree):
+    stats = qtree.stats()
+
+    assert stats.depth == 2
+    assert stats.buckets == 21
+    assert stats.items_per_level == [0, 36, 64]
+
+
+def test_soft_bounds_extend_when_items_are_added(qtree: Quadtree):
+    assert qtree.soft_bounds == (0, 0, 100, 100)
+
+    qtree.add("big", (-20, 10, 200, 10))
+
+    assert qtree._extents is not None
+    assert qtree.soft_bounds == (-20, 0, 200, 100)
+
+
+def test_soft_bounds_shrink_when_edge_item_moves_inward(qtree: Quadtree):
+    assert qtree.soft_bounds == (0, 0, 100, 100)
+
+    qtree.add("big", (-20, 10, 200, 10))
+    qtree.add("big", (20, 10, 20, 10))
+
+    assert qtree.soft_bounds == (0, 0, 100, 100)
+
+
+def test_soft_bounds_are_kept_when_inner_item_is_removed(qtree: Quadtree):
+    assert qtree.soft_bounds == (0, 0, 100, 100)
+
+    qtree.remove("50x50")
+
+    assert qtree._extents is not None
+    assert qtree.soft_bounds == (0, 0, 100, 100)
+
+
+def test_soft_bounds_shrink_when_edge_items_are_removed(qtree: Quadtree):
+    assert qtree.soft_bounds == (0, 0, 100, 100)
+
+    for j in range(0, 100, 10):
+        qtree.remove(f"90x{j:d}")
+
+    assert qtree.soft_bounds == (0, 0, 90, 100)
+
+
+def test_soft_bounds_of_empty_tree(qtree: Quadtree):
+    qtree.clear()
+
+    assert qtree.soft_bounds == (0, 0, 0, 0)
+
+
+def test_find_nearest(qtree: Quadtree):
+    assert qtree.find_nearest((55, 55)) == [(0.0, "50x50")]
+    assert qtree.find_nearest((-3, 52), k=2) == [
+        (3.0, "0x50"),
+        (math.hypot(3, 2), "0x40"),
+    ]
+    assert qtree.find_nearest((-4, -3)) == [(5.0, "0x0")]
+
+
+def test_find_nearest_within_max_distance(qtree: Quadtree):
+    assert qtree.find_nearest((150, 50), max_distance=10) == []
+    assert [
+        item for _d, item in qtree.find_nearest((105, 55), k=10, max_distance=5)
+    ] == ["90x50"]
+
+
+def test_find_nearest_with_distance_function(qtree: Quadtree):
+    calls = []
+
+    def distance_to_center(item, point):
+        calls.append(item)
+        x, y, w, h = qtree.get_bounds(item)
+        return math.hypot(x + w / 2 - point[0], y + h / 2 - point[1])
+
+    nearest = qtree.find_nearest((52, 52), distance_fn=distance_to_center)
+
+    assert nearest == [(math.hypot(3, 3), "50x50")]
+    assert len(calls) < 10
+
+
+def test_iter_nearest_allows_negative_distances_inside_bounds():
+    qtree: Quadtree[str, None] = Quadtree()
+    qtree.add("outer", (0, 0, 100, 100))
+    qtree.add("inner", (40, 40, 20, 20))
+    qtree.add("outside", (110, 0, 10, 10))
+
+    def distance_to_border(item, point):
+        x, y, w, h = qtree.get_bounds(item)
+        px, py = point
+        if x <= px <= x + w and y <= py <= y + h:
+            return -min(px - x, x + w - px, py - y, y + h - py)
+        return 1.0 + max(x - px, px - x - w, y - py, py - y - h)
+
+    assert [
+        item
+        for _d, item in qtree.iter_nearest((50, 50), distance_fn=distance_to_border)
+    ] == [
+        "outer",
+        "inner",
+        "outside",
+    ]
+
+
+@pytest.mark.parametrize("contain", [False, True])
+def test_find_items_in_large_buckets(monkeypatch, contain):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(quadtree, "PACKED_BUCKET_SIZE", 4)
+    qtree: Quadtree[str, None] = Quadtree(capacity=50)
+    for i, j in itertools.product(range(0, 100, 10), range(0, 100, 10)):
+        qtree.add(item=f"{i:d}x{j:d}", bounds=(i, j, 10, 10))
+    find = qtree.find_inside if contain else qtree.find_intersect
+    expected = (
+        {"10x10", "10x20", "20x10", "20x20"}
+        if contain
+        else {f"{i:d}x{j:d}" for i, j in itertools.product(range(0, 40, 10), repeat=2)}
+    )
+
+    assert find((10, 10, 20, 20)) == expected
+
+    qtree.remove("20x20")
+    qtree.add("10x10", (70, 70, 5, 5))
+
+    assert find((10, 10, 20, 20)) == expected - {"10x10", "20x20"}
+
+
+def test_find_items_in_buckets_inside_rectangle(qtree: Quadtree):
+    assert len(qtree.find_inside((-10, -10, 120, 120))) == 100
+    assert len(qtree.find_intersect((-10, -10, 120, 120))) == 100
@@ -0,0 +1,188 @@
+import io
+import threading
+
+import cairo
+import pytest
+
+from gaphas.painter import ItemPainter
+from gaphas import render
+from gaphas.render import Renderer
+from gaphas.rtree import RTree
+from tests.conftest import Box
+
+
+@pytest.fixture
+def renderer(canvas):
+    renderer = Renderer(canvas)
+    yield renderer
+    renderer.close()
+
+
+@pytest.fixture
+def box(canvas, connections):
+    box = Box(connections)
+    box.matrix.translate(10, 20)
+    canvas.add(box)
+    return box
+
+
+class CountingPainter(ItemPainter):
+    def __init__(self):
+        super().__init__()
+        self.painted = []
+
+    def paint_item(self, item, cairo):
+        self.painted.append(item)
+        super().paint_item(item, cairo)
+
+
+def test_renderer_registers_on_model(canvas, renderer):
+    assert renderer in canvas._registered_views
+
+    renderer.close()
+
+    assert renderer not in canvas._registered_views
+
+
+def test_bounding_box(renderer, box):
+    bounding_box = renderer.bounding_box
+
+    assert bounding_box.x == pytest.approx(10, abs=1)
+    assert bounding_box.y == pytest.approx(20, abs=1)
+    assert bounding_box.width == pytest.approx(10, abs=2)
+    assert bounding_box.height == pytest.approx(10, abs=2)
+
+
+def test_bounding_boxes_are_reused(canvas, box):
+    painter = CountingPainter()
+    with Renderer(canvas, ItemPainter(), painter) as renderer:
+        renderer.render_png(io.BytesIO())
+        renderer.render_png(io.BytesIO())
+
+        assert painter.painted.count(box) == 1
+
+
+def test_updated_item_bounding_box_is_recalculated(canvas, box):
+    painter = CountingPainter()
+    with Renderer(canvas, ItemPainter(), painter) as renderer:
+        renderer.update()
+        box.width = 100
+        canvas.request_update(box)
+
+        assert renderer.bounding_box.width == pytest.approx(100, abs=3)
+        assert painter.painted.count(box) == 2
+
+
+def test_removed_item_is_not_rendered(canvas, renderer, box):
+    renderer.update()
+    canvas.remove(box)
+
+    assert not list(renderer.get_items_in_rectangle((0, 0, 100, 100)))
+
+
+def test_render_png(renderer, box):
+    stream = io.BytesIO()
+
+    renderer.render_png(stream, region=(0, 0, 40, 30), scale=2.0)
+
+    stream.seek(0)
+    surface = cairo.ImageSurface.create_from_png(stream)
+    assert surface.get_width() == 80
+    assert surface.get_height() == 60
+
+
+def test_render_svg(renderer, box):
+    stream = io.BytesIO()
+
+    renderer.render_svg(stream)
+
+    assert b"<svg" in stream.getvalue()
+
+
+def test_render_pdf(renderer, box):
+    stream = io.BytesIO()
+
+    renderer.render_pdf(stream)
+
+    assert stream.getvalue().startswith(b"%PDF")
+
+
+def test_render_empty_model(renderer):
+    stream = io.BytesIO()
+
+    renderer.render_png(stream)
+
+    assert stream.getvalue()
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_render_png_tiled(renderer, box, processes):
+    stream = io.BytesIO()
+
+    renderer.render_png_tiled(
+        stream, region=(0, 0, 40, 30), scale=2.0, tile_size=16, processes=processes
+    )
+
+    stream.seek(0)
+    surface = cairo.ImageSurface.create_from_png(stream)
+    assert surface.get_width() == 80
+    assert surface.get_height() == 60
+
+
+def test_tiled_rendering_is_independent_of_processes(renderer, box):
+    serial = io.BytesIO()
+    parallel = io.BytesIO()
+
+    renderer.render_png_tiled(serial, tile_size=8, processes=1)
+    renderer.render_png_tiled(parallel, tile_size=8, processes=2)
+
+    assert serial.getvalue() == parallel.getvalue()
+
+
+def test_no_worker_processes_are_forked_from_threaded_process(
+    renderer, box, monkeypatch
+):
+    def no_process_pool(*args, **kwargs):
+        raise AssertionError("Should not fork")
+
+    monkeypatch.setattr(render, "ProcessPoolExecutor", no_process_pool)
+    done = threading.Event()
+    thread = threading.Thread(target=done.wait)
+    thread.start()
+    try:
+        renderer.render_png_tiled(io.BytesIO(), tile_size=8, processes=2)
+    finally:
+        done.set()
+        thread.join()
+
+
+def test_concurrent_tiled_rendering(canvas, box):
+    expected = io.BytesIO()
+    with Renderer(canvas) as renderer:
+        renderer.render_png_tiled(expected, tile_size=8, processes=1)
+
+    streams = [io.BytesIO(), io.BytesIO()]
+    renderers = [Renderer(canvas), Renderer(canvas)]
+    threads = [
+        threading.Thread(
+            target=r.render_png_tiled, args=(stream,), kwargs={"tile_size": 8}
+        )
+        for r, stream in zip(renderers, streams)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for r in renderers:
+        r.close()
+
+    assert [s.getvalue() for s in streams] == [expected.getvalue()] * 2
+
+
+def test_custom_spatial_index(canvas, box):
+    index = RTree()
+    with Renderer(canvas, spatial_index=index) as renderer:
+        bounding_box = renderer.bounding_box
+
+    assert box in index
+    assert bounding_box.x == pytest.approx(10, abs=1)
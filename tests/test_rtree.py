@@ -0,0 +1,77 @@
+import pytest
+
+from gaphas.rtree import RTree
+
+
+def leaves(node):
+    if node.leaf:
+        return [node]
+    return [leaf for child in node.children for leaf in leaves(child)]
+
+
+def test_minimum_node_size():
+    with pytest.raises(ValueError):
+        RTree(max_entries=3)
+
+
+def test_nodes_are_split():
+    rtree: RTree[str] = RTree(max_entries=4)
+    for i in range(20):
+        rtree.add(f"{i}", (i * 10, 0, 5, 5))
+
+    assert rtree.height > 1
+    assert all(2 <= len(leaf) <= 4 for leaf in leaves(rtree._root))
+
+
+def test_split_keeps_nearby_items_together():
+    rtree: RTree[str] = RTree(max_entries=4)
+    for i in range(5):
+        rtree.add(f"left{i}", (i, 0, 1, 1))
+        rtree.add(f"right{i}", (1000 + i, 0, 1, 1))
+
+    for leaf in leaves(rtree._root):
+        names = {item[:4] for _edges, item in leaf.items}
+        assert len(names) == 1
+
+
+def test_move_within_leaf_keeps_leaf():
+    rtree: RTree[str] = RTree(max_entries=4)
+    for i in range(20):
+        rtree.add(f"{i}", (i * 10, 0, 5, 5))
+    leaf = rtree._leaves["5"]
+
+    rtree.add("5", (51, 0, 3, 3))
+
+    assert rtree._leaves["5"] is leaf
+    assert rtree.find_inside((50, 0, 5, 5)) == {"5"}
+
+
+def test_tree_shrinks_when_items_are_removed():
+    rtree: RTree[str] = RTree(max_entries=4)
+    for i in range(50):
+        rtree.add(f"{i}", (i * 10, 0, 5, 5))
+
+    for i in range(49):
+        rtree.remove(f"{i}")
+
+    assert rtree.height == 1
+    assert rtree.soft_bounds == (490, 0, 5, 5)
+
+
+def test_load_builds_a_balanced_tree():
+    rtree: RTree[str] = RTree(max_entries=4)
+
+    rtree.load((f"{i}", (i * 10, i % 7 * 10, 5, 5)) for i in range(100))
+
+    depths = set()
+
+    def walk(node, depth):
+        if node.leaf:
+            depths.add(depth)
+        for child in node.children:
+            assert child.parent is node
+            walk(child, depth + 1)
+
+    walk(rtree._root, 0)
+    assert len(depths) == 1
+    assert rtree.height == 4
@@ -2,6 +2,7 @@
 
 import pytest
 
+from gaphas import segment
 from gaphas.connector import ItemConnectionSink, ItemConnector
 from gaphas.handlemove import HandleMove
 from gaphas.item import Element, Line
@@ -166,6 +167,37 @@ def test_orthogonal_line_split(canvas, line):
     assert 3 == len(line.ports())
 
 
+def test_orthogonal_line_split_keeps_constraints(canvas, line):
+    segment = Segment(line, canvas)
+    segment.split_segment(0, count=4)
+    line.orthogonal = True
+    before = set(canvas.solver.constraints)
+
+    # Two new handles: the following segments keep their direction
+    segment.split_segment(1, count=3)
+
+    assert len(canvas.solver.constraints) == 6
+    assert len(before & set(canvas.solver.constraints)) == 3
+
+    segment.merge_segment(1, count=3)
+
+    assert len(canvas.solver.constraints) == 4
+    assert len(before & set(canvas.solver.constraints)) == 3
+
+
+def test_orthogonal_line_split_in_two_replaces_later_constraints(canvas, line):
+    segment = Segment(line, canvas)
+    segment.split_segment(0, count=4)
+    line.orthogonal = True
+    before = set(canvas.solver.constraints)
+
+    # One new handle: the following segments change direction
+    segment.split_segment(1)
+
+    assert len(canvas.solver.constraints) == 5
+    assert len(before & set(canvas.solver.constraints)) == 1
+
+
 def test_params_error_exc(canvas, connections):
     """Test parameter error exceptions."""
     line = Line(connections)
@@ -352,3 +384,13 @@ def test_update_callback_on_reconnect(canvas, connections):
     segment.merge_segment(0)
 
     connector.disconnect()
+
+
+def test_split_with_segment_index(monkeypatch, canvas, line):
+    monkeypatch.setattr(segment, "SEGMENT_INDEX_SIZE", 2)
+    Segment(line, canvas).split_segment(0, count=4)
+
+    handle = Segment(line, canvas).split((63, 63))
+
+    assert handle is line.handles()[3]
+    assert handle.pos.pos == (62.5, 62.5)
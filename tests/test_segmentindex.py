@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from gaphas.geometry import distance_line_point, rectangle_intersects
+from gaphas.segmentindex import SegmentIndex
+
+
+def random_line(rng, n):
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100))]
+    for _ in range(n):
+        x, y = points[-1]
+        points.append((x + rng.uniform(-10, 10), y + rng.uniform(-10, 10)))
+    return points
+
+
+def test_leaf_size_should_be_positive():
+    with pytest.raises(ValueError):
+        SegmentIndex([], leaf_size=0)
+
+
+def test_empty_index():
+    index = SegmentIndex.from_points([(0, 0)])
+
+    assert len(index) == 0
+    assert index.nearest((0, 0)) is None
+    assert index.find_intersect((0, 0, 10, 10)) == []
+
+
+def test_nearest_within_max_distance():
+    index = SegmentIndex.from_points([(0, 0), (10, 0), (10, 10)])
+
+    assert index.nearest((5, 5), max_distance=4) is None
+    assert index.find_nearest((5, 4), k=2) == [
+        (4.0, 0, (5.0, 0.0)),
+        (5.0, 1, (10.0, 4.0)),
+    ]
+
+
+@pytest.mark.parametrize("leaf_size", [1, 3, 8])
+def test_matches_brute_force(leaf_size):
+    rng = random.Random(leaf_size)
+    points = random_line(rng, 200)
+    segments = list(zip(points, points[1:]))
+    index = SegmentIndex(segments, leaf_size=leaf_size)
+
+    for _ in range(20):
+        point = (rng.uniform(-20, 120), rng.uniform(-20, 120))
+        distances = sorted(distance_line_point(s, e, point)[0] for s, e in segments)
+        assert [d for d, _, _ in index.find_nearest(point, k=5)] == distances[:5]
+
+        rect = (rng.uniform(0, 100), rng.uniform(0, 100), 20, 20)
+        assert index.find_intersect(rect) == [
+            i
+            for i, ((x0, y0), (x1, y1)) in enumerate(segments)
+            if rectangle_intersects(
+                (min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)), rect
+            )
+        ]
@@ -154,3 +154,20 @@ def test_needs_solving():
 
     solver.solve()
     assert not solver.needs_solving
+
+
+def test_add_and_remove_many_constraints():
+    solver = Solver()
+    a = Variable()
+    b = Variable(1)
+    c = Variable(2)
+    eq1 = EqualsConstraint(a, b)
+    eq2 = EqualsConstraint(a, c)
+
+    solver.add_constraints([eq1, eq2])
+    assert set(solver.constraints) == {eq1, eq2}
+    assert solver.needs_solving
+
+    solver.remove_constraints([eq1, eq2])
+    assert not solver.constraints
+    assert not solver.needs_solving
@@ -139,3 +139,15 @@ def test_modulo():
     assert divmod(v, 2) == (1, 1)
     assert divmod(4, v) == (1, 1)
     assert divmod(v, o) == (1, 1)
+
+
+def test_notify_handlers():
+    events = []
+    a = Variable(1.0)
+    a.value = 2.0
+
+    a.add_handler(lambda var, old: events.append(old))
+    a.value = 3.0
+
+    assert events == [2.0]
+    assert not hasattr(a, "__dict__")
@@ -0,0 +1,125 @@
+import math
+import random
+
+import pytest
+
+from gaphas.geometry import rectangle_contains, rectangle_intersects
+from gaphas.hashgrid import HashGrid
+from gaphas.quadtree import Quadtree
+from gaphas.rtree import RTree
+
+
+@pytest.fixture(params=["quadtree", "rtree", "hashgrid"])
+def index(request):
+    if request.param == "quadtree":
+        return Quadtree()
+    if request.param == "rtree":
+        return RTree(max_entries=4)
+    return HashGrid(cell_size=25)
+
+
+def random_bounds(rng):
+    return (
+        rng.uniform(-500, 500),
+        rng.uniform(-500, 500),
+        rng.choice([0, rng.uniform(0, 50), rng.uniform(0, 800)]),
+        rng.choice([0, rng.uniform(0, 50), rng.uniform(0, 800)]),
+    )
+
+
+def test_add_and_find(index):
+    index.add("a", (0, 0, 10, 10))
+    index.add("b", (20, 20, 10, 10))
+
+    assert len(index) == 2
+    assert "a" in index
+    assert index.find_inside((-1, -1, 12, 12)) == {"a"}
+    assert index.find_intersect((5, 5, 20, 20)) == {"a", "b"}
+    assert index.soft_bounds == (0, 0, 30, 30)
+
+
+def test_update_bounds(index):
+    index.add("a", (0, 0, 10, 10))
+    index.add("a", (100, 100, 10, 10))
+
+    assert len(index) == 1
+    assert index.get_bounds("a") == (100, 100, 10, 10)
+    assert index.find_intersect((0, 0, 20, 20)) == set()
+    assert index.find_intersect((100, 100, 1, 1)) == {"a"}
+
+
+def test_remove_and_clear(index):
+    index.add("a", (0, 0, 10, 10))
+    index.add("b", (20, 20, 10, 10))
+    index.remove("a")
+    index.remove("unknown")
+
+    assert "a" not in index
+    assert index.find_intersect((0, 0, 30, 30)) == {"b"}
+
+    index.clear()
+
+    assert len(index) == 0
+    assert index.soft_bounds == (0, 0, 0, 0)
+    with pytest.raises(KeyError):
+        index.get_bounds("b")
+
+
+def test_find_nearest(index):
+    for i in range(10):
+        index.add(f"{i}", (i * 10, 0, 5, 5))
+
+    assert index.find_nearest((32, 2), k=2) == [(0.0, "3"), (7.0, "2")]
+    assert index.find_nearest((-100, 0), max_distance=50) == []
+
+
+def test_nearest_with_distance_function(index):
+    index.add("a", (0, 0, 10, 10))
+    index.add("b", (20, 0, 10, 10))
+
+    nearest = index.find_nearest((5, 5), k=2, distance_fn=lambda item, _p: -1.0)
+
+    assert nearest == [(-1.0, "a"), (-1.0, "b")]
+
+
+def test_matches_brute_force(index):
+    rng = random.Random(0)
+    bounds = {}
+    for _ in range(1000):
+        item = rng.randrange(200)
+        if rng.random() < 0.8:
+            bounds[item] = random_bounds(rng)
+            index.add(item, bounds[item])
+        else:
+            bounds.pop(item, None)
+            index.remove(item)
+
+    for _ in range(20):
+        rect = random_bounds(rng)
+        assert index.find_intersect(rect) == {
+            i for i, b in bounds.items() if rectangle_intersects(b, rect)
+        }
+        assert index.find_inside(rect) == {
+            i for i, b in bounds.items() if rectangle_contains(b, rect)
+        }
+
+    point = (rng.uniform(-500, 500), rng.uniform(-500, 500))
+    distances = sorted(
+        math.hypot(
+            max(x - point[0], 0, point[0] - x - w),
+            max(y - point[1], 0, point[1] - y - h),
+        )
+        for x, y, w, h in bounds.values()
+    )
+    assert [d for d, _ in index.find_nearest(point, k=10)] == pytest.approx(
+        distances[:10]
+    )
+
+
+def test_load(index):
+    index.add("a", (0, 0, 10, 10))
+    index.load((f"{i}", (i * 10, 50, 5, 5)) for i in range(100))
+
+    assert len(index) == 101
+    assert index.find_intersect((0, 0, 10, 10)) == {"a"}
+    assert index.find_inside((0, 50, 26, 6)) == {"0", "1", "2"}
@@ -114,6 +114,22 @@ async def test_get_item_at_point_overlayed_by_bigger_item(view, canvas, connecti
     assert next(item_at_point(view, (-1, -1)), None) is above
 
 
+@pytest.mark.asyncio
+async def test_get_item_at_point_nearest_item_first(view, canvas, connections):
+    far = Box(connections, 10, 10)
+    canvas.add(far)
+    near = Box(connections, 10, 10)
+    canvas.add(near)
+
+    far.matrix.translate(-15, 0)
+    near.matrix.translate(12, 0)
+    view.request_update((far, near))
+    await view.update()
+
+    assert list(item_at_point(view, (10, 5), distance=20)) == [near, far]
+    assert list(item_at_point(view, (10, 5), distance=5)) == [near]
+
+
 def test_order_by_distance():
     m = [(0, ""), (10, ""), (-1, ""), (-3, ""), (5, ""), (4, "")]
 
@@ -1,11 +1,20 @@
 """Test cases for the View class."""
 
+import asyncio
+import itertools
+
+import cairo
 import pytest
+import pytest_asyncio
 from gi.repository import Gtk
 
 from gaphas.canvas import Canvas
+from gaphas.hashgrid import HashGrid
+from gaphas.painter import FreeHandPainter, HandlePainter, ItemPainter, PainterChain
+from gaphas.rtree import RTree
 from gaphas.selection import Selection
-from gaphas.view import GtkView
+from gaphas.view import GtkView, gtkview
+from tests.conftest import Box
 
 
 class CustomSelection(Selection):
@@ -123,3 +132,423 @@ def test_can_remove_all_controllers(view):
     view.remove_all_controllers()
 
     assert ctrl not in view.observe_controllers()
+
+
+@pytest_asyncio.fixture
+async def boxes(canvas, connections, view):
+    boxes = [Box(connections) for _ in range(3)]
+    for box in boxes:
+        canvas.add(box)
+    await view.update()
+    return boxes
+
+
+@pytest.mark.asyncio
+async def test_progressive_paint_completes_back_buffer(view, boxes):
+    await view.update()
+    view.progressive_threshold = 1
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    cr = cairo.Context(surface)
+
+    view._paint(cr, 100, 100)
+
+    assert view._progressive is None
+    assert view._back_buffer_valid
+
+
+@pytest.mark.asyncio
+async def test_progressive_paint_in_chunks(view, boxes, monkeypatch):
+    monkeypatch.setattr(gtkview, "PROGRESSIVE_CHUNK_SIZE", 1)
+    await view.update()
+    view.progressive_threshold = 1
+    view.progressive_budget = 0
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    cr = cairo.Context(surface)
+
+    view._paint(cr, 100, 100)
+
+    assert view._progressive
+    assert view._progressive.index == 1
+    assert not view._back_buffer_valid
+
+    view._paint(cr, 100, 100)
+    view._paint(cr, 100, 100)
+
+    assert view._progressive is None
+    assert view._back_buffer_valid
+
+
+@pytest.mark.asyncio
+async def test_progressive_paint_restarts_on_update(view, boxes):
+    await view.update()
+    view.progressive_threshold = 1
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    cr = cairo.Context(surface)
+    view._paint(cr, 100, 100)
+
+    view.update_back_buffer()
+
+    assert not view._back_buffer_valid
+
+
+@pytest.mark.asyncio
+async def test_full_paint_discards_progressive_back_buffer(view, boxes, monkeypatch):
+    monkeypatch.setattr(gtkview, "PROGRESSIVE_CHUNK_SIZE", 1)
+    pending = []
+    monkeypatch.setattr(
+        view, "_paint_pending_items", lambda cr, progress: pending.append(progress)
+    )
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    cr = cairo.Context(surface)
+    view.progressive_threshold = 1
+    view._paint(cr, 100, 100)
+
+    view.progressive_threshold = 0
+    view.update_back_buffer()
+    view._paint(cr, 100, 100)
+
+    assert view._back_buffer is None
+
+    view.progressive_threshold = 1
+    view.progressive_budget = 0
+    view.update_back_buffer()
+    view._paint(cr, 100, 100)
+
+    assert view._progressive
+    assert pending == [view._progressive]
+
+
+class RecordingItemPainter(ItemPainter):
+    def __init__(self, selection, view=None):
+        super().__init__(selection, view)
+        self.painted = []
+        self.proxies = []
+
+    def paint_item(self, item, cairo):
+        self.painted.append(item)
+        super().paint_item(item, cairo)
+
+    def paint_proxy(self, item, cairo, level):
+        self.proxies.append(item)
+        super().paint_proxy(item, cairo, level)
+
+
+@pytest.mark.asyncio
+async def test_progressive_paint_uses_view_painter(view, boxes):
+    await view.update()
+    item_painter = RecordingItemPainter(view.selection)
+    view.painter = (
+        PainterChain().append(FreeHandPainter(item_painter)).append(HandlePainter(view))
+    )
+    view.progressive_threshold = 1
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    cr = cairo.Context(surface)
+
+    view._paint(cr, 100, 100)
+
+    assert view._back_buffer_valid
+    assert set(item_painter.painted) == set(boxes)
+
+
+@pytest.mark.asyncio
+async def test_progressive_paint_applies_level_of_detail(view, boxes):
+    await view.update()
+    view.zoom(0.2)
+    item_painter = RecordingItemPainter(view.selection, view)
+    view.painter = PainterChain().append(item_painter)
+    view.progressive_threshold = 1
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    cr = cairo.Context(surface)
+
+    view._paint(cr, 100, 100)
+
+    assert not item_painter.painted
+    assert set(item_painter.proxies) == set(boxes)
+
+
+@pytest.mark.asyncio
+async def test_updates_are_coalesced(view, boxes):
+    update = view.update()
+
+    assert view.update() is update
+
+    await update
+
+    assert not view._dirty_items
+    assert len(view._qtree) == len(boxes)
+
+
+class FrameClock:
+    """Stand-in for the frame clock of a mapped view."""
+
+    def __init__(self, view, monkeypatch):
+        self.view = view
+        self.callbacks = {}
+        self.removed = []
+        self.mapped = True
+        self._ids = itertools.count(1)
+        monkeypatch.setattr(view, "get_realized", lambda: True)
+        monkeypatch.setattr(view, "get_mapped", lambda: self.mapped)
+        monkeypatch.setattr(view, "get_frame_clock", lambda: self)
+        monkeypatch.setattr(view, "add_tick_callback", self.add_tick_callback)
+        monkeypatch.setattr(view, "remove_tick_callback", self.remove_tick_callback)
+
+    def add_tick_callback(self, callback):
+        tick_id = next(self._ids)
+        self.callbacks[tick_id] = callback
+        return tick_id
+
+    def remove_tick_callback(self, tick_id):
+        del self.callbacks[tick_id]
+        self.removed.append(tick_id)
+
+    def tick(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback(self.view, self)
+
+
+@pytest.fixture
+def frame_clock(view, boxes, monkeypatch):
+    return FrameClock(view, monkeypatch)
+
+
+@pytest.fixture
+def do_update_calls(view, frame_clock, monkeypatch):
+    calls = []
+    do_update = view._do_update
+
+    def counting_do_update():
+        calls.append(None)
+        do_update()
+
+    monkeypatch.setattr(view, "_do_update", counting_do_update)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_updates_are_coalesced_per_frame(
+    view, boxes, frame_clock, do_update_calls
+):
+    for box in boxes * 10:
+        view.request_update((box,))
+    update = view._update_task
+
+    assert len(frame_clock.callbacks) == 1
+    assert not update.done()
+
+    frame_clock.tick()
+
+    assert len(do_update_calls) == 1
+    assert not view._dirty_items
+    assert await update is None
+    assert view._update_task is None
+
+
+@pytest.mark.asyncio
+async def test_update_error_is_set_on_future(view, boxes, frame_clock, monkeypatch):
+    def failing_do_update():
+        raise ValueError("update failed")
+
+    monkeypatch.setattr(view, "_do_update", failing_do_update)
+    update = view.update()
+
+    frame_clock.tick()
+
+    with pytest.raises(ValueError):
+        await update
+
+
+@pytest.mark.asyncio
+async def test_pending_update_is_cancelled(view, boxes, frame_clock):
+    update = view.update()
+
+    view._cancel_update()
+
+    assert not frame_clock.callbacks
+    assert frame_clock.removed == [1]
+    assert update.cancelled()
+    assert view._update_task is None
+
+
+@pytest.mark.asyncio
+async def test_items_dirtied_during_update_are_updated_next_frame(
+    view, boxes, frame_clock, do_update_calls, monkeypatch
+):
+    update_bounding_box = view.update_bounding_box
+
+    def dirtying_update_bounding_box(items):
+        update_bounding_box(items)
+        if len(do_update_calls) == 1:
+            view.request_update((boxes[0],))
+
+    monkeypatch.setattr(view, "update_bounding_box", dirtying_update_bounding_box)
+    update = view.update()
+
+    frame_clock.tick()
+
+    assert await update is None
+    assert view._dirty_items == {boxes[0]}
+    assert len(frame_clock.callbacks) == 1
+
+    next_update = view._update_task
+    frame_clock.tick()
+
+    assert await next_update is None
+    assert len(do_update_calls) == 2
+    assert not view._dirty_items
+
+
+@pytest.mark.asyncio
+async def test_unmapped_view_is_updated_without_frame_clock(
+    view, boxes, frame_clock, do_update_calls
+):
+    frame_clock.mapped = False
+
+    await asyncio.wait_for(view.update(), 1)
+
+    assert not frame_clock.callbacks
+    assert len(do_update_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_pending_update_is_performed_when_view_is_unmapped(
+    view, boxes, frame_clock, do_update_calls
+):
+    update = view.update()
+
+    frame_clock.mapped = False
+    view.do_unmap()
+
+    assert not frame_clock.callbacks
+    assert await asyncio.wait_for(update, 1) is None
+    assert len(do_update_calls) == 1
+    assert view._update_task is None
+
+
+@pytest.mark.asyncio
+async def test_visible_items_are_cached(view, boxes):
+    await view.update()
+
+    items = view.get_items_in_rectangle((0, 0, 100, 100))
+
+    assert items == tuple(boxes)
+    assert view.get_items_in_rectangle((0, 0, 100, 100)) is items
+
+
+@pytest.mark.asyncio
+async def test_visible_items_cache_survives_hover(view, boxes):
+    await view.update()
+    items = view.get_items_in_rectangle((0, 0, 100, 100))
+
+    view.selection.hovered_item = boxes[1]
+    await view.update()
+
+    assert view.get_items_in_rectangle((0, 0, 100, 100)) is items
+
+
+@pytest.mark.asyncio
+async def test_visible_items_survive_other_queries(view, boxes, monkeypatch):
+    await view.update()
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100)
+    cr = cairo.Context(surface)
+    view._paint(cr, 100, 100)
+    visible = view._visible_items
+
+    queries = []
+    find_intersect = view._qtree.find_intersect
+    monkeypatch.setattr(
+        view._qtree,
+        "find_intersect",
+        lambda rect: queries.append(rect) or find_intersect(rect),
+    )
+    view.get_items_in_rectangle((0, 0, 10, 10))
+    view._paint(cr, 100, 100)
+
+    assert len(queries) == 1
+    assert view._visible_items is visible
+
+
+@pytest.mark.asyncio
+async def test_visible_items_item_moved_out_of_view(view, canvas, boxes):
+    await view.update()
+    view.get_items_in_rectangle((0, 0, 100, 100))
+
+    boxes[1].matrix.translate(500, 500)
+    canvas.request_update(boxes[1])
+    await view.update()
+
+    assert view.get_items_in_rectangle((0, 0, 100, 100)) == (boxes[0], boxes[2])
+
+
+@pytest.mark.asyncio
+async def test_visible_items_item_added_and_removed(view, canvas, boxes):
+    await view.update()
+    view.get_items_in_rectangle((0, 0, 100, 100))
+
+    box = Box(canvas.connections)
+    canvas.add(box)
+    await view.update()
+
+    assert view.get_items_in_rectangle((0, 0, 100, 100)) == (*boxes, box)
+
+    canvas.remove(boxes[0])
+
+    assert view.get_items_in_rectangle((0, 0, 100, 100)) == (boxes[1], boxes[2], box)
+
+
+@pytest.mark.asyncio
+async def test_visible_items_item_reparented(view, canvas, boxes):
+    await view.update()
+    view.get_items_in_rectangle((0, 0, 100, 100))
+
+    canvas.reparent(boxes[0], boxes[2])
+    await view.update()
+
+    assert view.get_items_in_rectangle((0, 0, 100, 100)) == (
+        boxes[1],
+        boxes[2],
+        boxes[0],
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_items_nearest(view, boxes):
+    for i, box in enumerate(boxes):
+        box.matrix.translate(i * 30, 0)
+    view.request_update(boxes)
+    await view.update()
+
+    nearest = [item for _d, item in view.get_items_nearest((75, 5), 50)]
+
+    assert nearest == [boxes[2], boxes[1]]
+
+
+@pytest.mark.asyncio
+async def test_get_items_nearest_with_distance_function(view, boxes):
+    for i, box in enumerate(boxes):
+        box.matrix.translate(i * 30, 0)
+    view.request_update(boxes)
+    await view.update()
+
+    nearest = list(view.get_items_nearest((75, 5), 50, lambda item: 42.0))
+
+    assert nearest == [(42.0, boxes[2]), (42.0, boxes[1])]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spatial_index", [RTree, HashGrid])
+async def test_custom_spatial_index(canvas, boxes, spatial_index):
+    index = spatial_index()
+    view = GtkView(canvas, spatial_index=index)
+    for i, box in enumerate(boxes):
+        box.matrix.translate(i * 30, 0)
+    view.request_update(boxes)
+    await view.update()
+
+    assert len(index) == len(boxes)
+    assert list(view.get_items_in_rectangle((25, 0, 10, 10))) == [boxes[1]]
+    assert [item for _d, item in view.get_items_nearest((75, 5), 50)] == [
+        boxes[2],
+        boxes[1],
+    ]
@@ -0,0 +1,67 @@
+import cairo
+import pytest
+
+from gaphas.painter import HandlePainter, ItemPainter, PainterChain
+from gaphas.view.profiling import PAINT, UPDATE, Profiler, profiled_paint, stage
+
+
+def test_profiler_keeps_most_recent_records():
+    profiler = Profiler(size=2)
+
+    for kind in (UPDATE, PAINT, UPDATE):
+        with profiler.record(kind):
+            pass
+
+    assert [r.kind for r in profiler.records] == [PAINT, UPDATE]
+
+
+def test_profiler_callback():
+    records = []
+    profiler = Profiler(callback=records.append)
+
+    with profiler.record(UPDATE) as record:
+        with stage(record, "update_now"):
+            pass
+
+    assert records == [record]
+    assert "update_now" in record.timings
+    assert record.duration >= record.timings["update_now"]
+
+
+def test_painter_chain_is_timed_per_painter(view):
+    profiler = Profiler()
+    painter = PainterChain().append(ItemPainter()).append(HandlePainter(view))
+    cr = cairo.Context(cairo.ImageSurface(cairo.FORMAT_ARGB32, 10, 10))
+
+    with profiler.record(PAINT) as record:
+        profiled_paint(painter, (), cr, record)
+
+    assert set(record.timings) == {"ItemPainter", "HandlePainter"}
+
+
+@pytest.mark.asyncio
+async def test_view_update_is_profiled(view, box):
+    view.profiler = Profiler()
+    box.width = 20
+    view.request_update((box,))
+
+    await view.update()
+
+    (record,) = view.profiler.records
+    assert record.kind == UPDATE
+    assert record.counts["dirty_items"] == 1
+    assert {"all_dirty_items", "update_now", "update_bounding_box"} <= set(
+        record.timings
+    )
+
+
+@pytest.mark.asyncio
+async def test_view_paint_is_profiled(view, box):
+    view.profiler = Profiler()
+    cr = cairo.Context(cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 100))
+
+    with view.profiler.record(PAINT) as record:
+        view._paint(cr, 100, 100, record)
+
+    assert record.counts["visible_items"] == 1
+    assert "ItemPainter" in record.timings